@@ -0,0 +1,119 @@
+"""Benchmark inputs: the repo's ``test_files`` plus generated large documents."""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+TEST_FILES_DIR = REPO_ROOT / "test_files"
+
+_VOCABULARY = (
+    "cell membrane protein enzyme energy molecule transport diffusion osmosis "
+    "gradient receptor signal pathway nucleus gene expression transcription "
+    "translation ribosome mitochondria respiration glucose oxygen carbon "
+    "photosynthesis chlorophyll light reaction cycle structure function system "
+    "organism population evolution selection variation inheritance mutation "
+    "equilibrium concentration solution acid base reaction rate catalyst"
+).split()
+
+
+def sample_files() -> List[Path]:
+    """Non-empty files in ``test_files`` that a parser supports."""
+    from backend.parsers import get_parser_for_file
+
+    files = []
+    for path in sorted(TEST_FILES_DIR.iterdir()):
+        try:
+            get_parser_for_file(path)
+        except ValueError:
+            continue
+        if path.stat().st_size > 0 and not path.name.startswith("flashcards_output"):
+            files.append(path)
+    return files
+
+
+def generate_corpus(directory: Path, pages: int = 200) -> Dict[str, Path]:
+    """Write large synthetic PDF, PPTX and DOCX files, reusing ones already made.
+
+    Args:
+        directory: Where the files are written
+        pages: Pages in the PDF; the PPTX has as many slides and the DOCX as
+            many sections
+
+    Returns:
+        Scenario name -> file path
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    generators = {
+        "pdf": _write_pdf,
+        "pptx": _write_pptx,
+        "docx": _write_docx,
+    }
+    files = {}
+    for extension, write in generators.items():
+        path = directory / f"synthetic-{pages}.{extension}"
+        if not path.exists():
+            write(path, pages)
+        files[f"synthetic_{extension}"] = path
+    return files
+
+
+def _paragraph(rng: random.Random, sentences: int = 5) -> str:
+    return " ".join(
+        " ".join(
+            rng.choice(_VOCABULARY) for _ in range(rng.randint(8, 16))
+        ).capitalize()
+        + "."
+        for _ in range(sentences)
+    )
+
+
+def _write_pdf(path: Path, pages: int) -> None:
+    import pymupdf
+
+    rng = random.Random(1)
+    document = pymupdf.open()
+    for number in range(1, pages + 1):
+        page = document.new_page()
+        text = f"Lecture Notes - Chapter {number // 10 + 1}\n\n"
+        text += "\n\n".join(_paragraph(rng) for _ in range(5))
+        page.insert_textbox(pymupdf.Rect(50, 50, 550, 780), text, fontsize=10)
+        page.insert_text((290, 810), str(number), fontsize=9)
+    document.save(path)
+    document.close()
+
+
+def _write_pptx(path: Path, slides: int) -> None:
+    from pptx import Presentation
+
+    rng = random.Random(2)
+    presentation = Presentation()
+    layout = presentation.slide_layouts[1]  # Title and Content
+    for number in range(1, slides + 1):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {number}: {rng.choice(_VOCABULARY).title()}"
+        body = slide.placeholders[1].text_frame
+        body.text = _paragraph(rng, 1)
+        for _ in range(4):
+            body.add_paragraph().text = _paragraph(rng, 1)
+        slide.notes_slide.notes_text_frame.text = _paragraph(rng, 2)
+    presentation.save(path)
+
+
+def _write_docx(path: Path, sections: int) -> None:
+    import docx
+
+    rng = random.Random(3)
+    document = docx.Document()
+    for number in range(1, sections + 1):
+        document.add_heading(f"Section {number}", level=1)
+        for _ in range(4):
+            document.add_paragraph(_paragraph(rng))
+        if number % 10 == 0:
+            table = document.add_table(rows=3, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = rng.choice(_VOCABULARY)
+    document.save(path)
@@ -0,0 +1,221 @@
+"""Deterministic stand-in for the LLM provider, so benchmarks measure our own overhead.
+
+``FakeChatModel`` answers the cleaner and flashcarder prompts with
+well-formed JSON of a configurable size after a configurable delay. Output
+depends only on the prompt, so repeated runs do the same work. It can also
+act like a provider enforcing a quota, rejecting calls with
+``FakeRateLimitError`` (HTTP 429), or like one with a slow tail of calls
+that take much longer than the rest. ``fake_chain_composer`` patches
+``ChainComposer`` to build it instead of a real provider client.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from chain_composer import ChainComposer
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+# Characters per streamed chunk, roughly a few tokens like a real provider
+STREAM_CHUNK_CHARS = 16
+
+
+class FakeRateLimitError(Exception):
+    """What the fake provider raises instead of answering: an HTTP 429."""
+
+    status_code = 429
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers the pipeline's prompts locally.
+
+    Attributes:
+        latency: Seconds before the first token
+        seconds_per_kchar: Extra generation time per 1000 output characters
+        cleaner_output_ratio: Length of the cleaned text relative to the
+            cleaner's input
+        cards: Flashcards returned per flashcarder call
+        answer_chars: Length of each flashcard answer
+        max_concurrent: Calls allowed in flight at once; more are rejected
+            with ``FakeRateLimitError``. 0 for no limit
+        throttle_rate: Share of calls rejected with ``FakeRateLimitError``
+            at random (seeded, so runs are repeatable)
+        tail_rate: Share of calls that wait ``tail_latency`` extra seconds
+            before the first token, at random (seeded)
+        tail_latency: Extra delay of the slow calls
+    """
+
+    latency: float = 0.0
+    seconds_per_kchar: float = 0.0
+    cleaner_output_ratio: float = 1.0
+    cards: int = 20
+    answer_chars: int = 200
+    max_concurrent: int = 0
+    throttle_rate: float = 0.0
+    tail_rate: float = 0.0
+    tail_latency: float = 0.0
+
+    _in_flight: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _rng: Any = PrivateAttr(default_factory=lambda: random.Random(0))
+
+    @property
+    def _llm_type(self) -> str:
+        return "benchmark-fake-chat-model"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content = self._respond(messages)
+        with self._admit():
+            time.sleep(self._first_token_delay() + self._generation_time(content))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        content = self._respond(messages)
+        with self._admit():
+            await asyncio.sleep(
+                self._first_token_delay() + self._generation_time(content)
+            )
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        content = self._respond(messages)
+        with self._admit():
+            time.sleep(self._first_token_delay())
+            for chunk in self._chunks(content):
+                time.sleep(self._generation_time(chunk))
+                yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        content = self._respond(messages)
+        with self._admit():
+            await asyncio.sleep(self._first_token_delay())
+            for chunk in self._chunks(content):
+                await asyncio.sleep(self._generation_time(chunk))
+                yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
+
+    @contextmanager
+    def _admit(self) -> Iterator[None]:
+        """Count the call as in flight, or reject it like a provider over quota."""
+        with self._lock:
+            if self.max_concurrent and self._in_flight >= self.max_concurrent:
+                raise FakeRateLimitError(
+                    f"429 Too Many Requests: over {self.max_concurrent} concurrent calls"
+                )
+            if self.throttle_rate and self._rng.random() < self.throttle_rate:
+                raise FakeRateLimitError("429 Too Many Requests: quota exceeded")
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _respond(self, messages: List[BaseMessage]) -> str:
+        system = "\n".join(
+            str(message.content) for message in messages if message.type == "system"
+        )
+        prompt = "\n".join(
+            str(message.content) for message in messages if message.type != "system"
+        )
+        if '"flashcards"' in system:
+            return self._flashcards(prompt)
+        return json.dumps(
+            {"cleaned_text": prompt[: int(len(prompt) * self.cleaner_output_ratio)]}
+        )
+
+    def _flashcards(self, prompt: str) -> str:
+        seed = int.from_bytes(hashlib.sha256(prompt.encode()).digest()[:8], "big")
+        rng = random.Random(seed)
+        words = [word for word in prompt.split() if word.isalpha()] or ["topic"]
+
+        cards = []
+        for index in range(self.cards):
+            # Distinct word choices keep deduplication from merging the cards
+            question = " ".join(rng.choice(words) for _ in range(8))
+            answer = " ".join(rng.choice(words) for _ in range(self.answer_chars // 6))
+            cards.append(
+                {
+                    "question": f"{index}: What is {question}?",
+                    "answer": answer[: self.answer_chars],
+                    "source_page": index % 10 + 1,
+                    "tags": [rng.choice(words).lower()],
+                }
+            )
+        return json.dumps({"flashcards": cards})
+
+    def _first_token_delay(self) -> float:
+        if not self.tail_rate:
+            return self.latency
+        with self._lock:
+            slow = self._rng.random() < self.tail_rate
+        return self.latency + (self.tail_latency if slow else 0.0)
+
+    def _generation_time(self, content: str) -> float:
+        return len(content) / 1000 * self.seconds_per_kchar
+
+    @staticmethod
+    def _chunks(content: str) -> Iterator[str]:
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            yield content[start : start + STREAM_CHUNK_CHARS]
+
+
+@contextmanager
+def fake_chain_composer(**model_options: Any) -> Iterator[None]:
+    """Make every ``ChainComposer`` built inside the block use ``FakeChatModel``.
+
+    All chains share one model, so ``max_concurrent`` limits them together
+    like a provider quota would. Chains cached by ``chain_registry`` are
+    dropped on entry and exit so no real client leaks into the benchmark and
+    no fake one leaks out of it.
+
+    Args:
+        **model_options: ``FakeChatModel`` fields, e.g. ``latency=0.5``
+    """
+    from backend.ai import chain_registry
+
+    model = FakeChatModel(**model_options)
+    original_validate = ChainComposer._validate_api_key
+    original_initialize = ChainComposer._initialize_llm
+    ChainComposer._validate_api_key = lambda self, api_key: None
+    ChainComposer._initialize_llm = lambda self, **kwargs: model
+    chain_registry.clear()
+    try:
+        yield
+    finally:
+        ChainComposer._validate_api_key = original_validate
+        ChainComposer._initialize_llm = original_initialize
+        chain_registry.clear()
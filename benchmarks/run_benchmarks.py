@@ -0,0 +1,402 @@
+"""Time the flashcard pipeline end to end against a fake LLM.
+
+Each scenario runs ``backend.ai.arun`` over one or more input files with
+cold caches, and records how long the parse, clean and flashcard stages
+took, plus time to the first card. Results go to a JSON file named after
+the commit so runs can be compared with ``--compare``.
+
+Usage (from the repository root)::
+
+    python -m benchmarks.run_benchmarks --iterations 5 --latency 0.2
+    python -m benchmarks.run_benchmarks --compare benchmarks/results/<old>.json
+
+Pipeline options and the LLM scheduler's limits come from the usual
+``FLASHCARD_*`` environment variables. ``--max-concurrent`` and
+``--throttle-rate`` make the fake provider answer with 429s, to see how the
+scheduler copes. ``--tail-rate`` and ``--tail-latency`` give it a slow tail,
+to see how much hedged requests cut p95/p99::
+
+    python -m benchmarks.run_benchmarks --latency 0.2 --max-concurrent 2
+    python -m benchmarks.run_benchmarks --latency 0.2 --tail-rate 0.05 \\
+        --tail-latency 5 --iterations 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from fastapi import UploadFile  # noqa: E402
+
+from backend.ai import arun, get_llm_scheduler, set_llm_scheduler  # noqa: E402
+from backend.artifacts import ArtifactStore  # noqa: E402
+from backend.cache import (  # noqa: E402
+    MemoryLRUBackend,
+    ParseCache,
+    ResponseCache,
+    SQLiteBlobStore,
+)
+from backend.logs import configure_logging  # noqa: E402
+from backend.metrics.pipeline_metrics import LLM_HEDGES, LLM_HEDGE_WINS  # noqa: E402
+from backend.models import PipelineSettings, UserForm  # noqa: E402
+
+from .corpus import generate_corpus, sample_files  # noqa: E402
+from .fake_llm import fake_chain_composer  # noqa: E402
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+CORPUS_DIR = Path(__file__).resolve().parent / ".corpus"
+STAGES = ("parse", "clean", "flashcard", "first_card", "total")
+CHAINS = ("cleaner", "flashcarder")
+MODEL = "gemini-1.5-pro"
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = _build_arg_parser().parse_args(argv)
+    configure_logging(args.log_level)
+
+    scenarios = _scenarios(args.pages)
+    if args.scenarios:
+        unknown = set(args.scenarios) - set(scenarios)
+        if unknown:
+            print(f"Unknown scenarios: {', '.join(sorted(unknown))}", file=sys.stderr)
+            return 2
+        scenarios = {name: scenarios[name] for name in args.scenarios}
+
+    settings = PipelineSettings.from_env()
+    model_options = {
+        "latency": args.latency,
+        "seconds_per_kchar": args.seconds_per_kchar,
+        "cards": args.cards,
+        "answer_chars": args.answer_chars,
+        "max_concurrent": args.max_concurrent,
+        "throttle_rate": args.throttle_rate,
+        "tail_rate": args.tail_rate,
+        "tail_latency": args.tail_latency,
+    }
+
+    results: Dict[str, Any] = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "fake_llm": model_options,
+            "pipeline_settings": settings.model_dump(),
+        },
+        "scenarios": {},
+    }
+
+    with fake_chain_composer(**model_options):
+        for name, files in scenarios.items():
+            print(f"Running {name} ({', '.join(path.name for path in files)})")
+            # Each scenario starts from the scheduler's initial concurrency.
+            # Latency history for hedging carries over, as in a warm server
+            set_llm_scheduler(None)
+            try:
+                summary = asyncio.run(
+                    run_scenario(files, settings, args.iterations, args.warmup)
+                )
+            except Exception as e:
+                # e.g. an optional parser dependency that is not installed
+                print(f"  {name} failed: {e}", file=sys.stderr)
+                results["scenarios"][name] = {"error": str(e)}
+                continue
+            results["scenarios"][name] = summary
+            _print_summary(name, summary)
+
+    output = Path(args.output) if args.output else _default_output(results["commit"])
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        _print_comparison(baseline, results)
+    return 0
+
+
+async def run_scenario(
+    files: List[Path], settings: PipelineSettings, iterations: int, warmup: int
+) -> Dict[str, Any]:
+    """Run the pipeline over ``files`` and summarize the stage timings.
+
+    Every iteration gets empty parse, cleaner and artifact caches, so each
+    one does the full amount of work.
+    """
+    contents = [(path.name, path.read_bytes()) for path in files]
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    card_counts = []
+    hedges_before = _hedge_counts()
+
+    for iteration in range(warmup + iterations):
+        timings, card_count = await _run_once(contents, settings)
+        if iteration < warmup:
+            continue
+        for stage, seconds in timings.items():
+            samples[stage].append(seconds)
+        card_counts.append(card_count)
+
+    input_bytes = sum(len(content) for _, content in contents)
+    total_seconds = sum(samples["total"])
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "files": [name for name, _ in contents],
+        "input_bytes": input_bytes,
+        "iterations": iterations,
+        "cards": card_counts[-1] if card_counts else 0,
+        "stages": {
+            stage: _distribution(values) for stage, values in samples.items() if values
+        },
+        "throughput": {
+            "runs_per_second": iterations / total_seconds if total_seconds else None,
+            "input_mb_per_second": (
+                input_bytes * iterations / total_seconds / 1e6
+                if total_seconds
+                else None
+            ),
+            "cards_per_second": (
+                sum(card_counts) / total_seconds if total_seconds else None
+            ),
+        },
+        "llm_concurrency_limit": get_llm_scheduler().concurrency_limit(MODEL),
+        "llm_hedges": {
+            key: count - hedges_before[key] for key, count in _hedge_counts().items()
+        },
+        # High-water marks for the whole benchmark process so far, not just
+        # this scenario
+        "peak_rss_mb": _rss_mb(usage.ru_maxrss),
+        "peak_children_rss_mb": _rss_mb(children.ru_maxrss),
+    }
+
+
+async def _run_once(
+    contents: List[tuple], settings: PipelineSettings
+) -> tuple[Dict[str, float], int]:
+    stage_started: Dict[str, float] = {}
+    first_card: List[float] = []
+
+    def on_stage(stage: str) -> None:
+        stage_started[stage] = time.perf_counter()
+
+    def on_card(card) -> None:
+        if not first_card:
+            first_card.append(time.perf_counter())
+
+    user_form = UserForm(
+        course_name="Benchmark",
+        difficulty="medium",
+        school_level="undergraduate",
+        subject="Biology",
+        rules="",
+        num_flash_cards=None,
+        subject_material=[
+            UploadFile(file=io.BytesIO(content), size=len(content), filename=name)
+            for name, content in contents
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as scratch:
+        started = time.perf_counter()
+        result = await arun(
+            user_form,
+            "benchmark",
+            cleaner_model=MODEL,
+            flashcarder_model=MODEL,
+            on_stage=on_stage,
+            on_card=on_card,
+            artifact_store=ArtifactStore(Path(scratch) / "artifacts"),
+            settings=settings,
+            parse_cache=ParseCache(SQLiteBlobStore(Path(scratch) / "parse.sqlite3")),
+            cleaner_cache=ResponseCache(MemoryLRUBackend()),
+        )
+        finished = time.perf_counter()
+
+    timings = {
+        "parse": stage_started["clean"] - stage_started["parse"],
+        "clean": stage_started["flashcard"] - stage_started["clean"],
+        "flashcard": finished - stage_started["flashcard"],
+        "total": finished - started,
+    }
+    if first_card:
+        timings["first_card"] = first_card[0] - started
+    return timings, len(result["deck"].flashcards)
+
+
+def _hedge_counts() -> Dict[str, float]:
+    """Hedge requests fired and won so far, warmup runs included."""
+    return {
+        "fired": sum(LLM_HEDGES.value(chain, MODEL) for chain in CHAINS),
+        "won": sum(LLM_HEDGE_WINS.value(chain, MODEL) for chain in CHAINS),
+    }
+
+
+def _scenarios(pages: int) -> Dict[str, List[Path]]:
+    files = sample_files()
+    scenarios = {f"sample_{path.suffix.lstrip('.')}": [path] for path in files}
+    scenarios["sample_all"] = files
+    for name, path in generate_corpus(CORPUS_DIR, pages).items():
+        scenarios[name] = [path]
+    return scenarios
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "p50": _percentile(ordered, 0.50),
+        "p95": _percentile(ordered, 0.95),
+        "p99": _percentile(ordered, 0.99),
+        "mean": sum(ordered) / len(ordered),
+        "min": ordered[0],
+        "max": ordered[-1],
+    }
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile of already sorted values."""
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _rss_mb(max_rss: int) -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(max_rss / divisor, 1)
+
+
+def _git_commit() -> str:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return f"{commit}-dirty" if dirty else commit
+
+
+def _default_output(commit: str) -> Path:
+    return RESULTS_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{commit}.json"
+
+
+def _print_summary(name: str, summary: Dict[str, Any]) -> None:
+    for stage, stats in summary["stages"].items():
+        print(
+            f"  {name:<16} {stage:<10} p50 {stats['p50'] * 1000:9.1f} ms   "
+            f"p95 {stats['p95'] * 1000:9.1f} ms   "
+            f"p99 {stats['p99'] * 1000:9.1f} ms"
+        )
+    throughput = summary["throughput"]
+    print(
+        f"  {name:<16} {throughput['input_mb_per_second'] or 0:.2f} MB/s, "
+        f"{throughput['cards_per_second'] or 0:.1f} cards/s, "
+        f"peak RSS {summary['peak_rss_mb']} MB "
+        f"(parse workers {summary['peak_children_rss_mb']} MB), "
+        f"LLM concurrency limit {summary['llm_concurrency_limit']:.1f}, "
+        f"hedges {summary['llm_hedges']['won']:.0f}/"
+        f"{summary['llm_hedges']['fired']:.0f} won"
+    )
+
+
+def _print_comparison(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    print(f"Compared with {baseline.get('commit')} ({baseline.get('timestamp')}):")
+    for name, summary in current["scenarios"].items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None or "stages" not in old or "stages" not in summary:
+            continue
+        for stage, stats in summary["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if old_stats is None:
+                continue
+            changes = []
+            for key in ("p50", "p95", "p99"):
+                if old_stats.get(key):
+                    change = (stats[key] - old_stats[key]) / old_stats[key] * 100
+                    changes.append(f"{key} {change:+6.1f}%")
+            print(f"  {name:<16} {stage:<10} {'   '.join(changes)}")
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the flashcard pipeline with a fake LLM."
+    )
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument(
+        "--warmup", type=int, default=1, help="Untimed runs before each scenario"
+    )
+    parser.add_argument(
+        "--scenarios", nargs="+", help="Scenarios to run (default: all)"
+    )
+    parser.add_argument(
+        "--pages", type=int, default=200, help="Size of the synthetic documents"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Fake LLM seconds to first token"
+    )
+    parser.add_argument(
+        "--seconds-per-kchar",
+        type=float,
+        default=0.0,
+        help="Fake LLM generation time per 1000 output characters",
+    )
+    parser.add_argument("--cards", type=int, default=20, help="Cards per call")
+    parser.add_argument("--answer-chars", type=int, default=200)
+    parser.add_argument(
+        "--max-concurrent",
+        type=int,
+        default=0,
+        help="Fake LLM answers 429 above this many calls in flight (0: no limit)",
+    )
+    parser.add_argument(
+        "--throttle-rate",
+        type=float,
+        default=0.0,
+        help="Share of fake LLM calls answered with 429 at random",
+    )
+    parser.add_argument(
+        "--tail-rate",
+        type=float,
+        default=0.0,
+        help="Share of fake LLM calls that are slowed by --tail-latency",
+    )
+    parser.add_argument(
+        "--tail-latency",
+        type=float,
+        default=0.0,
+        help="Extra seconds to first token of the slow fake LLM calls",
+    )
+    parser.add_argument("-o", "--output", help="Results file (default: results/)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--log-level", default="WARNING")
+    return parser
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,44 @@
 from __future__ import annotations
 
 from pydantic import BaseModel
-from typing import List, Optional, Union
-from fastapi import FastAPI, Request, UploadFile, Form, File
+from typing import Callable, List, Optional, Union
+from fastapi import FastAPI, Request, UploadFile, Form, File, HTTPException
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from functools import partial
+import json
 import os
+import time
 
-# USE THIS
-from src.backend.models.user_form import UserForm
-from src.backend.ai import run
+from backend.models.user_form import UserForm
+from backend.models import Deck, PipelineSettings
+from backend.ai import arun
+from backend.jobs import JobQueue, JobStatus, QueueFullError
+from backend.artifacts import ArtifactStore, compute_job_key
+from backend.cache import (
+    MemoryLRUBackend,
+    ParseCache,
+    ResponseCache,
+    SQLiteBlobStore,
+)
+from backend.ingest import (
+    RequestBodyLimitMiddleware,
+    UploadSpool,
+    UploadTooLargeError,
+)
+from backend.logs import configure_logging
+from backend.metrics import metrics_registry
 
 from dotenv import load_dotenv
 
 load_dotenv()
+configure_logging()
 
 
 app = FastAPI()
@@ -24,6 +49,137 @@ templates = Jinja2Templates(directory="src/frontend/templates")
 app.mount("/public", StaticFiles(directory="public"), name="public")
 app.mount("/static", StaticFiles(directory="./src/frontend/static"), name="static")
 
+job_queue = JobQueue(
+    max_workers=int(os.getenv("FLASHCARD_WORKERS", "4")),
+    max_pending=int(os.getenv("FLASHCARD_MAX_PENDING", "100")),
+)
+
+artifact_store = ArtifactStore(
+    os.getenv("FLASHCARD_ARTIFACT_DIR", "artifacts"),
+    ttl=float(os.getenv("FLASHCARD_ARTIFACT_TTL", str(24 * 3600))),
+)
+
+pipeline_settings = PipelineSettings.from_env()
+
+parse_cache = ParseCache(
+    SQLiteBlobStore(
+        os.getenv("FLASHCARD_PARSE_CACHE_PATH", "cache/parse_cache.sqlite3"),
+        max_bytes=int(
+            os.getenv("FLASHCARD_PARSE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+        ),
+    )
+)
+
+
+CLEANER_MODEL = "gemini-1.5-pro"
+FLASHCARDER_MODEL = "gemini-1.5-pro"
+
+# Uploads are streamed to a per-job directory under here and parsed from disk
+SPOOL_DIR = os.getenv("FLASHCARD_SPOOL_DIR", "cache/spool")
+MAX_FILE_BYTES = int(os.getenv("FLASHCARD_MAX_FILE_BYTES", str(100 * 1024 * 1024)))
+MAX_REQUEST_BYTES = int(
+    os.getenv("FLASHCARD_MAX_REQUEST_BYTES", str(250 * 1024 * 1024))
+)
+# Room for the other form fields and the multipart framing around the files
+MULTIPART_OVERHEAD_BYTES = 1024 * 1024
+
+# Stops an oversized /build body while it is received, before Starlette has
+# spooled all of it; UploadSpool then checks each file against its own limit
+app.add_middleware(
+    RequestBodyLimitMiddleware,
+    max_bytes=MAX_REQUEST_BYTES + MULTIPART_OVERHEAD_BYTES,
+    paths=["/build"],
+)
+
+
+def _make_cleaner_cache() -> ResponseCache:
+    backend = os.getenv("FLASHCARD_CLEANER_CACHE", "memory")
+    ttl = float(os.getenv("FLASHCARD_CLEANER_CACHE_TTL", str(24 * 3600)))
+    if backend == "sqlite":
+        return ResponseCache(
+            SQLiteBlobStore(
+                os.getenv(
+                    "FLASHCARD_CLEANER_CACHE_PATH", "cache/cleaner_cache.sqlite3"
+                ),
+                ttl=ttl,
+            )
+        )
+    if backend == "memory":
+        return ResponseCache(MemoryLRUBackend(ttl=ttl))
+    raise ValueError(f"Unknown FLASHCARD_CLEANER_CACHE backend: {backend}")
+
+
+cleaner_cache = _make_cleaner_cache()
+
+# Add Server-Timing headers (total handler time, plus queue and stage times
+# on job responses) for browser dev tools and load tests
+SERVER_TIMING = os.getenv("FLASHCARD_SERVER_TIMING", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+@app.middleware("http")
+async def add_server_timing(request: Request, call_next):
+    if not SERVER_TIMING:
+        return await call_next(request)
+
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    metrics = [f"app;dur={elapsed_ms:.1f}"]
+    job_timings = getattr(request.state, "job_timings", {})
+    metrics.extend(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in job_timings.items()
+    )
+    response.headers["Server-Timing"] = ", ".join(metrics)
+    return response
+
+
+def _get_job(request: Request, job_id: str):
+    """Look up a job or raise 404, exposing its timings to ``add_server_timing``."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    request.state.job_timings = dict(job.timings)
+    return job
+
+
+@app.on_event("startup")
+def evict_expired_artifacts():
+    artifact_store.evict_expired()
+
+
+@app.on_event("startup")
+def remove_stale_spools():
+    # Left behind by jobs that were still queued when the server stopped
+    UploadSpool.remove_stale(SPOOL_DIR, max_age=24 * 3600)
+
+
+@app.on_event("shutdown")
+async def shutdown_job_queue():
+    await job_queue.shutdown(wait=False)
+
+
+async def _generate(data: UserForm, spool: UploadSpool, on_stage, on_card) -> dict:
+    try:
+        return await arun(
+            data,
+            os.getenv("GOOGLE_API_KEY"),
+            cleaner_model=CLEANER_MODEL,
+            flashcarder_model=FLASHCARDER_MODEL,
+            on_stage=on_stage,
+            on_card=on_card,
+            artifact_store=artifact_store,
+            settings=pipeline_settings,
+            parse_cache=parse_cache,
+            cleaner_cache=cleaner_cache,
+        )
+    finally:
+        spool.cleanup()
+
 
 @app.get("/")
 def get_form(request: Request):
@@ -31,7 +187,7 @@ def get_form(request: Request):
 
 
 @app.post("/build")
-def make_cards(
+async def make_cards(
     request: Request,
     course_name: str = Form(...),
     difficulty: str = Form(...),
@@ -47,6 +203,14 @@ def make_cards(
         else None
     )
 
+    # UploadFiles are closed once the response is sent, so the job needs its own
+    # copy. It is streamed to disk rather than held in memory
+    spool = UploadSpool(SPOOL_DIR, MAX_FILE_BYTES, MAX_REQUEST_BYTES)
+    try:
+        subject_material = await spool.add_all(subject_material)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
     data = UserForm(
         course_name=course_name,
         difficulty=difficulty,
@@ -57,17 +221,163 @@ def make_cards(
         num_flash_cards=num_flash_cards,
     )
 
-    # flash_cards = "sample.txt"
+    # Identical submissions made while one is still running share its job
+    job_key = compute_job_key(
+        data, CLEANER_MODEL, FLASHCARDER_MODEL, pipeline_settings.output_settings()
+    )
+    try:
+        job = job_queue.submit(partial(_generate, data, spool), key=job_key)
+    except QueueFullError as e:
+        spool.cleanup()
+        raise HTTPException(status_code=503, detail=str(e))
+    if job.submissions > 1:
+        # The running job has its own copy of these files
+        spool.cleanup()
 
-    flash_cards = run(
-        data,
-        os.getenv("GOOGLE_API_KEY"),
-        cleaner_model="gemini-1.5-pro",
-        flashcarder_model="gemini-1.5-pro",
-    ).get("flashcards_file_path")
+    if "application/json" in request.headers.get("accept", ""):
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": job.job_id,
+                "status_url": f"/jobs/{job.job_id}",
+                "result_url": f"/jobs/{job.job_id}/result",
+                "events_url": f"/jobs/{job.job_id}/events",
+            },
+        )
 
     return templates.TemplateResponse(
         request=request,
         name="flashcards.html",
-        context={"Settings": data, "flashcards": flash_cards},
+        context={"Settings": data, "job_id": job.job_id},
+    )
+
+
+@app.get("/jobs/{job_id}")
+def get_job_status(request: Request, job_id: str):
+    return _get_job(request, job_id).to_dict()
+
+
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def _format_sse(event: dict) -> str:
+    return (
+        f"id: {event['id']}\n"
+        f"event: {event['event']}\n"
+        f"data: {json.dumps(event['data'])}\n\n"
+    )
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(request: Request, job_id: str):
+    """Stream a job's stage changes and flashcards as Server-Sent Events.
+
+    Reconnecting clients send ``Last-Event-ID`` and resume after that event.
+    The stream ends after the ``done`` or ``error`` event.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+    last_event_id = request.headers.get("last-event-id", "")
+    cursor = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+
+    async def events():
+        nonlocal cursor
+        while True:
+            if await request.is_disconnected():
+                return
+            new_events = await job.wait_for_events(cursor, SSE_KEEPALIVE_SECONDS)
+            if not new_events:
+                if job.is_finished:
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event in new_events:
+                yield _format_sse(event)
+            cursor += len(new_events)
+            if new_events[-1]["event"] in ("done", "error"):
+                return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/jobs/{job_id}/result")
+def get_job_result(request: Request, job_id: str):
+    job = _get_job(request, job_id)
+
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JobStatus.SUCCEEDED:
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    return {"job_id": job.job_id, "deck": job.result["deck"].model_dump()}
+
+
+def _deck_response(
+    request: Request, job_id: str, render: Callable[[Deck, dict], Response]
+) -> Response:
+    """Serve a finished job's deck through ``render`` with caching headers.
+
+    Answers 202 while the job is still running, 500 with the error if it
+    failed, 304 when the client's copy is current and 410 once the artifact
+    has expired.
+    """
+    job = _get_job(request, job_id)
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != JobStatus.SUCCEEDED:
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    # Artifacts are content-addressed, so the key doubles as a strong ETag
+    artifact_key = job.result.get("artifact_key")
+    etag = f'"{artifact_key}"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"private, max-age={int(artifact_store.ttl)}, immutable",
+    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    compact_deck = artifact_store.get(artifact_key)
+    if compact_deck is None:
+        raise HTTPException(status_code=410, detail="Flashcards have expired")
+    return render(Deck.from_compact(compact_deck), headers)
+
+
+@app.get("/flashcards/{job_id}")
+def get_flashcards(request: Request, job_id: str):
+    return _deck_response(
+        request,
+        job_id,
+        lambda deck, headers: JSONResponse(content=deck.model_dump(), headers=headers),
+    )
+
+
+@app.get("/flashcards/{job_id}/export/tsv")
+def export_flashcards_tsv(request: Request, job_id: str):
+    """Download the deck as tab-separated text for Quizlet or Anki import."""
+
+    def render(deck: Deck, headers: dict) -> Response:
+        headers["Content-Disposition"] = 'attachment; filename="flashcards.tsv"'
+        return Response(
+            content=deck.to_tsv(),
+            media_type="text/tab-separated-values; charset=utf-8",
+            headers=headers,
+        )
+
+    return _deck_response(request, job_id, render)
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Pipeline and job queue metrics in the Prometheus text format."""
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
     )
@@ -1,5 +1,26 @@
+from .chain_registry import ChainRegistry, chain_registry
+from .llm_scheduler import (
+    LLMScheduler,
+    ModelRateLimits,
+    get_llm_scheduler,
+    set_llm_scheduler,
+)
+from .call_policy import InvalidLLMResponseError, LLMCallPolicy
 from .cleaner.cleaner_chain import CleanerChain
 from .flashcarder.flashcarder_chain import FlashcarderChain
-from .ai_orchestrator import run
+from .ai_orchestrator import arun, run
 
-__all__ = ["CleanerChain", "FlashcarderChain", "run"]
+__all__ = [
+    "ChainRegistry",
+    "chain_registry",
+    "LLMScheduler",
+    "ModelRateLimits",
+    "get_llm_scheduler",
+    "set_llm_scheduler",
+    "InvalidLLMResponseError",
+    "LLMCallPolicy",
+    "CleanerChain",
+    "FlashcarderChain",
+    "arun",
+    "run",
+]
@@ -1,125 +1,796 @@
 from __future__ import annotations
 
-from typing import List, TYPE_CHECKING
-import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import asyncio
+import math
+import multiprocessing
+import threading
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    TYPE_CHECKING,
+)
 from pathlib import Path
 import time
 
-from backend.ai import CleanerChain, FlashcarderChain
-from backend.models import UserFormReg
+from backend.ai import CleanerChain, FlashcarderChain, chain_registry
+from backend.ai.call_policy import LLMCallPolicy
+from backend.ai.chunking import chunk_segments
+from backend.ai.cleaner.pre_cleaner import pre_clean_segments, quality_score
+from backend.ai.token_budget import plan_flashcarder
+from backend.ai.flashcarder.reducer import (
+    FlashcardDeduplicator,
+    allocate_card_budget,
+    merge_flashcards,
+    validate_flashcards,
+)
+from backend.artifacts import ArtifactStore, compute_job_key
+from backend.logs import SAMPLED, get_logger
+from backend.metrics.pipeline_metrics import (
+    CLEANER_SKIPPED,
+    LLM_ERRORS,
+    LLM_REQUEST_SECONDS,
+    PARSE_SECONDS,
+    PARSED_CHARS,
+    PARSED_FILES,
+    STAGE_SECONDS,
+    record_cache_lookup,
+    record_llm_io,
+)
+from backend.ingest import SpooledUpload, upload_sha256
+from backend.cache import (
+    CountingCache,
+    MemoryLRUBackend,
+    ParseCache,
+    ResponseCache,
+    SQLiteBlobStore,
+)
+from backend.models import (
+    Deck,
+    Flashcard,
+    ParsedDocument,
+    PipelineSettings,
+    UserFormReg,
+)
+from backend.prompts import (
+    CLEANER_HUMAN_PROMPT,
+    CLEANER_SYSTEM_PROMPT,
+    FLASHCARDER_HUMAN_PROMPT,
+    FLASHCARDER_SYSTEM_PROMPT,
+)
 
 if TYPE_CHECKING:
     from backend.models import UserForm
     from fastapi import UploadFile
 
+logger = get_logger(__name__)
+
 
 def run(
     user_form: UserForm,
     api_key: str,
     cleaner_model: str | None = "gemini-2.0-flash-thinking-exp-01-21",
     flashcarder_model: str | None = "gemini-2.0-pro-exp-02-05",
-) -> dict[str, str]:
+    on_stage: Callable[[str], None] | None = None,
+    artifact_store: ArtifactStore | None = None,
+    settings: PipelineSettings | None = None,
+    parse_cache: ParseCache | None = None,
+    cleaner_cache: ResponseCache | None = None,
+    on_card: Callable[[Flashcard], None] | None = None,
+) -> Dict[str, Any]:
+    """Blocking wrapper around ``arun`` for callers without an event loop.
+
+    Takes the same arguments and returns the same dictionary as ``arun``.
+    Must not be called from a thread that is already running an event loop.
+    """
+    return asyncio.run(
+        arun(
+            user_form,
+            api_key,
+            cleaner_model=cleaner_model,
+            flashcarder_model=flashcarder_model,
+            on_stage=on_stage,
+            artifact_store=artifact_store,
+            settings=settings,
+            parse_cache=parse_cache,
+            cleaner_cache=cleaner_cache,
+            on_card=on_card,
+        )
+    )
+
+
+async def arun(
+    user_form: UserForm,
+    api_key: str,
+    cleaner_model: str | None = "gemini-2.0-flash-thinking-exp-01-21",
+    flashcarder_model: str | None = "gemini-2.0-pro-exp-02-05",
+    on_stage: Callable[[str], None] | None = None,
+    artifact_store: ArtifactStore | None = None,
+    settings: PipelineSettings | None = None,
+    parse_cache: ParseCache | None = None,
+    cleaner_cache: ResponseCache | None = None,
+    on_card: Callable[[Flashcard], None] | None = None,
+) -> Dict[str, Any]:
+    """Run the parse -> clean -> flashcard pipeline for a submitted form.
+
+    LLM calls are awaited rather than run on threads, so one event loop can
+    drive many pipelines at once. Parsing runs in a worker thread that hands
+    files to the parse process pool.
+
+    Args:
+        user_form: Form settings and uploaded subject material
+        api_key: API key for the LLM provider
+        cleaner_model: Model used by the cleaner chain. ``settings`` can
+            list models to fall back to
+        flashcarder_model: Model used by the flashcarder chain. ``settings``
+            can list models to fall back to
+        on_stage: Optional callback invoked with "parse", "clean" and
+            "flashcard" as each stage starts
+        artifact_store: Store the flashcards are written to. Defaults to the
+            project's ``artifacts`` directory
+        settings: Pipeline tuning knobs. Defaults to ``PipelineSettings()``
+        parse_cache: Cache of parsed documents. Defaults to the project's
+            ``cache`` directory
+        cleaner_cache: Cache of cleaner responses. Defaults to an in-memory LRU
+        on_card: Optional callback invoked with each ``Flashcard`` as soon as
+            it is available. In "single" flashcarder mode the model output is
+            streamed, so cards arrive while the model is still generating
 
+    Returns:
+        Dictionary with the deck file path, the ``Deck`` and the artifact key
+    """
     if api_key is None or api_key == "":
         raise ValueError("api_key can not be none: Received: {api_key}")
 
-    subject_material = _run_parsing(user_form.subject_material)
-    cleaned_text = _run_cleaner(subject_material, api_key, cleaner_model)
-    flashcards = _run_flashcarder(cleaned_text, user_form, api_key, flashcarder_model)
-    public_dir = _get_public_dir()
-    flashcards_file_path = public_dir / "flashcards.txt"
-    with open(flashcards_file_path, "w") as f:
-        f.write(flashcards)
+    if on_stage is None:
+        on_stage = lambda stage: None
+
+    if artifact_store is None:
+        artifact_store = _get_default_artifact_store()
+
+    if settings is None:
+        settings = PipelineSettings()
+
+    if parse_cache is None:
+        parse_cache = _get_default_parse_cache()
+
+    if cleaner_cache is None:
+        cleaner_cache = _get_default_cleaner_cache()
+
+    artifact_key = compute_job_key(
+        user_form, cleaner_model, flashcarder_model, settings.output_settings()
+    )
+    cached_deck = await asyncio.to_thread(artifact_store.get, artifact_key)
+    record_cache_lookup("artifact", cached_deck is not None)
+    if cached_deck is not None:
+        logger.info("Reusing flashcards from artifact %s", artifact_key)
+        deck = Deck.from_compact(cached_deck)
+        if on_card is not None:
+            for card in deck.flashcards:
+                on_card(card)
+        return {
+            "flashcards_file_path": str(artifact_store.path_for(artifact_key)),
+            "deck": deck,
+            "artifact_key": artifact_key,
+        }
+
+    if settings.pipeline_mode == "pipelined":
+        with STAGE_SECONDS.labels("pipeline").time():
+            flashcards = await _run_pipelined(
+                user_form,
+                api_key,
+                cleaner_model,
+                flashcarder_model,
+                settings,
+                parse_cache,
+                cleaner_cache,
+                on_stage,
+                on_card,
+            )
+    else:
+        flashcards = await _run_staged(
+            user_form,
+            api_key,
+            cleaner_model,
+            flashcarder_model,
+            settings,
+            parse_cache,
+            cleaner_cache,
+            on_stage,
+            on_card,
+        )
+    deck = Deck(flashcards=flashcards)
+    flashcards_file_path = await asyncio.to_thread(
+        artifact_store.put, artifact_key, deck.to_compact()
+    )
+
+    return {
+        "flashcards_file_path": str(flashcards_file_path),
+        "deck": deck,
+        "artifact_key": artifact_key,
+    }
+
+
+async def _run_staged(
+    user_form: UserForm,
+    api_key: str,
+    cleaner_model: str,
+    flashcarder_model: str,
+    settings: PipelineSettings,
+    parse_cache: ParseCache,
+    cleaner_cache: ResponseCache,
+    on_stage: Callable[[str], None],
+    on_card: Callable[[Flashcard], None] | None,
+) -> List[Flashcard]:
+    """Parse every file, then clean everything, then generate the flashcards."""
+    on_stage("parse")
+    with STAGE_SECONDS.labels("parse").time():
+        documents = await asyncio.to_thread(
+            _run_parsing,
+            user_form.subject_material,
+            parse_cache,
+            settings.parse_workers,
+        )
+    on_stage("clean")
+    with STAGE_SECONDS.labels("clean").time():
+        cleaned_chunks = await _run_cleaner(
+            documents, api_key, cleaner_model, settings, cleaner_cache
+        )
+    on_stage("flashcard")
+    with STAGE_SECONDS.labels("flashcard").time():
+        return await _run_flashcard_stage(
+            cleaned_chunks, user_form, api_key, flashcarder_model, settings, on_card
+        )
+
+
+async def _run_pipelined(
+    user_form: UserForm,
+    api_key: str,
+    cleaner_model: str,
+    flashcarder_model: str,
+    settings: PipelineSettings,
+    parse_cache: ParseCache,
+    cleaner_cache: ResponseCache,
+    on_stage: Callable[[str], None],
+    on_card: Callable[[Flashcard], None] | None,
+) -> List[Flashcard]:
+    """Parse, clean and generate flashcards with the stages overlapping.
+
+    Parsed documents are cut into chunks that go through a queue of at most
+    ``pipeline_queue_size`` chunks to ``cleaner_concurrency`` cleaner
+    workers. Each cleaned chunk is handed straight to the flashcarder (at
+    most ``flashcarder_concurrency`` calls at once) while later chunks are
+    still being parsed and cleaned, so the total time approaches that of
+    the slowest stage rather than the sum of all three.
+
+    Card budgets are split by chunk length once parsing is done, and the
+    chunks' cards are merged in document order at the end, as in
+    "map_reduce" mode. Each stage is reported through ``on_stage`` when its
+    first chunk reaches it.
+    """
+    total_cards = user_form.num_flash_cards
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[int | None] = asyncio.Queue(
+        maxsize=max(1, settings.pipeline_queue_size)
+    )
+    chunks: List[str] = []
+    cleaned: Dict[int, str] = {}
+    flashcard_tasks: Dict[int, asyncio.Future] = {}
+    budgets: asyncio.Future = loop.create_future()
+    flashcarder_limit = asyncio.Semaphore(max(1, settings.flashcarder_concurrency))
+    workers = max(1, settings.cleaner_concurrency)
+    skipped = 0
+    started_stages: List[str] = []
+
+    def start_stage(stage: str) -> None:
+        if stage not in started_stages:
+            started_stages.append(stage)
+            on_stage(stage)
+
+    async def produce() -> None:
+        pieces = _iter_cleaner_chunks(user_form.subject_material, parse_cache, settings)
+        # Chunks are pulled one at a time, so a full queue pauses pre-cleaning
+        # and chunking until the cleaner catches up
+        while (chunk := await asyncio.to_thread(next, pieces, None)) is not None:
+            chunks.append(chunk)
+            await queue.put(len(chunks) - 1)
+        budgets.set_result(
+            allocate_card_budget([len(chunk) for chunk in chunks], total_cards)
+        )
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def generate(index: int) -> List[Flashcard]:
+        budget = (await budgets)[index]
+        start_stage("flashcard")
+        return await _generate_chunk_cards(
+            cleaned[index],
+            budget,
+            user_form,
+            api_key,
+            flashcarder_model,
+            settings,
+            flashcarder_limit,
+        )
+
+    async def clean() -> None:
+        nonlocal skipped
+        while (index := await queue.get()) is not None:
+            start_stage("clean")
+            cleaned[index], was_skipped = await _clean_or_skip(
+                chunks[index], api_key, cleaner_model, settings, cleaner_cache
+            )
+            skipped += was_skipped
+            flashcard_tasks[index] = asyncio.ensure_future(generate(index))
+
+    start_stage("parse")
+    tasks = [asyncio.ensure_future(produce())]
+    tasks.extend(asyncio.ensure_future(clean()) for _ in range(workers))
+    try:
+        await asyncio.gather(*tasks)
+        logger.info(
+            "Pipelined %d chunks; LLM cleaner skipped for %d", len(chunks), skipped
+        )
+        chunk_cards = await asyncio.gather(
+            *(flashcard_tasks[index] for index in range(len(chunks)))
+        )
+    finally:
+        for task in [*tasks, *flashcard_tasks.values()]:
+            task.cancel()
+
+    # Report every stage even when there was nothing to clean
+    start_stage("clean")
+    start_stage("flashcard")
+    ordered = [cleaned[index] for index in range(len(chunks))]
+    flashcards = await _merge_chunk_cards(
+        ordered,
+        chunk_cards,
+        budgets.result(),
+        total_cards,
+        lambda chunk, budget: _generate_chunk_cards(
+            chunk,
+            budget,
+            user_form,
+            api_key,
+            flashcarder_model,
+            settings,
+            flashcarder_limit,
+        ),
+        settings,
+    )
+    if on_card is not None:
+        for card in flashcards:
+            on_card(card)
+    return flashcards
+
+
+def _iter_cleaner_chunks(
+    subject_material: List[UploadFile],
+    parse_cache: ParseCache | None,
+    settings: PipelineSettings,
+) -> Iterator[str]:
+    """Parse, pre-clean and chunk the uploads one document at a time."""
+    for document in _iter_parsing(
+        subject_material, parse_cache, settings.parse_workers
+    ):
+        segments = document.segments
+        if settings.pre_clean:
+            segments = pre_clean_segments(segments)
+        yield from chunk_segments(segments, settings.max_chunk_chars)
+
+
+async def _run_flashcard_stage(
+    cleaned_chunks: List[str],
+    user_form: UserForm,
+    api_key: str,
+    flashcarder_model: str,
+    settings: PipelineSettings,
+    on_card: Callable[[Flashcard], None] | None = None,
+) -> List[Flashcard]:
+    """Plan the flashcarder calls against the token budget and run them.
+
+    Raises:
+        ValueError: If ``flashcarder_mode`` is "single" and the request does
+            not fit one call
+    """
+    material = "\n\n".join(cleaned_chunks)
+    plan = plan_flashcarder(
+        material,
+        _flashcarder_prompt_overhead(user_form),
+        flashcarder_model,
+        user_form.num_flash_cards,
+        settings.max_chunk_chars,
+    )
+    mode = (
+        plan.mode if settings.flashcarder_mode == "auto" else settings.flashcarder_mode
+    )
+    logger.info(
+        "Flashcarder token budget for %s: material ~%d tokens, prompt ~%d, "
+        "output ~%d (reserve %d), room for %d of %d -> %s (%s)",
+        flashcarder_model,
+        plan.input_tokens,
+        plan.prompt_overhead_tokens,
+        plan.output_needed_tokens,
+        plan.output_reserve_tokens,
+        plan.max_input_tokens,
+        plan.context_window,
+        mode,
+        plan.reason,
+    )
+    if mode == "single" and plan.mode == "map_reduce":
+        raise ValueError(
+            f"Flashcarder request does not fit one call to {flashcarder_model} "
+            f"({plan.reason}); use flashcarder_mode 'auto' or 'map_reduce'"
+        )
 
-    return {"flashcards_file_path": str(flashcards_file_path), "flashcards": flashcards}
+    if mode == "map_reduce":
+        flashcards = await _run_flashcarder_map_reduce(
+            cleaned_chunks,
+            user_form,
+            api_key,
+            flashcarder_model,
+            settings,
+            plan.max_chunk_chars,
+        )
+        # Cards are only final once every chunk is merged and deduplicated
+        if on_card is not None:
+            for card in flashcards:
+                on_card(card)
+    else:
+        flashcards = await _run_flashcarder(
+            material,
+            user_form,
+            api_key,
+            flashcarder_model,
+            settings,
+            on_card=on_card,
+        )
+    return flashcards
 
 
-def _run_parsing(subject_material: List[UploadFile]) -> str:
+def _run_parsing(
+    subject_material: List[UploadFile],
+    parse_cache: ParseCache | None = None,
+    parse_workers: int = 1,
+) -> List[ParsedDocument]:
     """Parse documents from uploaded files using the appropriate parser strategy.
 
     Args:
         subject_material: List of UploadFile objects containing documents
+        parse_cache: Optional cache consulted before parsing each file
+        parse_workers: Size of the process pool files are parsed in. With 1,
+            files are parsed one after another in the calling thread
 
     Returns:
-        Combined text extracted from all documents
+        Parsed documents, in upload order, split into page/slide/section segments
+    """
+    return list(_iter_parsing(subject_material, parse_cache, parse_workers))
+
+
+def _iter_parsing(
+    subject_material: List[UploadFile],
+    parse_cache: ParseCache | None = None,
+    parse_workers: int = 1,
+) -> Iterator[ParsedDocument]:
+    """Yield each parsed document, in upload order, as soon as it is ready.
+
+    Takes the same arguments as ``_run_parsing``. Every file is dispatched
+    on the first ``next()``; files that cannot be parsed are skipped, and
+    ``ValueError`` is raised at the end if none could be.
     """
     if not subject_material:
         raise ValueError("No subject material provided")
 
-    # Extract text from each file and combine
-    combined_texts = []
+    documents = []
     parsing_errors = []
     successful_files = []
 
-    for upload_file in subject_material:
-        try:
-            # Reset file pointer first to ensure we can read from the beginning
-            upload_file.file.seek(0)
+    # Dispatch every file before collecting any result so a multi-file upload
+    # takes about as long as its slowest file
+    executor = _get_parse_executor(parse_workers)
+    pending = [
+        _start_parse(upload_file, parse_cache, executor)
+        for upload_file in subject_material
+    ]
 
-            # Get appropriate parser for this file type and parse it
-            from backend.parsers import parse_document
-
-            extracted_text = parse_document(upload_file=upload_file)
+    for upload_file, (future, cache_key, parser_name) in zip(subject_material, pending):
+        try:
+            segments, parse_seconds = future.result()
+            if parse_seconds is not None:
+                PARSE_SECONDS.labels(parser_name).observe(parse_seconds)
+            if cache_key is not None:
+                _put_in_cache(parse_cache, "parse", cache_key, segments)
 
-            if extracted_text:
-                combined_texts.append(extracted_text)
+            if any(segments):
+                document = ParsedDocument(
+                    filename=upload_file.filename, segments=segments
+                )
+                documents.append(document)
                 successful_files.append(upload_file.filename)
-                print(
-                    f"Successfully parsed {upload_file.filename}: {len(extracted_text)} chars extracted"
+                yield document
+                PARSED_FILES.labels(
+                    parser_name, "ok" if parse_seconds is not None else "cached"
+                ).inc()
+                PARSED_CHARS.labels(parser_name).inc(len(document.text))
+                logger.info(
+                    "Parsed %s: %d chars extracted",
+                    upload_file.filename,
+                    len(document.text),
+                    extra=SAMPLED,
                 )
             else:
+                PARSED_FILES.labels(parser_name, "empty").inc()
                 parsing_errors.append(
                     f"No text could be extracted from {upload_file.filename}"
                 )
 
-            # Reset file pointer after reading
-            upload_file.file.seek(0)
-
         except ValueError as e:
             # Unsupported file type or parsing error
+            PARSED_FILES.labels(parser_name, "error").inc()
             error_msg = f"Could not parse file {upload_file.filename}: {str(e)}"
             parsing_errors.append(error_msg)
-            print(f"Warning: {error_msg}")
+            logger.warning(error_msg)
             continue
 
         except Exception as e:
             # Other unexpected errors
+            if isinstance(e, BrokenProcessPool):
+                _reset_parse_executor()
+            PARSED_FILES.labels(parser_name, "error").inc()
             error_msg = f"Error parsing file {upload_file.filename}: {str(e)}"
             parsing_errors.append(error_msg)
-            print(f"Error: {error_msg}")
+            logger.error(error_msg)
             continue
 
-    if not combined_texts and parsing_errors:
+    if not documents and parsing_errors:
         # If no text was extracted but errors occurred, raise an error
         raise ValueError(
             f"Failed to extract text from any files. Errors: {'; '.join(parsing_errors)}"
         )
 
-    print(
-        f"Successfully parsed {len(successful_files)} files: {', '.join(successful_files)}"
+    logger.info(
+        "Parsed %d files (%d chars): %s",
+        len(successful_files),
+        sum(len(doc.text) for doc in documents),
+        ", ".join(successful_files),
     )
-    print(f"Combined content length: {sum(len(text) for text in combined_texts)} chars")
+    if parse_cache is not None:
+        logger.debug("Parse cache: %s", parse_cache.stats())
 
-    # Join all extracted text with double newlines to separate content from different files
-    return "\n\n".join(combined_texts)
 
+def _put_in_cache(cache: CountingCache, name: str, key: str, value: Any) -> None:
+    """Store ``value``, logging a failure instead of raising it.
 
-def _run_cleaner(
-    subject_material: str,
+    A full disk or a locked database should not fail work that succeeded; the
+    result just goes uncached.
+    """
+    try:
+        cache.put(key, value)
+    except Exception as e:
+        logger.warning("Could not write to the %s cache: %s", name, e)
+
+
+def _start_parse(
+    upload_file: UploadFile,
+    parse_cache: ParseCache | None,
+    executor: ProcessPoolExecutor | None,
+) -> Tuple[Future, str | None, str]:
+    """Start parsing one upload.
+
+    Returns:
+        A future for the file's segments and parse time in seconds (None for
+        cache hits), the parse cache key the result should be stored under
+        (None for cache hits or when caching is off), and the parser's name.
+        Errors are delivered through the future.
+    """
+    from backend.parsers import get_parser_for_upload_file
+
+    future: Future = Future()
+    parser_name = "unsupported"
+    try:
+        parser_cls = get_parser_for_upload_file(upload_file)
+        parser_name = parser_cls.__name__
+
+        # The upload is hashed in blocks, so a cache hit never reads it whole
+        cache_key = None
+        if parse_cache is not None:
+            cache_key = ParseCache.key_for_hash(upload_sha256(upload_file), parser_cls)
+            segments = parse_cache.get(cache_key)
+            record_cache_lookup("parse", segments is not None)
+            if segments is not None:
+                future.set_result((segments, None))
+                return future, None, parser_name
+
+        # Spooled uploads are parsed straight from disk; anything else is
+        # read into memory once and sent to the worker as bytes
+        if isinstance(upload_file, SpooledUpload):
+            source = {"file_path": str(upload_file.path)}
+        else:
+            upload_file.file.seek(0)
+            source = {"file_bytes": upload_file.file.read()}
+            upload_file.file.seek(0)
+
+        if executor is None:
+            future.set_result(_timed_parse(file_name=upload_file.filename, **source))
+            return future, cache_key, parser_name
+
+        return (
+            executor.submit(_timed_parse, file_name=upload_file.filename, **source),
+            cache_key,
+            parser_name,
+        )
+    except Exception as e:
+        future.set_exception(e)
+        return future, None, parser_name
+
+
+def _timed_parse(
+    file_name: str, file_bytes: bytes | None = None, file_path: str | None = None
+) -> Tuple[List[str], float]:
+    """Parse a file into segments, timed where it runs rather than while queued."""
+    from backend.parsers import parse_document_segments
+
+    started = time.perf_counter()
+    segments = parse_document_segments(
+        file_path=file_path, file_bytes=file_bytes, file_name=file_name
+    )
+    return segments, time.perf_counter() - started
+
+
+async def _run_cleaner(
+    documents: List[ParsedDocument],
+    api_key: str,
+    cleaner_model: str,
+    settings: PipelineSettings,
+    cleaner_cache: ResponseCache | None = None,
+) -> List[str]:
+    """Clean the parsed documents and return the cleaned text in chunks.
+
+    In "single" mode there is one chunk per document. In "chunked" mode
+    there is one cleaned chunk per input chunk, in order. At most
+    ``cleaner_concurrency`` requests are in flight, and chunks the local
+    pre-cleaner leaves in good enough shape skip the LLM entirely.
+    """
+    if settings.pre_clean:
+        documents = await asyncio.to_thread(_pre_clean_documents, documents)
+
+    limit = asyncio.Semaphore(max(1, settings.cleaner_concurrency))
+    skipped = 0
+
+    async def clean(text: str) -> str:
+        nonlocal skipped
+        async with limit:
+            cleaned_text, was_skipped = await _clean_or_skip(
+                text, api_key, cleaner_model, settings, cleaner_cache
+            )
+        skipped += was_skipped
+        return cleaned_text
+
+    if settings.cleaner_mode == "single":
+        texts = [doc.text for doc in documents]
+    else:
+        texts = chunk_segments(
+            (segment for doc in documents for segment in doc.segments),
+            settings.max_chunk_chars,
+        )
+        logger.info(
+            "Cleaning %d chunks with concurrency %d",
+            len(texts),
+            settings.cleaner_concurrency,
+        )
+    # gather() returns results in submission order, so the chunks stitch back in order
+    cleaned = list(await asyncio.gather(*(clean(text) for text in texts)))
+    logger.info("LLM cleaner skipped for %d of %d chunks", skipped, len(texts))
+    return cleaned
+
+
+async def _clean_or_skip(
+    text: str,
     api_key: str,
     cleaner_model: str,
+    settings: PipelineSettings,
+    cleaner_cache: ResponseCache | None = None,
+) -> Tuple[str, bool]:
+    """Clean ``text`` with the LLM unless it already scores as clean enough.
+
+    Returns:
+        The cleaned text, and whether the LLM cleaner was skipped
+    """
+    threshold = settings.skip_clean_threshold
+    if threshold is not None and quality_score(text) >= threshold:
+        CLEANER_SKIPPED.inc()
+        return text, True
+    return (
+        await _clean_text(text, api_key, cleaner_model, settings, cleaner_cache),
+        False,
+    )
+
+
+def _pre_clean_documents(documents: List[ParsedDocument]) -> List[ParsedDocument]:
+    return [
+        ParsedDocument(filename=doc.filename, segments=pre_clean_segments(doc.segments))
+        for doc in documents
+    ]
+
+
+async def _clean_text(
+    text: str,
+    api_key: str,
+    cleaner_model: str,
+    settings: PipelineSettings,
+    cleaner_cache: ResponseCache | None = None,
 ) -> str:
-    cleaner = CleanerChain(api_key=api_key, model=cleaner_model)
-    cleaned_text = cleaner.run(subject_material).get("cleaned_text").get("cleaned_text")
+    """Clean ``text`` with the cleaner chain, reusing a cached answer if any.
+
+    Only answers from ``cleaner_model`` are looked up. An answer from a
+    fallback model is cached under that model's key, so it is never served
+    as the primary model's result.
+    """
+    if cleaner_cache is not None:
+        cached_text = await asyncio.to_thread(
+            cleaner_cache.get, _cleaner_cache_key(cleaner_model, text)
+        )
+        record_cache_lookup("cleaner", cached_text is not None)
+        if cached_text is not None:
+            return cached_text
+
+    async def call(model: str | None) -> Tuple[str | None, str | None]:
+        cleaner = chain_registry.get(CleanerChain, api_key=api_key, model=model)
+        with _observe_llm_call("cleaner", model):
+            result = await cleaner.arun(text)
+        return model, (result.get("cleaned_text") or {}).get("cleaned_text")
+
+    policy = LLMCallPolicy(
+        [cleaner_model, *settings.cleaner_fallback_models],
+        attempt_timeout=settings.cleaner_timeout,
+        deadline=settings.cleaner_deadline,
+        hedge_quantile=settings.hedge_quantile,
+    )
+    answered_by, cleaned_text = await policy.run(
+        "cleaner",
+        call,
+        tokens=CleanerChain.estimate_tokens(text),
+        validate=lambda answer: isinstance(answer[1], str),
+    )
+    record_llm_io("cleaner", text, cleaned_text)
+
+    if cleaner_cache is not None:
+        await asyncio.to_thread(
+            _put_in_cache,
+            cleaner_cache,
+            "cleaner",
+            _cleaner_cache_key(answered_by, text),
+            cleaned_text,
+        )
     return cleaned_text
 
 
-def _run_flashcarder(
+def _cleaner_cache_key(model: str | None, text: str) -> str:
+    return ResponseCache.key_for(
+        model or "", CLEANER_SYSTEM_PROMPT, CLEANER_HUMAN_PROMPT, text=text
+    )
+
+
+async def _run_flashcarder(
     subject_material: str,
     user_form: UserForm,
     api_key: str,
     flashcarder_model: str,
-) -> str:
+    settings: PipelineSettings,
+    num_flash_cards: int | None = None,
+    on_card: Callable[[Flashcard], None] | None = None,
+) -> List[Flashcard]:
+    if num_flash_cards is None:
+        num_flash_cards = user_form.num_flash_cards
+
     user_form_reg = UserFormReg(
         course_name=user_form.course_name,
         difficulty=user_form.difficulty,
@@ -127,17 +798,265 @@ def _run_flashcarder(
         subject=user_form.subject,
         rules=user_form.rules,
         subject_material=subject_material,
-        num_flash_cards=user_form.num_flash_cards,
+        num_flash_cards=num_flash_cards,
     )
 
-    flashcarder = FlashcarderChain(api_key=api_key, model=flashcarder_model)
+    # Attempts that have handed on a streamed card; only the first may stream
+    streaming: List[object] = []
 
-    flashcards = flashcarder.run(user_form_reg).get("flashcards").get("flashcards")
+    async def call(model: str | None) -> List[Flashcard]:
+        flashcarder = chain_registry.get(FlashcarderChain, api_key=api_key, model=model)
+        with _observe_llm_call("flashcarder", model):
+            if on_card is not None:
+                return await flashcarder.astream(
+                    user_form_reg, _first_stream_only(on_card, streaming)
+                )
+            result = await flashcarder.arun(user_form_reg)
+            return validate_flashcards(
+                (result.get("flashcards") or {}).get("flashcards") or []
+            )
 
+    policy = LLMCallPolicy(
+        [flashcarder_model, *settings.flashcarder_fallback_models],
+        attempt_timeout=settings.flashcarder_timeout,
+        deadline=settings.flashcarder_deadline,
+        hedge_quantile=settings.hedge_quantile,
+    )
+    primary = chain_registry.get(
+        FlashcarderChain, api_key=api_key, model=flashcarder_model
+    )
+    flashcards = await policy.run(
+        "flashcarder",
+        call,
+        tokens=primary.estimate_tokens(user_form_reg),
+        # An empty list is a valid answer for a chunk with nothing card-worthy;
+        # only output that did not parse counts as invalid
+        validate=lambda cards: isinstance(cards, list),
+        # Once cards were handed on, another request would repeat them
+        retryable=lambda: not streaming,
+    )
+    record_llm_io(
+        "flashcarder",
+        subject_material,
+        "\n".join(f"{card.question}\n{card.answer}" for card in flashcards),
+    )
     return flashcards
 
 
-def _get_public_dir() -> Path:
-    current_file = Path(__file__)
-    project_root = current_file.parents[3]
-    return project_root / "public"
+class _SupersededStreamError(Exception):
+    """Raised in a hedged stream once another request has started streaming."""
+
+
+def _first_stream_only(
+    on_card: Callable[[Flashcard], None], streaming: List[object]
+) -> Callable[[Flashcard], None]:
+    """Wrap ``on_card`` for one attempt so only the first attempt to stream is heard."""
+    attempt = object()
+
+    def forward(card: Flashcard) -> None:
+        if not streaming:
+            streaming.append(attempt)
+        if streaming[0] is not attempt:
+            raise _SupersededStreamError()
+        on_card(card)
+
+    return forward
+
+
+@contextmanager
+def _observe_llm_call(chain: str, model: str | None) -> Iterator[None]:
+    """Time an LLM chain call and count it as an error if it raises.
+
+    Calls that lost a hedge race or ran past their deadline are not recorded.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except (asyncio.CancelledError, _SupersededStreamError):
+        raise
+    except Exception:
+        LLM_ERRORS.labels(chain, model).inc()
+        LLM_REQUEST_SECONDS.labels(chain, model).observe(time.perf_counter() - started)
+        raise
+    LLM_REQUEST_SECONDS.labels(chain, model).observe(time.perf_counter() - started)
+
+
+def _flashcarder_prompt_overhead(user_form: UserForm) -> str:
+    """Prompt text sent alongside the subject material, for token estimates."""
+    return "\n".join(
+        [
+            FLASHCARDER_SYSTEM_PROMPT,
+            FLASHCARDER_HUMAN_PROMPT,
+            user_form.course_name,
+            user_form.difficulty,
+            user_form.school_level,
+            user_form.subject,
+            user_form.rules,
+        ]
+    )
+
+
+async def _run_flashcarder_map_reduce(
+    cleaned_chunks: List[str],
+    user_form: UserForm,
+    api_key: str,
+    flashcarder_model: str,
+    settings: PipelineSettings,
+    max_chunk_chars: int,
+) -> List[Flashcard]:
+    """Generate cards per chunk in parallel, then deduplicate and trim them.
+
+    Cleaned chunks are re-packed into chunks of at most ``max_chunk_chars``.
+
+    Each chunk is asked for its proportional share of ``num_flash_cards``
+    (padded by ``card_budget_slack`` to absorb duplicates). If deduplication
+    leaves the deck short, one top-up request is made against the largest chunk.
+    At most ``flashcarder_concurrency`` requests are in flight.
+    """
+    # A single cleaned chunk can still be too big for one call
+    chunks = chunk_segments(cleaned_chunks, max_chunk_chars)
+    total_cards = user_form.num_flash_cards
+    budgets = allocate_card_budget([len(chunk) for chunk in chunks], total_cards)
+
+    limit = asyncio.Semaphore(max(1, settings.flashcarder_concurrency))
+
+    async def generate(chunk: str, budget: int | None) -> List[Flashcard]:
+        return await _generate_chunk_cards(
+            chunk, budget, user_form, api_key, flashcarder_model, settings, limit
+        )
+
+    logger.info(
+        "Generating flashcards for %d chunks with budgets %s", len(chunks), budgets
+    )
+    chunk_cards = await asyncio.gather(
+        *(generate(chunk, budget) for chunk, budget in zip(chunks, budgets))
+    )
+    return await _merge_chunk_cards(
+        chunks, chunk_cards, budgets, total_cards, generate, settings
+    )
+
+
+async def _generate_chunk_cards(
+    chunk: str,
+    budget: int | None,
+    user_form: UserForm,
+    api_key: str,
+    flashcarder_model: str,
+    settings: PipelineSettings,
+    limit: asyncio.Semaphore,
+) -> List[Flashcard]:
+    """Ask for one chunk's card budget, padded by ``card_budget_slack``."""
+    if budget == 0:
+        return []
+    requested = (
+        None if budget is None else math.ceil(budget * settings.card_budget_slack)
+    )
+    async with limit:
+        return await _run_flashcarder(
+            chunk,
+            user_form,
+            api_key,
+            flashcarder_model,
+            settings,
+            num_flash_cards=requested,
+        )
+
+
+async def _merge_chunk_cards(
+    chunks: List[str],
+    chunk_cards: Sequence[List[Flashcard]],
+    budgets: List[int | None],
+    total_cards: int | None,
+    generate: Callable[[str, int | None], Awaitable[List[Flashcard]]],
+    settings: PipelineSettings,
+) -> List[Flashcard]:
+    """Deduplicate and trim the chunks' cards, in chunk order.
+
+    If deduplication leaves the deck short, one top-up request for the
+    missing cards is made against the largest chunk.
+    """
+    deduplicator = FlashcardDeduplicator(settings.dedupe_threshold)
+    cards = merge_flashcards(chunk_cards, budgets, total_cards, deduplicator)
+
+    if total_cards is not None and len(cards) < total_cards and chunks:
+        deficit = total_cards - len(cards)
+        logger.info(
+            "Deduplication left %d cards; requesting %d more", len(cards), deficit
+        )
+        largest = max(chunks, key=len)
+        top_up = await generate(largest, deficit)
+        cards.extend(card for card in top_up if deduplicator.add(card.question))
+        cards = cards[:total_cards]
+        if len(cards) < total_cards:
+            logger.warning("Only %d of %d unique flashcards", len(cards), total_cards)
+
+    return cards
+
+
+_default_artifact_store: ArtifactStore | None = None
+
+
+def _get_default_artifact_store() -> ArtifactStore:
+    global _default_artifact_store
+    if _default_artifact_store is None:
+        project_root = Path(__file__).parents[3]
+        _default_artifact_store = ArtifactStore(project_root / "artifacts")
+    return _default_artifact_store
+
+
+_default_parse_cache: ParseCache | None = None
+
+
+def _get_default_parse_cache() -> ParseCache:
+    global _default_parse_cache
+    if _default_parse_cache is None:
+        project_root = Path(__file__).parents[3]
+        store = SQLiteBlobStore(project_root / "cache" / "parse_cache.sqlite3")
+        _default_parse_cache = ParseCache(store)
+    return _default_parse_cache
+
+
+_default_cleaner_cache: ResponseCache | None = None
+
+
+def _get_default_cleaner_cache() -> ResponseCache:
+    global _default_cleaner_cache
+    if _default_cleaner_cache is None:
+        _default_cleaner_cache = ResponseCache(MemoryLRUBackend(ttl=24 * 3600.0))
+    return _default_cleaner_cache
+
+
+_parse_executor: ProcessPoolExecutor | None = None
+_parse_executor_workers = 0
+_parse_executor_lock = threading.Lock()
+
+
+def _get_parse_executor(workers: int) -> ProcessPoolExecutor | None:
+    """Return the shared parsing process pool, or None to parse in-thread.
+
+    Parsers are CPU-bound and hold the GIL, so they run in processes. The pool
+    is created once and reused; "spawn" avoids forking a threaded server.
+    """
+    global _parse_executor, _parse_executor_workers
+    if workers <= 1:
+        return None
+
+    with _parse_executor_lock:
+        if _parse_executor is None or _parse_executor_workers != workers:
+            if _parse_executor is not None:
+                _parse_executor.shutdown(wait=False)
+            _parse_executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _parse_executor_workers = workers
+        return _parse_executor
+
+
+def _reset_parse_executor() -> None:
+    """Drop a broken pool so the next call starts a fresh one."""
+    global _parse_executor
+    with _parse_executor_lock:
+        if _parse_executor is not None:
+            _parse_executor.shutdown(wait=False)
+        _parse_executor = None
@@ -0,0 +1,280 @@
+"""Hedging, deadlines and model fallback around LLM chain calls.
+
+``LLMCallPolicy.run`` tries each model in ``models`` in order. Each layer has
+its own deadline:
+
+* the whole call, across every model, must finish within ``deadline``;
+* each model gets at most ``attempt_timeout`` before the next one is tried;
+* within a model's attempt, a hedge request is fired once the call has run
+  past the ``hedge_quantile`` of recent latencies for its size, and the
+  first valid response wins.
+
+A model is given up on when its attempt times out, returns output that does
+not parse or validate, or keeps failing with errors the scheduler retries
+(throttling, server errors). Other errors are raised straight away.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+from backend.logs import get_logger
+from backend.metrics.pipeline_metrics import LLM_FALLBACKS, LLM_HEDGE_WINS, LLM_HEDGES
+from .llm_scheduler import classify_error, get_llm_scheduler
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Latencies kept per chain and model, and how many are needed before the
+# quantile is trusted enough to hedge on
+LATENCY_WINDOW = 256
+MIN_HEDGE_SAMPLES = 20
+
+# Never hedge sooner than this, however fast recent calls were
+MIN_HEDGE_DELAY = 0.5
+
+
+class InvalidLLMResponseError(ValueError):
+    """Raised when a chain call returns output that fails validation."""
+
+
+class LatencyTracker:
+    """Recent seconds per token of successful calls, by chain and model.
+
+    Latency is divided by the call's estimated tokens so calls of different
+    sizes share one distribution. Shared by every pipeline in the process.
+
+    Args:
+        window: Latencies kept per chain and model
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, chain: str, model: str, seconds: float, tokens: int) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(
+                (chain, model), deque(maxlen=self.window)
+            )
+            samples.append(seconds / max(tokens, 1))
+
+    def quantile(
+        self, chain: str, model: str, q: float, min_samples: int = MIN_HEDGE_SAMPLES
+    ) -> Optional[float]:
+        """Seconds per token at quantile ``q``, or None with too few samples."""
+        with self._lock:
+            samples = sorted(self._samples.get((chain, model), ()))
+        if len(samples) < max(min_samples, 1):
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+latency_tracker = LatencyTracker()
+
+
+class LLMCallPolicy:
+    """Runs one logical chain call with hedging, deadlines and model fallback.
+
+    Args:
+        models: Models to try, in order. The first is the primary
+        attempt_timeout: Seconds each model gets, hedge included. None for
+            no limit
+        deadline: Seconds the whole call gets across every model. None for
+            no limit
+        hedge_quantile: Latency quantile after which a hedge request is
+            fired, e.g. 0.95. None disables hedging
+        latencies: Where call latencies are recorded and read from.
+            Defaults to the process-wide ``latency_tracker``
+    """
+
+    def __init__(
+        self,
+        models: Sequence[str | None],
+        attempt_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        hedge_quantile: Optional[float] = 0.95,
+        latencies: Optional[LatencyTracker] = None,
+    ):
+        if not models:
+            raise ValueError("At least one model is required")
+        self.models: List[str | None] = list(dict.fromkeys(models))
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.hedge_quantile = hedge_quantile
+        self.latencies = latency_tracker if latencies is None else latencies
+
+    async def run(
+        self,
+        chain: str,
+        call: Callable[[str | None], Awaitable[T]],
+        *,
+        tokens: int = 0,
+        validate: Optional[Callable[[T], bool]] = None,
+        retryable: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """Await ``call(model)`` for each model in turn until one succeeds.
+
+        Args:
+            chain: Chain name for metrics, logs and latency tracking
+            call: Makes the request to the given model. May be called more
+                than once per model when a hedge is fired
+            tokens: Estimated tokens of the call, to scale the hedge delay
+            validate: Returns False for a response that should count as
+                invalid
+            retryable: Checked before hedging and before falling back.
+                Return False once another request is no longer safe, e.g.
+                after streamed output was handed on
+
+        Returns:
+            The first valid response
+
+        Raises:
+            TimeoutError: If the last model tried ran out of time
+            Exception: The last model's error, or the first error that does
+                not warrant a fallback
+        """
+        loop = asyncio.get_running_loop()
+        give_up_at = None if self.deadline is None else loop.time() + self.deadline
+        error: Optional[BaseException] = None
+        reason = None
+        for index, model in enumerate(self.models):
+            timeout = self.attempt_timeout
+            if give_up_at is not None:
+                remaining = give_up_at - loop.time()
+                if remaining <= 0:
+                    break
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            if error is not None:
+                previous = self.models[index - 1]
+                LLM_FALLBACKS.labels(chain, previous, reason).inc()
+                logger.warning(
+                    "%s call to %s failed (%s: %s); falling back to %s",
+                    chain,
+                    previous,
+                    reason,
+                    type(error).__name__,
+                    model,
+                )
+            try:
+                return await asyncio.wait_for(
+                    self._hedged(chain, model, call, tokens, validate, retryable),
+                    timeout,
+                )
+            except Exception as e:
+                reason = _fallback_reason(e)
+                if reason is None or (retryable is not None and not retryable()):
+                    raise
+                error = e
+        if error is None:
+            raise TimeoutError(f"{chain} call ran past its {self.deadline}s deadline")
+        raise error
+
+    async def _hedged(
+        self,
+        chain: str,
+        model: str | None,
+        call: Callable[[str | None], Awaitable[T]],
+        tokens: int,
+        validate: Optional[Callable[[T], bool]],
+        retryable: Optional[Callable[[], bool]],
+    ) -> T:
+        """Call ``model``, firing one hedge request if the call is slow."""
+
+        async def attempt() -> T:
+            result = await call(model)
+            if validate is not None and not validate(result):
+                raise InvalidLLMResponseError(
+                    f"{chain} response from {model} failed validation"
+                )
+            return result
+
+        started = time.perf_counter()
+        tasks = [asyncio.ensure_future(attempt())]
+        primary = tasks[0]
+        try:
+            delay = self._hedge_delay(chain, model, tokens)
+            if delay is not None:
+                await asyncio.wait(tasks, timeout=delay)
+                if (
+                    not primary.done()
+                    and (retryable is None or retryable())
+                    and get_llm_scheduler().has_spare_capacity(model)
+                ):
+                    LLM_HEDGES.labels(chain, model).inc()
+                    logger.info(
+                        "%s call to %s still running after %.1fs; hedging",
+                        chain,
+                        model,
+                        delay,
+                    )
+                    tasks.append(asyncio.ensure_future(attempt()))
+
+            error: Optional[BaseException] = None
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.remove(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            LLM_HEDGE_WINS.labels(chain, model).inc()
+                        # Time since the primary started: a lower bound on its
+                        # latency, so hedge wins do not drag the quantile down
+                        self.latencies.observe(
+                            chain, model or "", time.perf_counter() - started, tokens
+                        )
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+                task.add_done_callback(_discard_result)
+
+    def _hedge_delay(self, chain: str, model: str | None, tokens: int) -> float | None:
+        if self.hedge_quantile is None:
+            return None
+        per_token = self.latencies.quantile(chain, model or "", self.hedge_quantile)
+        if per_token is None:
+            return None
+        return max(MIN_HEDGE_DELAY, per_token * max(tokens, 1))
+
+
+def _fallback_reason(error: BaseException) -> str | None:
+    """Why ``error`` warrants trying the next model, or None if it does not."""
+    # asyncio.TimeoutError only became the builtin TimeoutError in 3.11
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError)):
+        return "timeout"
+    # Output parser, JSON and pydantic validation errors are all ValueErrors
+    if isinstance(error, ValueError):
+        return "invalid"
+    if classify_error(error) is not None:
+        return "error"
+    return None
+
+
+def _discard_result(task: asyncio.Future) -> None:
+    """Retrieve a losing request's outcome so asyncio does not log it."""
+    if not task.cancelled():
+        task.exception()
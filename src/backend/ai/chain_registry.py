@@ -0,0 +1,50 @@
+"""Process-wide registry that builds each LLM chain once and shares it."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Tuple, Type, TypeVar
+
+ChainT = TypeVar("ChainT")
+
+
+class ChainRegistry:
+    """Cache of chain instances keyed by (chain class, model, api_key, temperature).
+
+    Building a chain creates a ``ChainComposer``, its prompt templates and the
+    provider's HTTP client, so doing it once per process lets every request
+    reuse the same keep-alive connections. Chains handed out by the registry
+    are shared between threads and must not keep per-call state.
+    """
+
+    def __init__(self):
+        self._chains: Dict[Tuple[type, str | None, str, float], Any] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        chain_cls: Type[ChainT],
+        *,
+        api_key: str,
+        model: str | None,
+        temperature: float = 0.0,
+    ) -> ChainT:
+        """Return the shared ``chain_cls`` instance, building it on first use."""
+        key = (chain_cls, model, api_key, temperature)
+        with self._lock:
+            chain = self._chains.get(key)
+            if chain is None:
+                chain = chain_cls(api_key=api_key, model=model, temperature=temperature)
+                self._chains[key] = chain
+            return chain
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chains.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._chains)
+
+
+chain_registry = ChainRegistry()
@@ -0,0 +1,41 @@
+"""Helpers for running ``ChainComposer`` layers without blocking a thread."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from chain_composer import ChainComposer
+
+
+async def arun_layers(cp: ChainComposer, data_dict: Dict[str, Any]) -> Dict[str, Any]:
+    """Async counterpart of ``ChainComposer.run`` built on ``ainvoke``.
+
+    Runs each layer in order, storing its output under the layer's
+    passthrough key (or ``_last_output``) exactly like the synchronous
+    chain manager does. ``data_dict`` is updated in place and returned.
+
+    Args:
+        cp: Composer whose layers should be run
+        data_dict: Prompt variables for the first layer
+
+    Returns:
+        ``data_dict`` with every layer's output added
+    """
+    chain_sequence = cp.get_chain_sequence()
+    for index, (chain_wrapper, output_name) in enumerate(chain_sequence):
+        is_last_chain = index == len(chain_sequence) - 1
+        input_data = data_dict
+        if chain_wrapper.preprocessor is not None:
+            input_data = chain_wrapper.preprocessor(input_data)
+
+        output = await chain_wrapper.chain.ainvoke(input_data)
+        if not is_last_chain and isinstance(output, BaseModel):
+            output = output.model_dump()
+        if chain_wrapper.postprocessor is not None:
+            output = chain_wrapper.postprocessor(output)
+
+        data_dict[output_name or "_last_output"] = output
+    return data_dict
@@ -0,0 +1,73 @@
+"""Split parsed documents into LLM-sized chunks along their natural boundaries."""
+
+from __future__ import annotations
+
+from typing import Iterable, List
+
+
+def chunk_segments(segments: Iterable[str], max_chars: int) -> List[str]:
+    """Greedily pack consecutive segments into chunks of at most ``max_chars``.
+
+    Segments (pages, slides, sections) are never reordered and are only split
+    when a single segment is larger than ``max_chars`` on its own, in which case
+    it is broken on paragraph, then line, then character boundaries.
+
+    Args:
+        segments: Segment texts in document order
+        max_chars: Maximum number of characters per chunk
+
+    Returns:
+        Chunk texts in document order
+    """
+    if max_chars <= 0:
+        raise ValueError(f"max_chars must be positive: Received: {max_chars}")
+
+    chunks: List[str] = []
+    current: List[str] = []
+    current_len = 0
+
+    for segment in segments:
+        segment = segment.strip()
+        if not segment:
+            continue
+
+        for piece in _split_oversized(segment, max_chars):
+            # +1 for the newline joining it to the current chunk
+            if current and current_len + 1 + len(piece) > max_chars:
+                chunks.append("\n".join(current))
+                current, current_len = [], 0
+            current_len += len(piece) + (1 if current else 0)
+            current.append(piece)
+
+    if current:
+        chunks.append("\n".join(current))
+
+    return chunks
+
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    if len(text) <= max_chars:
+        return [text]
+
+    for separator in ("\n\n", "\n"):
+        parts = text.split(separator)
+        if len(parts) > 1:
+            pieces: List[str] = []
+            current = ""
+            for part in parts:
+                candidate = f"{current}{separator}{part}" if current else part
+                if len(candidate) <= max_chars:
+                    current = candidate
+                    continue
+                if current:
+                    pieces.append(current)
+                if len(part) > max_chars:
+                    pieces.extend(_split_oversized(part, max_chars))
+                    current = ""
+                else:
+                    current = part
+            if current:
+                pieces.append(current)
+            return pieces
+
+    return [text[i : i + max_chars] for i in range(0, len(text), max_chars)]
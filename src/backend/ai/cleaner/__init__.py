@@ -1,3 +1,4 @@
 from .cleaner_chain import CleanerChain
+from .pre_cleaner import normalize_text, pre_clean_segments, quality_score
 
-__all__ = ["CleanerChain"]
+__all__ = ["CleanerChain", "normalize_text", "pre_clean_segments", "quality_score"]
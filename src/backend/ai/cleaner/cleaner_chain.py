@@ -1,17 +1,28 @@
 from chain_composer import ChainComposer
+from backend.logs import get_logger, log_payload
 from backend.models import CleanerOutput
 from backend.prompts import CLEANER_SYSTEM_PROMPT, CLEANER_HUMAN_PROMPT
+from ..chain_utils import arun_layers
+from ..llm_scheduler import get_llm_scheduler
+from ..token_budget import estimate_tokens
 import json
+import logging
+
+logger = get_logger(__name__)
 
 
 class CleanerChain:
     def __init__(
-        self, api_key: str, model: str | None = "gemini-2.0-flash-thinking-exp-01-21"
+        self,
+        api_key: str,
+        model: str | None = "gemini-2.0-flash-thinking-exp-01-21",
+        temperature: float = 0.0,
     ):
+        self.model = model
         self.cp = ChainComposer(
             model=model,
             api_key=api_key,
-            temperature=0.0,
+            temperature=temperature,
         )
 
         self._add_layer()
@@ -26,7 +37,40 @@ class CleanerChain:
         )
 
     def run(self, text: str) -> CleanerOutput:
-        print(f"Running cleaner chain with text: {text}")
-        res = self.cp.run({"text": text})
-        print(f"Cleaner chain result:\n{json.dumps(res, indent=4)}")
+        log_payload(logger, "Cleaner input", text)
+        # Run the layers with a fresh variables dict; ChainComposer.run() stores
+        # variables on the composer, which is not safe for a shared chain
+        res = get_llm_scheduler().run_sync(
+            self.model,
+            lambda: self.cp.chain_manager.run(data_dict={"text": text}),
+            chain="cleaner",
+            tokens=self.estimate_tokens(text),
+        )
+        self._log_result(res)
         return res
+
+    async def arun(self, text: str) -> CleanerOutput:
+        """Async version of ``run`` that awaits the LLM instead of blocking."""
+        log_payload(logger, "Cleaner input", text)
+        res = await get_llm_scheduler().run(
+            self.model,
+            lambda: arun_layers(self.cp, {"text": text}),
+            chain="cleaner",
+            tokens=self.estimate_tokens(text),
+        )
+        self._log_result(res)
+        return res
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Prompt plus output tokens; the cleaned text is about as long as the input."""
+        prompt = CLEANER_SYSTEM_PROMPT + CLEANER_HUMAN_PROMPT
+        return estimate_tokens(prompt) + 2 * estimate_tokens(text)
+
+    @staticmethod
+    def _log_result(res: dict) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cleaner chain result:\n%s", json.dumps(res, indent=4))
+            return
+        cleaned = (res.get("cleaned_text") or {}).get("cleaned_text") or ""
+        log_payload(logger, "Cleaner output", cleaned)
@@ -0,0 +1,202 @@
+"""Local, deterministic cleanup applied before (or instead of) the LLM cleaner."""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from typing import List, Sequence, Set
+
+# Lines that can only be a page marker: "- 12 -", "Page 3 of 10", "slide 4", "3/10"
+_MARKED_PAGE_NUMBER = re.compile(
+    r"^\s*(?:(?:page|p\.|slide)\s*\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?"
+    r"|\d{1,4}\s*(?:of|/)\s*\d{1,4}"
+    r"|[\-–—]+\s*\d{1,4}\s*[\-–—]+)\s*$",
+    re.IGNORECASE,
+)
+# A number on its own line is only a page number if it counts up with the pages
+_BARE_NUMBER = re.compile(r"^\s*(\d{1,4})\s*$")
+# A word broken at a hyphen at the end of a line; either half may itself
+# contain hyphens ("state-of-the-\nart")
+_HYPHENATED_BREAK = re.compile(r"([\w-]*[a-z])-\n([a-z][\w-]*)")
+_HYPHENATED_WORD = re.compile(r"\w+(?:-\w+)+")
+# Bullets and list markers: "-", "•", "1.", "2)", "a)", "iv.", "(b)"
+_LIST_MARKER = re.compile(
+    r"^(?:[-*•▪◦‣·–—]|\d{1,3}[.)]|[a-z][.)]|[ivxlc]{1,6}[.)]|\(\w{1,4}\))\s",
+    re.IGNORECASE,
+)
+_INLINE_WHITESPACE = re.compile(r"[ \t\f\v ]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_DIGITS = re.compile(r"\d+")
+_SENTENCE_END = (".", "!", "?", ":", ";")
+_ALLOWED_SYMBOLS = set(".,;:!?'\"()[]{}-–—/%&+=*<>#@$€£°·•_|\\^~`")
+
+# How many lines at the top and bottom of a page are checked for headers/footers
+EDGE_LINES = 2
+
+
+def pre_clean_segments(segments: Sequence[str]) -> List[str]:
+    """Clean each page/slide/section of one document.
+
+    Removes page-number lines and headers/footers that repeat across pages,
+    rejoins words hyphenated across line breaks (unless the document also
+    hyphenates them mid-line), unwraps hard-wrapped lines and normalizes
+    whitespace. Segments that end up empty are dropped. Only lines
+    at the top and bottom of a page are ever removed, so numbers in the body
+    (table cells, years, answers) are kept.
+
+    Args:
+        segments: The document's segments in order
+
+    Returns:
+        Cleaned segments in the same order
+    """
+    pages = [segment.replace("\r\n", "\n").split("\n") for segment in segments]
+    repeated = _repeated_edge_lines(pages)
+    page_numbers = _page_number_lines(pages)
+    hyphenated = _hyphenated_words("\n".join(segments))
+
+    cleaned = []
+    for lines, numbers in zip(pages, page_numbers):
+        edges = _edge_indices(lines)
+        kept = [
+            line
+            for index, line in enumerate(lines)
+            if index not in numbers
+            and not (index in edges and _normalize_edge_line(line) in repeated)
+        ]
+        text = normalize_text("\n".join(kept), hyphenated)
+        if text:
+            cleaned.append(text)
+    return cleaned
+
+
+def normalize_text(text: str, hyphenated: Set[str] | None = None) -> str:
+    """Dehyphenate, unwrap hard-wrapped lines and tidy whitespace.
+
+    A word broken across lines at a hyphen keeps its hyphen when it appears
+    hyphenated within a line elsewhere ("cross-validation"). Lines starting
+    with a bullet or list marker are never joined to the line before them.
+
+    Args:
+        text: Text to normalize
+        hyphenated: Lowercased words the document hyphenates within a line.
+            Defaults to the ones found in ``text``
+    """
+    lines = [_INLINE_WHITESPACE.sub(" ", line).strip() for line in text.split("\n")]
+    text = "\n".join(lines)
+    if hyphenated is None:
+        hyphenated = _hyphenated_words(text)
+
+    def rejoin(match: re.Match[str]) -> str:
+        word = f"{match.group(1)}-{match.group(2)}"
+        # A compound that already has hyphens keeps the one at the break too
+        if "-" in match.group(1) or word.lower() in hyphenated:
+            return word
+        return match.group(1) + match.group(2)
+
+    text = _HYPHENATED_BREAK.sub(rejoin, text)
+
+    unwrapped: List[str] = []
+    for line in text.split("\n"):
+        previous = unwrapped[-1] if unwrapped else ""
+        if (
+            previous
+            and line
+            and line[0].islower()
+            and not previous.endswith(_SENTENCE_END)
+            and not _LIST_MARKER.match(line)
+        ):
+            unwrapped[-1] = f"{previous} {line}"
+        else:
+            unwrapped.append(line)
+    return _BLANK_LINES.sub("\n\n", "\n".join(unwrapped)).strip()
+
+
+def quality_score(text: str) -> float:
+    """Score from 0 to 1 for how usable ``text`` is without the LLM cleaner.
+
+    Penalizes characters that are neither letters, digits, whitespace nor
+    common punctuation (extraction noise, replacement characters) and lines
+    that are fragments of one or two words, which is how broken tables and
+    columns usually come out of PDF extraction.
+    """
+    if not text.strip():
+        return 0.0
+
+    noise = sum(
+        1
+        for char in text
+        if not (char.isalnum() or char.isspace() or char in _ALLOWED_SYMBOLS)
+    )
+    noise_ratio = noise / len(text)
+
+    lines = [line for line in text.split("\n") if line.strip()]
+    fragments = sum(1 for line in lines if len(line.split()) <= 2)
+    fragment_ratio = fragments / len(lines)
+
+    return max(0.0, 1.0 - 10 * noise_ratio - 0.5 * fragment_ratio)
+
+
+def _hyphenated_words(text: str) -> Set[str]:
+    """Lowercased hyphenated words that occur within a single line."""
+    return {word.lower() for word in _HYPHENATED_WORD.findall(text)}
+
+
+def _edge_indices(lines: Sequence[str], count: int = EDGE_LINES) -> set[int]:
+    """Indices of the first and last ``count`` non-blank lines."""
+    content = [index for index, line in enumerate(lines) if line.strip()]
+    return set(content[:count] + content[-count:])
+
+
+def _page_number_lines(pages: Sequence[Sequence[str]]) -> List[Set[int]]:
+    """Indices of the page-number lines on each page.
+
+    Marked page numbers ("Page 3", "- 3 -") are recognized among the edge
+    lines. A bare number is only taken for a page number when it is the
+    first or last line of its page and, on at least half of the pages (and
+    at least 2), such numbers equal the page's position plus the same offset.
+    """
+    numbers: List[Set[int]] = []
+    bare: List[tuple[int, int, int]] = []
+    for page, lines in enumerate(pages):
+        numbers.append(
+            {i for i in _edge_indices(lines) if _MARKED_PAGE_NUMBER.match(lines[i])}
+        )
+        for i in _edge_indices(lines, 1):
+            match = _BARE_NUMBER.match(lines[i])
+            if match:
+                bare.append((page, i, int(match.group(1)) - page))
+
+    offsets = Counter(offset for _, _, offset in bare)
+    if offsets:
+        offset, count = offsets.most_common(1)[0]
+        if count >= max(2, len(pages) // 2):
+            for page, i, line_offset in bare:
+                if line_offset == offset:
+                    numbers[page].add(i)
+    return numbers
+
+
+def _normalize_edge_line(line: str) -> str:
+    # Page numbers inside headers ("Chapter 2 - 14") vary, so ignore digits
+    return _DIGITS.sub("#", _INLINE_WHITESPACE.sub(" ", line).strip().lower())
+
+
+def _repeated_edge_lines(pages: Sequence[Sequence[str]]) -> set[str]:
+    """Edge lines that appear on at least half of the pages (and at least 3)."""
+    if len(pages) < 3:
+        return set()
+
+    counts: Counter[str] = Counter()
+    for lines in pages:
+        # Bare numbers all normalize to "#"; _page_number_lines decides on them
+        counts.update(
+            {
+                _normalize_edge_line(lines[i])
+                for i in _edge_indices(lines)
+                if not _BARE_NUMBER.match(lines[i])
+            }
+        )
+
+    min_pages = max(3, len(pages) // 2)
+    return {line for line, count in counts.items() if count >= min_pages}
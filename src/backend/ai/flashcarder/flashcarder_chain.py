@@ -1,24 +1,36 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
 
 import json
+import logging
 from chain_composer import ChainComposer
+from backend.logs import SAMPLED, get_logger, log_payload
 from backend.prompts import FLASHCARDER_SYSTEM_PROMPT, FLASHCARDER_HUMAN_PROMPT
-from backend.models import FlashcarderOutput
+from backend.models import Flashcard, FlashcarderOutput
+from ..chain_utils import arun_layers
+from ..llm_scheduler import get_llm_scheduler
+from ..token_budget import estimate_tokens, get_model_limits, output_reserve
+from .reducer import FlashcardStreamParser
 
 if TYPE_CHECKING:
     from backend.models import UserFormReg
 
+logger = get_logger(__name__)
+
 
 class FlashcarderChain:
     def __init__(
-        self, api_key: str, model: str | None = "gemini-2.0-flash-thinking-exp-01-21"
+        self,
+        api_key: str,
+        model: str | None = "gemini-2.0-flash-thinking-exp-01-21",
+        temperature: float = 0.0,
     ):
+        self.model = model
         self.cp = ChainComposer(
             model=model,
             api_key=api_key,
-            temperature=0.0,
+            temperature=temperature,
         )
 
         self._add_layer()
@@ -32,18 +44,177 @@ class FlashcarderChain:
             output_passthrough_key_name="flashcards",
         )
 
+    @staticmethod
+    def _prompt_variables(user_form: UserFormReg) -> Dict[str, Any]:
+        return {
+            "course_name": user_form.course_name,
+            "difficulty": user_form.difficulty,
+            "school_level": user_form.school_level,
+            "subject": user_form.subject,
+            "rules": user_form.rules,
+            "subject_material": user_form.subject_material,
+            "num_flash_cards": user_form.num_flash_cards,
+        }
+
     def run(self, user_form: UserFormReg) -> FlashcarderOutput:
-        print(f"Running flashcarder chain with user form: {user_form}")
-        res = self.cp.run(
-            {
-                "course_name": user_form.course_name,
-                "difficulty": user_form.difficulty,
-                "school_level": user_form.school_level,
-                "subject": user_form.subject,
-                "rules": user_form.rules,
-                "subject_material": user_form.subject_material,
-                "num_flash_cards": user_form.num_flash_cards,
-            }
-        )
-        print(f"Flashcarder chain result:\n{json.dumps(res, indent=4)}")
+        self._log_request("Running", user_form)
+        # Run the layers with a fresh variables dict; ChainComposer.run() stores
+        # variables on the composer, which is not safe for a shared chain
+        res = get_llm_scheduler().run_sync(
+            self.model,
+            lambda: self.cp.chain_manager.run(
+                data_dict=self._prompt_variables(user_form)
+            ),
+            chain="flashcarder",
+            tokens=self.estimate_tokens(user_form),
+        )
+        self._log_result(res)
+        return res
+
+    async def arun(self, user_form: UserFormReg) -> FlashcarderOutput:
+        """Async version of ``run`` that awaits the LLM instead of blocking."""
+        self._log_request("Running", user_form)
+        res = await get_llm_scheduler().run(
+            self.model,
+            lambda: arun_layers(self.cp, self._prompt_variables(user_form)),
+            chain="flashcarder",
+            tokens=self.estimate_tokens(user_form),
+        )
+        self._log_result(res)
         return res
+
+    def estimate_tokens(self, user_form: UserFormReg) -> int:
+        """Prompt tokens plus the output reserved for the requested cards."""
+        prompt = "\n".join(
+            [FLASHCARDER_SYSTEM_PROMPT, FLASHCARDER_HUMAN_PROMPT]
+            + [str(value) for value in self._prompt_variables(user_form).values()]
+        )
+        return estimate_tokens(prompt) + output_reserve(
+            user_form.num_flash_cards, get_model_limits(self.model)
+        )
+
+    @staticmethod
+    def _log_request(action: str, user_form: UserFormReg) -> None:
+        """Log the form settings, and the subject material as a payload."""
+        logger.info(
+            "%s flashcarder chain: course=%r subject=%r difficulty=%r "
+            "school_level=%r num_flash_cards=%s",
+            action,
+            user_form.course_name,
+            user_form.subject,
+            user_form.difficulty,
+            user_form.school_level,
+            user_form.num_flash_cards,
+            extra=SAMPLED,
+        )
+        log_payload(logger, "Flashcarder subject material", user_form.subject_material)
+
+    @staticmethod
+    def _log_result(res: dict) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Flashcarder chain result:\n%s", json.dumps(res, indent=4))
+            return
+        cards = (res.get("flashcards") or {}).get("flashcards") or []
+        logger.info("Flashcarder chain returned %d cards", len(cards), extra=SAMPLED)
+
+    def stream(
+        self, user_form: UserFormReg, on_card: Callable[[Flashcard], None]
+    ) -> List[Flashcard]:
+        """Run the chain with token streaming, reporting each card as it completes.
+
+        The JSON parser yields the partially generated output after every
+        chunk; a card is reported once the next card has started, or when
+        the stream ends.
+
+        Args:
+            user_form: Form settings and subject material for the prompt
+            on_card: Called with each flashcard in output order
+
+        Returns:
+            Every valid flashcard in the output, in order
+        """
+        self._log_request("Streaming", user_form)
+        streamed: List[Flashcard] = []
+
+        def attempt() -> List[Flashcard]:
+            chain_wrapper, _ = self.cp.get_chain_sequence()[0]
+            card_parser = FlashcardStreamParser()
+            report = self._reporter(streamed, on_card)
+            items: List[Dict[str, Any]] = []
+            for partial in chain_wrapper.chain.stream(
+                self._prompt_variables(user_form)
+            ):
+                items = self._feed_partial(card_parser, partial, report) or items
+            return self._close_stream(card_parser, items, report)
+
+        # Once a card has been handed on, a retry would report it twice
+        return get_llm_scheduler().run_sync(
+            self.model,
+            attempt,
+            chain="flashcarder",
+            tokens=self.estimate_tokens(user_form),
+            retryable=lambda: not streamed,
+        )
+
+    async def astream(
+        self, user_form: UserFormReg, on_card: Callable[[Flashcard], None]
+    ) -> List[Flashcard]:
+        """Async version of ``stream``."""
+        self._log_request("Streaming", user_form)
+        streamed: List[Flashcard] = []
+
+        async def attempt() -> List[Flashcard]:
+            chain_wrapper, _ = self.cp.get_chain_sequence()[0]
+            card_parser = FlashcardStreamParser()
+            report = self._reporter(streamed, on_card)
+            items: List[Dict[str, Any]] = []
+            async for partial in chain_wrapper.chain.astream(
+                self._prompt_variables(user_form)
+            ):
+                items = self._feed_partial(card_parser, partial, report) or items
+            return self._close_stream(card_parser, items, report)
+
+        return await get_llm_scheduler().run(
+            self.model,
+            attempt,
+            chain="flashcarder",
+            tokens=self.estimate_tokens(user_form),
+            retryable=lambda: not streamed,
+        )
+
+    @staticmethod
+    def _reporter(
+        streamed: List[Flashcard], on_card: Callable[[Flashcard], None]
+    ) -> Callable[[Flashcard], None]:
+        """Wrap ``on_card`` to remember which cards were already handed on."""
+
+        def report(card: Flashcard) -> None:
+            streamed.append(card)
+            on_card(card)
+
+        return report
+
+    @staticmethod
+    def _feed_partial(
+        card_parser: FlashcardStreamParser,
+        partial: Dict[str, Any] | None,
+        on_card: Callable[[Flashcard], None],
+    ) -> List[Dict[str, Any]]:
+        """Report cards completed by ``partial`` and return its card list."""
+        items = (partial or {}).get("flashcards") or []
+        for card in card_parser.feed(items):
+            on_card(card)
+        return items
+
+    @staticmethod
+    def _close_stream(
+        card_parser: FlashcardStreamParser,
+        items: List[Dict[str, Any]],
+        on_card: Callable[[Flashcard], None],
+    ) -> List[Flashcard]:
+        for card in card_parser.close(items):
+            on_card(card)
+        logger.info(
+            "Flashcarder chain streamed %d cards", len(card_parser.cards), extra=SAMPLED
+        )
+        return card_parser.cards
@@ -0,0 +1,155 @@
+"""Helpers for merging flashcards generated from separate chunks."""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from pydantic import ValidationError
+
+from backend.models import Flashcard
+
+_NON_WORD = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def validate_flashcards(items: Sequence[Dict[str, Any]]) -> List[Flashcard]:
+    """Convert raw model output to flashcards, dropping items that do not validate."""
+    cards = []
+    for item in items:
+        try:
+            cards.append(Flashcard.model_validate(item))
+        except ValidationError:
+            continue
+    return cards
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, strip punctuation and collapse whitespace."""
+    question = _NON_WORD.sub(" ", question.lower())
+    return _WHITESPACE.sub(" ", question).strip()
+
+
+def _shingles(normalized: str, size: int = 3) -> Set[str]:
+    words = normalized.split()
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+class FlashcardDeduplicator:
+    """Incrementally reject questions that repeat one already accepted.
+
+    A question is a duplicate if its normalized text hashes the same as an
+    accepted question, or if the Jaccard similarity of their word 3-gram
+    shingles is at least ``threshold``.
+
+    Args:
+        threshold: Shingle similarity at or above which questions are duplicates
+    """
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._hashes: Set[str] = set()
+        self._shingle_sets: List[Set[str]] = []
+
+    def add(self, question: str) -> bool:
+        """Record ``question`` and return True if it is not a duplicate."""
+        normalized = normalize_question(question)
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        if digest in self._hashes:
+            return False
+
+        shingles = _shingles(normalized)
+        for existing in self._shingle_sets:
+            union = len(shingles | existing)
+            if union and len(shingles & existing) / union >= self.threshold:
+                return False
+
+        self._hashes.add(digest)
+        self._shingle_sets.append(shingles)
+        return True
+
+
+def allocate_card_budget(
+    chunk_lengths: Sequence[int], total_cards: Optional[int]
+) -> List[Optional[int]]:
+    """Split ``total_cards`` across chunks in proportion to their length.
+
+    Uses largest-remainder rounding so the budgets sum to exactly
+    ``total_cards``. Short chunks may receive a budget of 0. When
+    ``total_cards`` is None every chunk gets None and the model decides.
+    """
+    if total_cards is None:
+        return [None] * len(chunk_lengths)
+
+    total_length = sum(chunk_lengths)
+    if total_length == 0:
+        return [0] * len(chunk_lengths)
+
+    shares = [total_cards * length / total_length for length in chunk_lengths]
+    budgets = [math.floor(share) for share in shares]
+    remaining = total_cards - sum(budgets)
+    by_remainder = sorted(
+        range(len(shares)), key=lambda i: shares[i] - budgets[i], reverse=True
+    )
+    for i in by_remainder[:remaining]:
+        budgets[i] += 1
+    return budgets
+
+
+def merge_flashcards(
+    chunk_cards: Sequence[Sequence[Flashcard]],
+    budgets: Sequence[Optional[int]],
+    total_cards: Optional[int],
+    deduplicator: FlashcardDeduplicator,
+) -> List[Flashcard]:
+    """Deduplicate per-chunk cards and trim them to ``total_cards``.
+
+    Each chunk first contributes up to its budget so coverage stays
+    proportional; leftover unique cards then fill any remaining slots in
+    chunk order.
+    """
+    kept: List[List[Flashcard]] = []
+    extras: List[Flashcard] = []
+    for cards, budget in zip(chunk_cards, budgets):
+        unique = [card for card in cards if deduplicator.add(card.question)]
+        limit = len(unique) if budget is None else budget
+        kept.append(unique[:limit])
+        extras.extend(unique[limit:])
+
+    merged = [card for cards in kept for card in cards]
+    if total_cards is None:
+        return merged + extras
+
+    merged.extend(extras[: max(0, total_cards - len(merged))])
+    return merged[:total_cards]
+
+
+class FlashcardStreamParser:
+    """Pick finished cards out of a streamed, partially parsed JSON array.
+
+    While the model is generating, the last element of the array may still
+    be incomplete, so ``feed`` only returns cards that have another card after
+    them; ``close`` returns whatever is left once the stream has ended.
+    Elements that do not validate as a ``Flashcard`` are skipped. Every card
+    returned so far is kept in ``cards``.
+    """
+
+    def __init__(self):
+        self.cards: List[Flashcard] = []
+        self._emitted = 0
+
+    def feed(self, items: Sequence[Dict[str, Any]]) -> List[Flashcard]:
+        return self._take(items, len(items) - 1)
+
+    def close(self, items: Sequence[Dict[str, Any]]) -> List[Flashcard]:
+        return self._take(items, len(items))
+
+    def _take(self, items: Sequence[Dict[str, Any]], end: int) -> List[Flashcard]:
+        cards = validate_flashcards(items[self._emitted : end])
+        self._emitted = max(self._emitted, end)
+        self.cards.extend(cards)
+        return cards
@@ -0,0 +1,606 @@
+"""Shared scheduler for outbound LLM calls.
+
+Every chain call goes through ``LLMScheduler.run`` (or ``run_sync``), which
+
+* takes one request and the call's estimated tokens from the model's
+  requests-per-minute and tokens-per-minute buckets,
+* waits for a slot under the model's adaptive (AIMD) concurrency limit,
+* retries calls the provider throttled (429/503) or that failed transiently,
+  after a jittered exponential backoff.
+
+State is guarded by thread locks and async waiters are woken through their
+own event loop, so one scheduler can be shared by the server's loop, the
+``asyncio.run`` loops of ``backend.ai.run`` and plain threads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import (
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Literal,
+    NamedTuple,
+    Optional,
+    TypeVar,
+)
+
+from backend.logs import get_logger
+from backend.metrics.pipeline_metrics import (
+    LLM_CONCURRENCY_LIMIT,
+    LLM_RETRIES,
+    LLM_SCHEDULER_WAIT_SECONDS,
+    LLM_THROTTLED,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+ErrorKind = Literal["throttled", "transient"]
+
+# Status codes and exception names (across the provider SDKs LangChain wraps)
+# that mean "slow down" and "try again"
+THROTTLE_STATUS_CODES = frozenset({429, 503})
+TRANSIENT_STATUS_CODES = frozenset({500, 502, 504})
+_THROTTLE_ERROR_NAMES = frozenset(
+    {"ResourceExhausted", "RateLimitError", "TooManyRequests", "ServiceUnavailable"}
+)
+_TRANSIENT_ERROR_NAMES = frozenset(
+    {
+        "InternalServerError",
+        "DeadlineExceeded",
+        "APITimeoutError",
+        "APIConnectionError",
+    }
+)
+
+# Weight of the newest sample in the running average of latency per token
+LATENCY_SMOOTHING = 0.2
+
+
+class ModelRateLimits(NamedTuple):
+    """Provider quota for a model. None means unlimited."""
+
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+def classify_error(error: BaseException) -> Optional[ErrorKind]:
+    """Tell whether a failed call was throttled, failed transiently, or neither.
+
+    Checks HTTP status codes and well-known exception names on ``error`` and
+    on the exceptions it wraps, since LangChain and the provider SDKs wrap
+    each other's errors.
+    """
+    seen = set()
+    current: Optional[BaseException] = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        status = _status_code(current)
+        name = type(current).__name__
+        if status in THROTTLE_STATUS_CODES or name in _THROTTLE_ERROR_NAMES:
+            return "throttled"
+        if (
+            status in TRANSIENT_STATUS_CODES
+            or name in _TRANSIENT_ERROR_NAMES
+            or isinstance(current, (TimeoutError, ConnectionError))
+        ):
+            return "transient"
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    response = getattr(error, "response", None)
+    for value in (
+        getattr(error, "status_code", None),
+        getattr(error, "code", None),
+        getattr(response, "status_code", None),
+    ):
+        # HTTPStatus is an int; gRPC status codes are not
+        if isinstance(value, int):
+            return int(value)
+    return None
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the provider asked us to wait, if it said."""
+    value = getattr(error, "retry_after", None)
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if value is None and headers is not None:
+        value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Allows ``per_minute`` units a minute, in bursts of up to ``capacity``.
+
+    Callers reserve units up front and then sleep until the bucket has
+    refilled enough to cover them, so they are served in the order they
+    asked and a large request is not starved by small ones.
+
+    Args:
+        per_minute: Refill rate
+        capacity: Largest burst. Defaults to one minute's worth
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        if per_minute <= 0:
+            raise ValueError(f"per_minute must be positive, got {per_minute}")
+        self.rate = per_minute / 60.0
+        self.capacity = per_minute if capacity is None else capacity
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` units and return how many seconds to wait before using them.
+
+        Amounts over ``capacity`` are capped, so an oversized call waits for
+        a full bucket instead of forever.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._level = min(
+                self.capacity, self._level + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._level -= min(amount, self.capacity)
+            return max(0.0, -self._level / self.rate)
+
+
+class AdaptiveConcurrencyLimit:
+    """Concurrency limit that grows while calls go well and shrinks under pressure.
+
+    Additive increase, multiplicative decrease: each successful call made
+    while the limit was in use adds ``1 / limit`` (about one slot per round
+    of calls). A throttled call multiplies the limit by ``backoff_ratio``. A
+    call whose latency per token is over ``latency_tolerance`` times the
+    running average multiplies it by ``latency_ratio``. After a decrease,
+    further decreases wait for about one average call latency, so a burst of
+    429s from calls that were already in flight only counts once.
+
+    Args:
+        initial: Starting limit
+        minimum: Lowest the limit can go
+        maximum: Highest the limit can go
+        backoff_ratio: Factor applied when a call is throttled
+        latency_ratio: Factor applied when a call is unusually slow
+        latency_tolerance: How many times the average latency counts as slow
+    """
+
+    def __init__(
+        self,
+        initial: float = 4,
+        minimum: float = 1,
+        maximum: float = 32,
+        backoff_ratio: float = 0.5,
+        latency_ratio: float = 0.9,
+        latency_tolerance: float = 2.0,
+    ):
+        self.minimum = max(1.0, float(minimum))
+        self.maximum = max(self.minimum, float(maximum))
+        self.limit = min(self.maximum, max(self.minimum, float(initial)))
+        self.backoff_ratio = backoff_ratio
+        self.latency_ratio = latency_ratio
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        # Running averages of call latency, in seconds and seconds per token
+        self._latency = 0.0
+        self._latency_per_token: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._waiters: Deque[Callable[[], None]] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for a slot on the running event loop."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(_resolve, granted)
+
+        with self._lock:
+            if self._try_take():
+                return
+            self._waiters.append(wake)
+
+        try:
+            await granted
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(wake)
+                    holds_slot = False
+                except ValueError:
+                    # The slot was handed over just before the cancellation
+                    holds_slot = True
+            if holds_slot:
+                self.release()
+            raise
+
+    def acquire_sync(self) -> None:
+        """Block the calling thread until a slot is free."""
+        granted = threading.Event()
+        with self._lock:
+            if self._try_take():
+                return
+            self._waiters.append(granted.set)
+        granted.wait()
+
+    def release(
+        self,
+        *,
+        throttled: bool = False,
+        latency: Optional[float] = None,
+        tokens: int = 1,
+    ) -> None:
+        """Give a slot back, adjusting the limit by how the call went.
+
+        Args:
+            throttled: The provider rejected the call as over quota or overloaded
+            latency: Seconds a successful call took. None for calls that
+                failed for other reasons
+            tokens: Estimated tokens of the call, to compare latencies of
+                calls of different sizes
+        """
+        with self._lock:
+            if throttled:
+                self._decrease(self.backoff_ratio)
+            elif latency is not None:
+                self._observe(latency, tokens)
+            self.in_flight -= 1
+            woken = []
+            while self._waiters and self._try_take():
+                woken.append(self._waiters.popleft())
+        for wake in woken:
+            wake()
+
+    def has_free_slot(self) -> bool:
+        """Whether an acquire would be granted right now."""
+        with self._lock:
+            return self.in_flight < int(self.limit)
+
+    def _observe(self, latency: float, tokens: int) -> None:
+        """Grow or shrink the limit after a successful call. Caller must hold the lock."""
+        per_token = latency / max(tokens, 1)
+        average = self._latency_per_token
+        if average is None:
+            self._latency, self._latency_per_token = latency, per_token
+        else:
+            self._latency += LATENCY_SMOOTHING * (latency - self._latency)
+            self._latency_per_token += LATENCY_SMOOTHING * (per_token - average)
+
+        if average is not None and per_token > average * self.latency_tolerance:
+            self._decrease(self.latency_ratio)
+        elif self.in_flight >= int(self.limit):
+            # Only a limit that is actually reached has shown it is safe to grow
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+
+    def _try_take(self) -> bool:
+        """Take a slot if one is free. Caller must hold the lock."""
+        if self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+    def _decrease(self, ratio: float) -> None:
+        """Shrink the limit unless it shrank within the last call latency.
+
+        Caller must hold the lock.
+        """
+        now = time.monotonic()
+        if now - self._last_decrease < self._latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * ratio)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _ModelState:
+    """Buckets and concurrency limit for one model."""
+
+    def __init__(
+        self, limits: ModelRateLimits, concurrency: AdaptiveConcurrencyLimit
+    ) -> None:
+        self.requests = (
+            TokenBucket(limits.requests_per_minute)
+            if limits.requests_per_minute
+            else None
+        )
+        self.tokens = (
+            TokenBucket(limits.tokens_per_minute) if limits.tokens_per_minute else None
+        )
+        self.concurrency = concurrency
+
+    def reserve(self, tokens: int) -> float:
+        """Take a request and ``tokens`` from the buckets; return the wait in seconds."""
+        delay = 0.0
+        if self.requests is not None:
+            delay = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.reserve(tokens))
+        return delay
+
+
+class LLMScheduler:
+    """Rate limits, adapts concurrency for, and retries outbound LLM calls per model.
+
+    Args:
+        default_limits: Quota applied to models without an entry in
+            ``model_limits``
+        model_limits: Quota per model, matched by longest prefix of the name
+        initial_concurrency: Starting concurrency limit for each model
+        max_concurrency: Ceiling for each model's concurrency limit
+        max_retries: Retries after a throttled or transient failure before
+            the error is raised
+        base_delay: Backoff before the first retry, in seconds. Doubles on
+            each retry, with jitter
+        max_delay: Longest backoff between retries, in seconds
+    """
+
+    def __init__(
+        self,
+        default_limits: ModelRateLimits = ModelRateLimits(),
+        model_limits: Optional[Dict[str, ModelRateLimits]] = None,
+        initial_concurrency: int = 4,
+        max_concurrency: int = 32,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ):
+        self.default_limits = default_limits
+        self.model_limits = dict(model_limits or {})
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._models: Dict[str, _ModelState] = {}
+        self._lock = threading.Lock()
+
+    async def run(
+        self,
+        model: Optional[str],
+        call: Callable[[], Awaitable[T]],
+        *,
+        chain: str,
+        tokens: int = 0,
+        retryable: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """Await ``call()`` once the model's limits allow it, retrying on throttling.
+
+        Args:
+            model: Model the call goes to
+            call: Makes the request. Called again for each retry
+            chain: Chain name for metrics and logs
+            tokens: Estimated prompt plus output tokens, for the tokens-per-minute
+                bucket and the latency signal
+            retryable: Checked before each retry. Return False once a retry
+                is no longer safe, e.g. after streamed output was handed on
+
+        Returns:
+            Whatever ``call()`` returned
+        """
+        state = self._state(model)
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            delay = state.reserve(tokens)
+            if delay:
+                await asyncio.sleep(delay)
+            await state.concurrency.acquire()
+            started = time.perf_counter()
+            LLM_SCHEDULER_WAIT_SECONDS.labels(model).observe(started - waited)
+            try:
+                result = await call()
+            except Exception as e:
+                backoff = self._after_failure(
+                    state, model, chain, e, attempt, retryable
+                )
+            except BaseException:
+                state.concurrency.release()
+                raise
+            else:
+                self._after_success(state, model, started, tokens)
+                return result
+            attempt += 1
+            await asyncio.sleep(backoff)
+
+    def run_sync(
+        self,
+        model: Optional[str],
+        call: Callable[[], T],
+        *,
+        chain: str,
+        tokens: int = 0,
+        retryable: Optional[Callable[[], bool]] = None,
+    ) -> T:
+        """Blocking version of ``run`` for callers without an event loop."""
+        state = self._state(model)
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            delay = state.reserve(tokens)
+            if delay:
+                time.sleep(delay)
+            state.concurrency.acquire_sync()
+            started = time.perf_counter()
+            LLM_SCHEDULER_WAIT_SECONDS.labels(model).observe(started - waited)
+            try:
+                result = call()
+            except Exception as e:
+                backoff = self._after_failure(
+                    state, model, chain, e, attempt, retryable
+                )
+            except BaseException:
+                state.concurrency.release()
+                raise
+            else:
+                self._after_success(state, model, started, tokens)
+                return result
+            attempt += 1
+            time.sleep(backoff)
+
+    def concurrency_limit(self, model: Optional[str]) -> float:
+        """Current adaptive concurrency limit for ``model``."""
+        return self._state(model).concurrency.limit
+
+    def has_spare_capacity(self, model: Optional[str]) -> bool:
+        """Whether a call to ``model`` would get a concurrency slot right away."""
+        return self._state(model).concurrency.has_free_slot()
+
+    def _after_success(
+        self, state: _ModelState, model: Optional[str], started: float, tokens: int
+    ) -> None:
+        state.concurrency.release(latency=time.perf_counter() - started, tokens=tokens)
+        LLM_CONCURRENCY_LIMIT.labels(model).set(state.concurrency.limit)
+
+    def _after_failure(
+        self,
+        state: _ModelState,
+        model: Optional[str],
+        chain: str,
+        error: Exception,
+        attempt: int,
+        retryable: Optional[Callable[[], bool]],
+    ) -> float:
+        """Release the slot after a failed call and return the backoff before retrying.
+
+        Raises:
+            Exception: ``error`` itself, when the call should not be retried
+        """
+        kind = classify_error(error)
+        state.concurrency.release(throttled=kind == "throttled")
+        LLM_CONCURRENCY_LIMIT.labels(model).set(state.concurrency.limit)
+        if kind == "throttled":
+            LLM_THROTTLED.labels(model).inc()
+        if (
+            kind is None
+            or attempt >= self.max_retries
+            or (retryable is not None and not retryable())
+        ):
+            raise error
+
+        backoff = self._backoff(attempt, error)
+        LLM_RETRIES.labels(chain, model).inc()
+        logger.warning(
+            "%s call to %s %s (%s); retry %d of %d in %.1fs, concurrency limit %.1f",
+            chain,
+            model,
+            kind,
+            type(error).__name__,
+            attempt + 1,
+            self.max_retries,
+            backoff,
+            state.concurrency.limit,
+        )
+        return backoff
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Exponential backoff with jitter, at least as long as a Retry-After."""
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        delay = cap / 2 + random.uniform(0, cap / 2)
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _state(self, model: Optional[str]) -> _ModelState:
+        key = model or ""
+        with self._lock:
+            state = self._models.get(key)
+            if state is None:
+                state = _ModelState(
+                    self._limits_for(key),
+                    AdaptiveConcurrencyLimit(
+                        initial=self.initial_concurrency, maximum=self.max_concurrency
+                    ),
+                )
+                self._models[key] = state
+                LLM_CONCURRENCY_LIMIT.labels(model).set(state.concurrency.limit)
+            return state
+
+    def _limits_for(self, model: str) -> ModelRateLimits:
+        matches = [prefix for prefix in self.model_limits if model.startswith(prefix)]
+        if not matches:
+            return self.default_limits
+        return self.model_limits[max(matches, key=len)]
+
+    @classmethod
+    def from_env(cls) -> "LLMScheduler":
+        """Build a scheduler from ``FLASHCARD_LLM_*`` environment variables.
+
+        ``FLASHCARD_LLM_RPM`` and ``FLASHCARD_LLM_TPM`` set the default quota.
+        ``FLASHCARD_LLM_MODEL_LIMITS`` overrides it per model prefix as JSON,
+        e.g. ``{"gemini-1.5-pro": {"rpm": 60, "tpm": 1000000}}``.
+        """
+        defaults = cls()
+        model_limits = {
+            model: ModelRateLimits(limits.get("rpm"), limits.get("tpm"))
+            for model, limits in json.loads(
+                os.getenv("FLASHCARD_LLM_MODEL_LIMITS", "{}")
+            ).items()
+        }
+        return cls(
+            default_limits=ModelRateLimits(
+                _optional_float(os.getenv("FLASHCARD_LLM_RPM", "")),
+                _optional_float(os.getenv("FLASHCARD_LLM_TPM", "")),
+            ),
+            model_limits=model_limits,
+            initial_concurrency=int(
+                os.getenv("FLASHCARD_LLM_CONCURRENCY", defaults.initial_concurrency)
+            ),
+            max_concurrency=int(
+                os.getenv("FLASHCARD_LLM_MAX_CONCURRENCY", defaults.max_concurrency)
+            ),
+            max_retries=int(
+                os.getenv("FLASHCARD_LLM_MAX_RETRIES", defaults.max_retries)
+            ),
+            base_delay=float(
+                os.getenv("FLASHCARD_LLM_BACKOFF_SECONDS", defaults.base_delay)
+            ),
+            max_delay=float(
+                os.getenv("FLASHCARD_LLM_MAX_BACKOFF_SECONDS", defaults.max_delay)
+            ),
+        )
+
+
+def _optional_float(value: str) -> Optional[float]:
+    return None if value.lower() in ("", "none") else float(value)
+
+
+_llm_scheduler: Optional[LLMScheduler] = None
+_llm_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Return the process-wide scheduler, built from the environment on first use."""
+    global _llm_scheduler
+    with _llm_scheduler_lock:
+        if _llm_scheduler is None:
+            _llm_scheduler = LLMScheduler.from_env()
+        return _llm_scheduler
+
+
+def set_llm_scheduler(scheduler: Optional[LLMScheduler]) -> None:
+    """Replace the process-wide scheduler. None rebuilds it on next use."""
+    global _llm_scheduler
+    with _llm_scheduler_lock:
+        _llm_scheduler = scheduler
@@ -0,0 +1,155 @@
+"""Estimate prompt sizes against model limits to pick how to call the flashcarder."""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Literal, NamedTuple
+
+# Average characters per token for English prose across the providers we use.
+# Deliberately a little low so estimates err on the large side.
+CHARS_PER_TOKEN = 3.5
+
+# Share of the context window we are willing to fill; the rest absorbs
+# estimation error
+CONTEXT_SAFETY_FRACTION = 0.9
+
+# Output tokens reserved per requested card, plus a fixed allowance for the
+# JSON wrapper, and the card count assumed when the form leaves it open
+TOKENS_PER_CARD = 80
+OUTPUT_OVERHEAD_TOKENS = 256
+DEFAULT_CARD_COUNT = 40
+
+
+class ModelLimits(NamedTuple):
+    context_window: int
+    max_output_tokens: int
+
+
+# Matched by longest prefix of the model name
+MODEL_LIMITS: Dict[str, ModelLimits] = {
+    "gemini-1.5-pro": ModelLimits(2_097_152, 8_192),
+    "gemini-1.5-flash": ModelLimits(1_048_576, 8_192),
+    "gemini-2.0-flash-thinking": ModelLimits(1_048_576, 65_536),
+    "gemini-2.0-flash": ModelLimits(1_048_576, 8_192),
+    "gemini-2.0-pro": ModelLimits(2_097_152, 8_192),
+    "gpt-4o": ModelLimits(128_000, 16_384),
+    "gpt-4-turbo": ModelLimits(128_000, 4_096),
+    "gpt-4": ModelLimits(8_192, 4_096),
+    "gpt-3.5-turbo": ModelLimits(16_385, 4_096),
+    "claude-3": ModelLimits(200_000, 4_096),
+    "claude-3-5": ModelLimits(200_000, 8_192),
+}
+
+DEFAULT_MODEL_LIMITS = ModelLimits(32_768, 4_096)
+
+
+class FlashcarderPlan(NamedTuple):
+    """How the flashcarder should be called for a given input."""
+
+    mode: Literal["single", "map_reduce"]
+    reason: str
+    input_tokens: int
+    prompt_overhead_tokens: int
+    output_reserve_tokens: int
+    output_needed_tokens: int
+    context_window: int
+    max_input_tokens: int
+    max_chunk_chars: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for ``text`` without a provider tokenizer."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def get_model_limits(model: str | None) -> ModelLimits:
+    """Look up the context window and output cap for ``model``."""
+    if not model:
+        return DEFAULT_MODEL_LIMITS
+    matches = [prefix for prefix in MODEL_LIMITS if model.startswith(prefix)]
+    if not matches:
+        return DEFAULT_MODEL_LIMITS
+    return MODEL_LIMITS[max(matches, key=len)]
+
+
+def output_needed(num_cards: int | None) -> int:
+    """Estimated output tokens for ``num_cards`` cards, however large."""
+    cards = DEFAULT_CARD_COUNT if num_cards is None else num_cards
+    return cards * TOKENS_PER_CARD + OUTPUT_OVERHEAD_TOKENS
+
+
+def output_reserve(num_cards: int | None, limits: ModelLimits) -> int:
+    """Tokens to keep free for the model's answer, capped at its output limit."""
+    return min(output_needed(num_cards), limits.max_output_tokens)
+
+
+def plan_flashcarder(
+    material: str,
+    prompt_overhead: str,
+    model: str | None,
+    num_cards: int | None,
+    max_chunk_chars: int,
+) -> FlashcarderPlan:
+    """Decide between one flashcarder call and map-reduce over chunks.
+
+    The material fits in a single call when it, the rest of the prompt and the
+    reserved output all fit in the usable part of the context window, and the
+    requested cards fit in the model's output limit. Chunk size for
+    map-reduce is capped so every chunk prompt fits as well, and so there are
+    enough chunks for each one's share of the cards to fit in one answer.
+
+    Args:
+        material: Cleaned subject material that will be inlined in the prompt
+        prompt_overhead: Everything else sent with it (system and human
+            prompts with the form fields filled in)
+        model: Flashcarder model name
+        num_cards: Number of cards requested, or None to let the model decide
+        max_chunk_chars: Configured upper bound on chunk size
+
+    Returns:
+        The chosen mode and the numbers it was based on
+
+    Raises:
+        ValueError: If the prompt and output reserve leave no room for material
+    """
+    limits = get_model_limits(model)
+    overhead_tokens = estimate_tokens(prompt_overhead)
+    reserve = output_reserve(num_cards, limits)
+    usable = int(limits.context_window * CONTEXT_SAFETY_FRACTION)
+    max_input_tokens = usable - overhead_tokens - reserve
+    if max_input_tokens <= 0:
+        raise ValueError(
+            f"Model {model} has no room for subject material: context window "
+            f"{limits.context_window}, prompt ~{overhead_tokens} tokens, "
+            f"output reserve {reserve}"
+        )
+    input_tokens = estimate_tokens(material)
+    needed = output_needed(num_cards)
+    chunk_chars = min(max_chunk_chars, int(max_input_tokens * CHARS_PER_TOKEN))
+
+    if input_tokens > max_input_tokens:
+        mode, reason = "map_reduce", "material does not fit the context window"
+    elif needed > limits.max_output_tokens:
+        mode = "map_reduce"
+        reason = (
+            f"~{needed} output tokens for the cards exceed the "
+            f"{limits.max_output_tokens}-token output limit"
+        )
+        # Cards are split across chunks by length, so enough equal chunks
+        # keep each chunk's share within one answer
+        card_tokens = limits.max_output_tokens - OUTPUT_OVERHEAD_TOKENS
+        calls = math.ceil((needed - OUTPUT_OVERHEAD_TOKENS) / max(card_tokens, 1))
+        chunk_chars = min(chunk_chars, math.ceil(len(material) / calls))
+    else:
+        mode, reason = "single", "fits one call"
+    return FlashcarderPlan(
+        mode=mode,
+        reason=reason,
+        input_tokens=input_tokens,
+        prompt_overhead_tokens=overhead_tokens,
+        output_reserve_tokens=reserve,
+        output_needed_tokens=needed,
+        context_window=limits.context_window,
+        max_input_tokens=max_input_tokens,
+        max_chunk_chars=max(1, chunk_chars),
+    )
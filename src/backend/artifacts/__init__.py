@@ -0,0 +1,3 @@
+from .artifact_store import ArtifactStore, compute_job_key
+
+__all__ = ["ArtifactStore", "compute_job_key"]
@@ -0,0 +1,136 @@
+"""Content-addressed storage for generated flashcard decks."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Union
+
+from backend.ingest import upload_sha256
+
+if TYPE_CHECKING:
+    from backend.models import UserForm
+
+
+def compute_job_key(
+    user_form: UserForm,
+    cleaner_model: str | None,
+    flashcarder_model: str | None,
+    pipeline_settings: Dict[str, Any] | None = None,
+) -> str:
+    """Hash the uploaded files, form settings and models into an artifact key.
+
+    Two submissions with the same files (in the same order), the same form
+    settings, models and pipeline options get the same key.
+
+    Args:
+        user_form: Form settings and uploaded subject material
+        cleaner_model: Model used by the cleaner chain
+        flashcarder_model: Model used by the flashcarder chain
+        pipeline_settings: Pipeline options that change the generated output
+
+    Returns:
+        Hex SHA-256 digest identifying the job's output
+    """
+    digest = hashlib.sha256()
+    for upload_file in user_form.subject_material:
+        file_hash = upload_sha256(upload_file)
+        digest.update(f"{upload_file.filename}:{file_hash}\n".encode())
+
+    settings = {
+        "course_name": user_form.course_name,
+        "difficulty": user_form.difficulty,
+        "school_level": user_form.school_level,
+        "subject": user_form.subject,
+        "rules": user_form.rules,
+        "num_flash_cards": user_form.num_flash_cards,
+        "cleaner_model": cleaner_model,
+        "flashcarder_model": flashcarder_model,
+        "pipeline_settings": pipeline_settings or {},
+    }
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Directory of compact deck files named by their job key, with TTL eviction.
+
+    Args:
+        root: Directory the artifacts are written to
+        ttl: Seconds an artifact is kept after it was last written
+    """
+
+    suffix = ".deck.json"
+
+    def __init__(self, root: Union[str, Path], ttl: float = 24 * 3600.0):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / f"{key}{self.suffix}"
+
+    def exists(self, key: str) -> bool:
+        path = self.path_for(key)
+        return path.exists() and not self._is_expired(path)
+
+    def get(self, key: str) -> str | None:
+        """Return the stored deck for ``key``, or None if missing or expired."""
+        path = self.path_for(key)
+        try:
+            if self._is_expired(path):
+                return None
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, deck: str) -> Path:
+        """Atomically write the deck for ``key`` and return the artifact path."""
+        path = self.path_for(key)
+        fd, temp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(deck)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+
+        self._maybe_evict()
+        return path
+
+    def evict_expired(self) -> int:
+        """Delete every artifact older than the TTL.
+
+        Returns:
+            Number of artifacts removed
+        """
+        removed = 0
+        for path in self.root.glob(f"*{self.suffix}"):
+            try:
+                if self._is_expired(path):
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _is_expired(self, path: Path) -> bool:
+        return time.time() - path.stat().st_mtime > self.ttl
+
+    def _maybe_evict(self) -> None:
+        # Sweeping the directory on every write is wasteful; do it a few times per TTL
+        with self._lock:
+            now = time.time()
+            if now - self._last_sweep < self.ttl / 10:
+                return
+            self._last_sweep = now
+        self.evict_expired()
@@ -0,0 +1,13 @@
+from .backends import CacheBackend, CountingCache, MemoryLRUBackend
+from .sqlite_store import SQLiteBlobStore
+from .parse_cache import ParseCache
+from .response_cache import ResponseCache
+
+__all__ = [
+    "CacheBackend",
+    "CountingCache",
+    "MemoryLRUBackend",
+    "SQLiteBlobStore",
+    "ParseCache",
+    "ResponseCache",
+]
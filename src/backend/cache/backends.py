@@ -0,0 +1,80 @@
+"""Pluggable storage backends for the caches in this package."""
+
+from __future__ import annotations
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Tuple
+
+
+class CacheBackend(ABC):
+    """Byte-blob key/value storage used by ``ParseCache`` and ``ResponseCache``."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes | None:
+        """Return the blob for ``key``, or None if it is missing or expired."""
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: bytes) -> None:
+        """Store ``value`` under ``key``."""
+        pass
+
+
+class MemoryLRUBackend(CacheBackend):
+    """In-process LRU cache, optionally expiring entries after ``ttl`` seconds.
+
+    Args:
+        max_entries: Number of entries kept before the least recently used is dropped
+        ttl: Seconds an entry stays valid after it was written, or None to never expire
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float | None = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if self.ttl is not None and time.time() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class CountingCache:
+    """Base for caches that count hits and misses against a storage backend."""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def _lookup(self, key: str) -> bytes | None:
+        blob = self.backend.get(key)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return blob
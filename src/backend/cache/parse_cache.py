@@ -0,0 +1,46 @@
+"""Cache of parsed document segments keyed by file content and parser version."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import TYPE_CHECKING, List, Type
+
+from .backends import CountingCache
+
+if TYPE_CHECKING:
+    from backend.parsers import BaseDocumentParser
+
+
+class ParseCache(CountingCache):
+    """Skip re-parsing files that have been parsed before.
+
+    Entries are keyed by the SHA-256 of the file bytes plus the parser class
+    and its ``version``, so bumping a parser's version invalidates its entries.
+    Segments are stored as zlib-compressed JSON.
+
+    Args:
+        backend: Storage backend, normally a ``SQLiteBlobStore``
+    """
+
+    @staticmethod
+    def key_for(file_bytes: bytes, parser_cls: Type[BaseDocumentParser]) -> str:
+        content_hash = hashlib.sha256(file_bytes).hexdigest()
+        return ParseCache.key_for_hash(content_hash, parser_cls)
+
+    @staticmethod
+    def key_for_hash(content_hash: str, parser_cls: Type[BaseDocumentParser]) -> str:
+        """Like ``key_for``, for a file whose SHA-256 is already known."""
+        return f"parse:{parser_cls.__qualname__}:{parser_cls.version}:{content_hash}"
+
+    def get(self, key: str) -> List[str] | None:
+        """Return cached segments for ``key``, counting the hit or miss."""
+        blob = self._lookup(key)
+        if blob is None:
+            return None
+        return json.loads(zlib.decompress(blob))
+
+    def put(self, key: str, segments: List[str]) -> None:
+        blob = zlib.compress(json.dumps(segments).encode("utf-8"))
+        self.backend.put(key, blob)
@@ -0,0 +1,46 @@
+"""Cache of LLM responses keyed by model, prompts and normalized input."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+
+from .backends import CountingCache
+
+_HORIZONTAL_WHITESPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize line endings and whitespace runs that do not change meaning."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _HORIZONTAL_WHITESPACE.sub(" ", text)
+    text = "\n".join(line.strip() for line in text.split("\n"))
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+class ResponseCache(CountingCache):
+    """Reuse LLM responses for inputs that have been sent before.
+
+    Only deterministic (temperature 0) chains should be cached. Keys cover
+    the model, every prompt template and the normalized input, so editing a
+    prompt invalidates its entries.
+
+    Args:
+        backend: Storage backend, e.g. ``MemoryLRUBackend`` or ``SQLiteBlobStore``
+    """
+
+    @staticmethod
+    def key_for(model: str, *prompts: str, text: str) -> str:
+        digest = hashlib.sha256()
+        for part in (model, *prompts, normalize_text(text)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return f"response:{digest.hexdigest()}"
+
+    def get(self, key: str) -> str | None:
+        blob = self._lookup(key)
+        return None if blob is None else blob.decode("utf-8")
+
+    def put(self, key: str, response: str) -> None:
+        self.backend.put(key, response.encode("utf-8"))
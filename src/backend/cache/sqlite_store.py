@@ -0,0 +1,188 @@
+"""SQLite-backed blob store with least-recently-used eviction."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+from .backends import CacheBackend
+
+# After going over ``max_bytes``, evict down to this share of it so the
+# next writes do not each have to evict again
+EVICT_TO_RATIO = 0.9
+
+# Least-recently-used rows read per eviction query
+EVICT_BATCH = 64
+
+# Keep blob_stats.total_bytes equal to the sum of blobs.size
+_TOTAL_BYTES_TRIGGERS = (
+    """
+    CREATE TRIGGER IF NOT EXISTS blobs_insert AFTER INSERT ON blobs
+    BEGIN
+        UPDATE blob_stats SET total_bytes = total_bytes + NEW.size;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blobs_delete AFTER DELETE ON blobs
+    BEGIN
+        UPDATE blob_stats SET total_bytes = total_bytes - OLD.size;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blobs_update AFTER UPDATE OF size ON blobs
+    BEGIN
+        UPDATE blob_stats SET total_bytes = total_bytes - OLD.size + NEW.size;
+    END
+    """,
+)
+
+
+class SQLiteBlobStore(CacheBackend):
+    """Key/value store for byte blobs in a single SQLite file.
+
+    Entries are evicted least-recently-used first, down to ``EVICT_TO_RATIO``
+    of ``max_bytes``, whenever the total stored size goes over ``max_bytes``,
+    and are treated as missing once they are older than ``ttl``. The total is
+    kept in a one-row table that triggers update in the same transaction as
+    each write, so a write does not have to sum every row. The database runs
+    in WAL mode so several server processes can share one file.
+
+    Args:
+        path: SQLite database file, created if missing
+        max_bytes: Size cap for the sum of all stored blobs
+        ttl: Seconds an entry stays valid after it was written, or None to never expire
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl: float | None = None,
+    ):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._transaction():
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS blobs (
+                    key TEXT PRIMARY KEY,
+                    value BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)"
+            )
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS blob_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    total_bytes INTEGER NOT NULL
+                )
+                """)
+            # Files written before the stats table existed are summed once
+            self._conn.execute(
+                "INSERT OR IGNORE INTO blob_stats (id, total_bytes) "
+                "SELECT 0, COALESCE(SUM(size), 0) FROM blobs"
+            )
+            for trigger in _TOTAL_BYTES_TRIGGERS:
+                self._conn.execute(trigger)
+
+    def get(self, key: str) -> bytes | None:
+        """Return the blob for ``key`` and mark it as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM blobs WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            now = time.time()
+            if self.ttl is not None and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE blobs SET last_access = ? WHERE key = ?", (now, key)
+            )
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store ``value`` under ``key``, evicting old entries to stay under the cap."""
+        if len(value) > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock, self._transaction():
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete
+            # would not fire the delete trigger
+            self._conn.execute(
+                "INSERT INTO blobs (key, value, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "size = excluded.size, created_at = excluded.created_at, "
+                "last_access = excluded.last_access",
+                (key, value, len(value), now, now),
+            )
+            if self._total_bytes() > self.max_bytes:
+                self._evict()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _total_bytes(self) -> int:
+        """Size of all stored blobs. Caller must hold the lock."""
+        return self._conn.execute(
+            "SELECT total_bytes FROM blob_stats WHERE id = 0"
+        ).fetchone()[0]
+
+    def _evict(self) -> None:
+        """Drop expired blobs, then least-recently-used ones down to the low mark.
+
+        Caller must hold the lock.
+        """
+        if self.ttl is not None:
+            self._conn.execute(
+                "DELETE FROM blobs WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+
+        total = self._total_bytes()
+        target = self.max_bytes * EVICT_TO_RATIO
+        while total > target:
+            rows = self._conn.execute(
+                "SELECT key, size FROM blobs ORDER BY last_access ASC LIMIT ?",
+                (EVICT_BATCH,),
+            ).fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                if total <= target:
+                    break
+                self._conn.execute("DELETE FROM blobs WHERE key = ?", (key,))
+                total -= size
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """Run statements as one write transaction, seen by other processes whole."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
@@ -0,0 +1,345 @@
+"""``flashcardfactory`` command: generate decks for a whole folder of course material.
+
+Every supported file under the input directory is assigned to a lecture.
+Files in a subdirectory belong to that subdirectory's lecture; files at the
+top level are grouped by the lecture/week/chapter number in their name, or
+stand alone when they have none. Each lecture goes through the same pipeline
+as the web form and gets one deck in the output directory.
+
+Progress is recorded in ``manifest.json`` next to the decks, keyed by the
+same content hash the artifact store uses, so an interrupted run picks up
+where it left off and unchanged lectures are skipped on later runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+from fastapi import UploadFile
+
+from backend.ai import arun
+from backend.artifacts import compute_job_key
+from backend.ingest import SpooledUpload
+from backend.logs import configure_logging
+from backend.models import Deck, PipelineSettings, UserForm
+from backend.parsers import get_parser_for_file
+
+MANIFEST_NAME = "manifest.json"
+
+# "Lecture 3 slides.pdf", "lec03_notes.docx", "week-3.txt" -> "lecture-3"/"week-3"
+_LECTURE_NUMBER = re.compile(
+    r"\b(lecture|lec|week|chapter|ch|unit|module|session|class)[\s_\-]*0*(\d+)",
+    re.IGNORECASE,
+)
+_ALIASES = {"lec": "lecture", "ch": "chapter"}
+_UNSAFE_NAME_CHARS = re.compile(r"[^\w.\-]+")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Entry point of the ``flashcardfactory`` console script."""
+    args = _build_arg_parser().parse_args(argv)
+
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        pass
+    configure_logging(args.log_level)
+
+    api_key = args.api_key or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        print("Error: set GOOGLE_API_KEY or pass --api-key", file=sys.stderr)
+        return 2
+
+    input_dir = Path(args.input_dir)
+    if not input_dir.is_dir():
+        print(f"Error: {input_dir} is not a directory", file=sys.stderr)
+        return 2
+
+    output_dir = Path(args.output) if args.output else input_dir / "decks"
+    groups = group_lectures(
+        discover_files(input_dir, exclude=output_dir), root=input_dir
+    )
+    if not groups:
+        print(f"No supported files found under {input_dir}")
+        return 0
+
+    failed = asyncio.run(
+        run_batch(
+            groups,
+            output_dir,
+            api_key,
+            form_fields={
+                "course_name": args.course_name or input_dir.resolve().name,
+                "difficulty": args.difficulty,
+                "school_level": args.school_level,
+                "subject": args.subject or args.course_name or input_dir.name,
+                "rules": args.rules,
+                "num_flash_cards": args.num_cards,
+            },
+            cleaner_model=args.cleaner_model,
+            flashcarder_model=args.flashcarder_model,
+            concurrency=args.concurrency,
+            force=args.force,
+            write_tsv=args.tsv,
+        )
+    )
+    return 1 if failed else 0
+
+
+def discover_files(root: Path, exclude: Path | None = None) -> List[Path]:
+    """Every file under ``root`` that a registered parser can read, sorted.
+
+    Hidden files and directories, and anything under ``exclude``, are skipped.
+    """
+    excluded = exclude.resolve() if exclude is not None else None
+    files = []
+    for path in sorted(root.rglob("*")):
+        relative = path.relative_to(root)
+        if any(part.startswith(".") for part in relative.parts):
+            continue
+        if excluded is not None and excluded in path.resolve().parents:
+            continue
+        if not path.is_file():
+            continue
+        try:
+            get_parser_for_file(path)
+        except ValueError:
+            continue
+        files.append(path)
+    return files
+
+
+def group_lectures(
+    files: Sequence[Path], root: Path | None = None
+) -> Dict[str, List[Path]]:
+    """Assign files to lectures.
+
+    Args:
+        files: Files to group, as returned by ``discover_files``
+        root: Directory the files were found under. Defaults to their
+            common parent
+
+    Returns:
+        Lecture name -> files, both in sorted order
+    """
+    if not files:
+        return {}
+    if root is None:
+        root = Path(os.path.commonpath([str(path.parent) for path in files]))
+
+    groups: Dict[str, List[Path]] = {}
+    for path in files:
+        relative = path.relative_to(root)
+        if len(relative.parts) > 1:
+            name = "-".join(relative.parts[:-1])
+        else:
+            match = _LECTURE_NUMBER.search(path.stem)
+            if match:
+                prefix = match.group(1).lower()
+                name = f"{_ALIASES.get(prefix, prefix)}-{int(match.group(2))}"
+            else:
+                name = path.stem
+        groups.setdefault(_safe_name(name), []).append(path)
+    return dict(sorted(groups.items()))
+
+
+async def run_batch(
+    groups: Dict[str, List[Path]],
+    output_dir: Path,
+    api_key: str,
+    form_fields: Dict[str, Any],
+    cleaner_model: str | None,
+    flashcarder_model: str | None,
+    concurrency: int = 2,
+    force: bool = False,
+    write_tsv: bool = False,
+) -> List[str]:
+    """Generate a deck per lecture, up to ``concurrency`` lectures at a time.
+
+    Args:
+        groups: Lecture name -> files, as returned by ``group_lectures``
+        output_dir: Directory the decks and the manifest are written to
+        api_key: API key for the LLM provider
+        form_fields: ``UserForm`` fields other than the subject material
+        cleaner_model: Model used by the cleaner chain
+        flashcarder_model: Model used by the flashcarder chain
+        concurrency: Maximum number of lectures in the pipeline at once
+        force: Regenerate lectures the manifest lists as complete
+        write_tsv: Also write a Quizlet/Anki ``.tsv`` next to each deck
+
+    Returns:
+        Names of the lectures that failed
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = _load_manifest(manifest_path)
+    settings = PipelineSettings.from_env()
+    slots = asyncio.Semaphore(max(1, concurrency))
+    manifest_lock = asyncio.Lock()
+    failed: List[str] = []
+
+    async def generate(name: str, files: List[Path]) -> None:
+        # Files are only opened and hashed once a slot is free, so a large
+        # course never holds more than a few lectures' file handles at once
+        async with slots:
+            uploads: List[UploadFile] = []
+            try:
+                uploads = await asyncio.to_thread(_load_files, files)
+                await generate_lecture(name, files, uploads)
+            except Exception as e:
+                print(f"[{name}] failed: {e}", file=sys.stderr)
+                failed.append(name)
+            finally:
+                for upload in uploads:
+                    upload.file.close()
+
+    async def generate_lecture(
+        name: str, files: List[Path], uploads: List[UploadFile]
+    ) -> None:
+        user_form = UserForm(subject_material=uploads, **form_fields)
+        key = compute_job_key(
+            user_form, cleaner_model, flashcarder_model, settings.output_settings()
+        )
+        deck_path = output_dir / f"{name}.deck.json"
+        entry = manifest["lectures"].get(name)
+        if (
+            not force
+            and entry is not None
+            and entry.get("key") == key
+            and deck_path.exists()
+        ):
+            print(f"[{name}] up to date, skipping")
+            return
+
+        print(f"[{name}] generating from {len(files)} file(s)")
+        started = time.perf_counter()
+        result = await arun(
+            user_form,
+            api_key,
+            cleaner_model=cleaner_model,
+            flashcarder_model=flashcarder_model,
+            on_stage=lambda stage: print(f"[{name}] {stage}"),
+            settings=settings,
+        )
+
+        deck: Deck = result["deck"]
+        await asyncio.to_thread(_write_atomic, deck_path, deck.to_compact())
+        if write_tsv:
+            await asyncio.to_thread(
+                _write_atomic, output_dir / f"{name}.tsv", deck.to_tsv()
+            )
+        print(
+            f"[{name}] wrote {len(deck.flashcards)} cards to {deck_path} "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+
+        async with manifest_lock:
+            manifest["lectures"][name] = {
+                "key": key,
+                "deck": deck_path.name,
+                "files": [str(path) for path in files],
+                "cards": len(deck.flashcards),
+                "completed_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            }
+            await asyncio.to_thread(
+                _write_atomic, manifest_path, json.dumps(manifest, indent=2)
+            )
+
+    await asyncio.gather(*(generate(name, files) for name, files in groups.items()))
+
+    done = len(groups) - len(failed)
+    print(f"{done}/{len(groups)} lectures complete, decks in {output_dir}")
+    if failed:
+        print(f"Failed: {', '.join(sorted(failed))}", file=sys.stderr)
+    return failed
+
+
+def _build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="flashcardfactory",
+        description="Generate a flashcard deck for every lecture in a course folder.",
+    )
+    parser.add_argument("input_dir", help="Directory of course materials")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Directory for decks and the manifest (default: INPUT_DIR/decks)",
+    )
+    parser.add_argument("--course-name", help="Course name (default: folder name)")
+    parser.add_argument("--subject", help="Subject (default: course name)")
+    parser.add_argument("--difficulty", default="medium")
+    parser.add_argument("--school-level", default="undergraduate")
+    parser.add_argument("--rules", default="", help="Extra instructions for the model")
+    parser.add_argument(
+        "-n", "--num-cards", type=int, help="Cards per lecture (default: model decides)"
+    )
+    parser.add_argument("--cleaner-model", default="gemini-1.5-pro")
+    parser.add_argument("--flashcarder-model", default="gemini-1.5-pro")
+    parser.add_argument(
+        "-j",
+        "--concurrency",
+        type=int,
+        default=2,
+        help="Lectures processed at once (default: 2)",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Regenerate lectures that are up to date"
+    )
+    parser.add_argument(
+        "--tsv", action="store_true", help="Also write a .tsv export per lecture"
+    )
+    parser.add_argument("--api-key", help="LLM API key (default: $GOOGLE_API_KEY)")
+    parser.add_argument(
+        "--log-level",
+        help="Pipeline log level, e.g. DEBUG to log full payloads "
+        "(default: $FLASHCARD_LOG_LEVEL or INFO)",
+    )
+    return parser
+
+
+def _load_files(files: Sequence[Path]) -> List[UploadFile]:
+    # The files are already on disk, so they are parsed in place, not copied
+    return [SpooledUpload.from_path(path) for path in files]
+
+
+def _load_manifest(path: Path) -> Dict[str, Any]:
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"lectures": {}}
+    except json.JSONDecodeError:
+        print(f"Warning: ignoring unreadable manifest {path}", file=sys.stderr)
+        return {"lectures": {}}
+    manifest.setdefault("lectures", {})
+    return manifest
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def _safe_name(name: str) -> str:
+    return _UNSAFE_NAME_CHARS.sub("_", name).strip("_") or "lecture"
+
+
+if __name__ == "__main__":
+    sys.exit(main())
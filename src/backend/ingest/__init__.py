@@ -0,0 +1,17 @@
+from .body_limit import RequestBodyLimitMiddleware
+from .upload_spool import (
+    SpooledUpload,
+    UploadSpool,
+    UploadTooLargeError,
+    file_sha256,
+    upload_sha256,
+)
+
+__all__ = [
+    "RequestBodyLimitMiddleware",
+    "SpooledUpload",
+    "UploadSpool",
+    "UploadTooLargeError",
+    "file_sha256",
+    "upload_sha256",
+]
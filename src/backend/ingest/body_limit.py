@@ -0,0 +1,100 @@
+"""Reject oversized request bodies while they are still being received."""
+
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable, Collection, Dict, MutableMapping
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from backend.logs import get_logger
+from .upload_spool import _format_bytes
+
+logger = get_logger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class RequestBodyLimitMiddleware:
+    """ASGI middleware capping the size of request bodies on some paths.
+
+    A request whose ``Content-Length`` is over ``max_bytes`` is answered 413
+    before any of its body is read. Otherwise the body is counted as it
+    arrives, and receiving stops with a 413 as soon as it passes
+    ``max_bytes``, so neither a missing nor a false ``Content-Length`` lets
+    an oversized upload be spooled in full.
+
+    Args:
+        app: The wrapped application
+        max_bytes: Largest body accepted, None for no limit
+        paths: Paths the limit applies to. None for every path
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_bytes: int | None,
+        paths: Collection[str] | None = None,
+    ):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.paths = None if paths is None else frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or self.max_bytes is None
+            or (self.paths is not None and scope["path"] not in self.paths)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        declared = _content_length(scope)
+        if declared is not None and declared > self.max_bytes:
+            logger.warning(
+                "Rejected %s: Content-Length %d is over %d bytes",
+                scope["path"],
+                declared,
+                self.max_bytes,
+            )
+            response = JSONResponse(status_code=413, content={"detail": self.detail})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    logger.warning(
+                        "Rejected %s: body passed %d bytes while receiving",
+                        scope["path"],
+                        self.max_bytes,
+                    )
+                    # Raised where the body is read, so the app's exception
+                    # handling turns it into the response
+                    raise HTTPException(status_code=413, detail=self.detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @property
+    def detail(self) -> str:
+        return f"Request is larger than the {_format_bytes(self.max_bytes)} limit"
+
+
+def _content_length(scope: Scope) -> int | None:
+    for name, value in scope.get("headers", ()):
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
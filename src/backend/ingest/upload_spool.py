@@ -0,0 +1,218 @@
+"""Stream uploads to disk, hashing them and enforcing size limits on the way."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Mapping, Optional, Union
+
+from fastapi import UploadFile
+
+from backend.logs import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes read and written per step, so memory use does not grow with upload size
+BLOCK_SIZE = 1024 * 1024
+
+_SPOOL_PREFIX = "upload-"
+_SAFE_SUFFIX = re.compile(r"^\.[A-Za-z0-9]{1,10}$")
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the per-file or per-request size limit."""
+
+
+def file_sha256(file: BinaryIO, block_size: int = BLOCK_SIZE) -> str:
+    """Hash a file object from the start in blocks and rewind it afterwards."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for block in iter(lambda: file.read(block_size), b""):
+        digest.update(block)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def upload_sha256(upload_file: UploadFile) -> str:
+    """SHA-256 of an upload, reusing the hash computed while it was spooled."""
+    if isinstance(upload_file, SpooledUpload):
+        return upload_file.sha256
+    return file_sha256(upload_file.file)
+
+
+class SpooledUpload(UploadFile):
+    """An ``UploadFile`` backed by a file on disk whose hash is already known.
+
+    Parsers are handed ``path`` instead of the file's bytes, and cache keys
+    use ``sha256`` instead of hashing the content again.
+
+    Attributes:
+        path: Where the content is stored. Its suffix matches ``filename``'s
+        sha256: Hex SHA-256 of the content
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        filename: str,
+        sha256: str,
+        size: int,
+        headers: Optional[Mapping[str, str]] = None,
+    ):
+        super().__init__(
+            file=open(path, "rb"), size=size, filename=filename, headers=headers
+        )
+        self.path = Path(path)
+        self.sha256 = sha256
+
+    @classmethod
+    def from_path(
+        cls, path: Union[str, Path], filename: Optional[str] = None
+    ) -> "SpooledUpload":
+        """Wrap a file that is already on disk without copying it."""
+        path = Path(path)
+        with open(path, "rb") as file:
+            sha256 = file_sha256(file)
+        return cls(path, filename or path.name, sha256, path.stat().st_size)
+
+
+class UploadSpool:
+    """Per-job directory that uploads are streamed into.
+
+    Each upload is copied ``BLOCK_SIZE`` bytes at a time, hashed as it is
+    copied, and rejected with ``UploadTooLargeError`` as soon as it passes
+    ``max_file_bytes`` or the request passes ``max_request_bytes``. Call
+    ``cleanup`` once the job no longer needs the files.
+
+    By the time a ``fastapi.UploadFile`` reaches the spool, Starlette has
+    already received it, so these limits only bound what is copied. Wrap the
+    app in ``RequestBodyLimitMiddleware`` to stop an oversized request while
+    it is still being received.
+
+    Args:
+        root: Directory the per-job spool directories are created in.
+            Defaults to the system temp directory
+        max_file_bytes: Largest single upload accepted, None for no limit
+        max_request_bytes: Largest total of all uploads, None for no limit
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path, None] = None,
+        max_file_bytes: Optional[int] = None,
+        max_request_bytes: Optional[int] = None,
+    ):
+        if root is not None:
+            Path(root).mkdir(parents=True, exist_ok=True)
+        self.directory = Path(tempfile.mkdtemp(prefix=_SPOOL_PREFIX, dir=root))
+        self.max_file_bytes = max_file_bytes
+        self.max_request_bytes = max_request_bytes
+        self.total_bytes = 0
+        self.uploads: List[SpooledUpload] = []
+
+    async def add(self, upload_file: UploadFile) -> SpooledUpload:
+        """Stream one upload into the spool.
+
+        Raises:
+            UploadTooLargeError: If a size limit is exceeded. The partial copy
+                is removed, but earlier uploads stay until ``cleanup``
+        """
+        filename = upload_file.filename or "upload"
+        # Fail before copying anything when the client declared the size
+        if upload_file.size is not None:
+            self._check_size(filename, upload_file.size, self.total_bytes)
+
+        suffix = os.path.splitext(filename)[1].lower()
+        if not _SAFE_SUFFIX.match(suffix):
+            suffix = ""
+        path = self.directory / f"{len(self.uploads):04d}{suffix}"
+
+        digest = hashlib.sha256()
+        size = 0
+        await upload_file.seek(0)
+        try:
+            with open(path, "wb") as out:
+                while block := await upload_file.read(BLOCK_SIZE):
+                    size += len(block)
+                    self._check_size(filename, size, self.total_bytes + size)
+                    digest.update(block)
+                    await asyncio.to_thread(out.write, block)
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+        self.total_bytes += size
+        spooled = SpooledUpload(
+            path, filename, digest.hexdigest(), size, headers=upload_file.headers
+        )
+        self.uploads.append(spooled)
+        return spooled
+
+    async def add_all(self, upload_files: Iterable[UploadFile]) -> List[SpooledUpload]:
+        """Stream every upload into the spool, in order.
+
+        The spool is cleaned up if any upload is rejected.
+        """
+        try:
+            return [await self.add(upload_file) for upload_file in upload_files]
+        except BaseException:
+            self.cleanup()
+            raise
+
+    def cleanup(self) -> None:
+        """Close the spooled files and delete the spool directory."""
+        for upload in self.uploads:
+            upload.file.close()
+        self.uploads.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _check_size(self, filename: str, file_bytes: int, request_bytes: int) -> None:
+        if self.max_file_bytes is not None and file_bytes > self.max_file_bytes:
+            raise UploadTooLargeError(
+                f"{filename} is larger than the {_format_bytes(self.max_file_bytes)} "
+                "limit per file"
+            )
+        if (
+            self.max_request_bytes is not None
+            and request_bytes > self.max_request_bytes
+        ):
+            raise UploadTooLargeError(
+                f"Uploads are larger than the {_format_bytes(self.max_request_bytes)} "
+                "limit per request"
+            )
+
+    @staticmethod
+    def remove_stale(root: Union[str, Path], max_age: float = 0.0) -> int:
+        """Delete spool directories under ``root`` older than ``max_age`` seconds.
+
+        Meant for startup, when no job from a previous process can still be
+        using its files.
+
+        Returns:
+            Number of directories removed
+        """
+        root = Path(root)
+        if not root.is_dir():
+            return 0
+        cutoff = time.time() - max_age
+        removed = 0
+        for directory in root.glob(f"{_SPOOL_PREFIX}*"):
+            try:
+                if directory.is_dir() and directory.stat().st_mtime <= cutoff:
+                    shutil.rmtree(directory, ignore_errors=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        if removed:
+            logger.info("Removed %d stale upload spool directories", removed)
+        return removed
+
+
+def _format_bytes(size: int) -> str:
+    return f"{size / (1024 * 1024):.3g} MiB"
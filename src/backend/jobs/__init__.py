@@ -0,0 +1,3 @@
+from .job_queue import Job, JobQueue, JobStatus, QueueFullError, PIPELINE_STAGES
+
+__all__ = ["Job", "JobQueue", "JobStatus", "QueueFullError", "PIPELINE_STAGES"]
@@ -0,0 +1,340 @@
+"""In-process job queue for running the flashcard pipeline off the request path."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from backend.logs import get_logger
+from backend.metrics.pipeline_metrics import (
+    JOBS,
+    JOBS_COALESCED,
+    JOBS_IN_PROGRESS,
+    QUEUE_WAIT_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from backend.models import Flashcard
+
+logger = get_logger(__name__)
+
+# Stages reported by ``backend.ai.run`` through its ``on_stage`` callback
+PIPELINE_STAGES = ("parse", "clean", "flashcard")
+
+StageCallback = Callable[[str], None]
+CardCallback = Callable[["Flashcard"], None]
+Pipeline = Callable[[StageCallback, CardCallback], Awaitable[Dict[str, Any]]]
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the queue has no room for another job."""
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job:
+    """State of a single pipeline run, updated by the task running its pipeline.
+
+    Every update is also appended to ``events`` so clients can follow the run
+    as a stream: ``stage`` when a stage starts, ``card`` for each flashcard,
+    then ``done`` or ``error``.
+
+    ``timings`` holds how long the job waited for a worker ("queue") and how
+    long each stage took, in seconds.
+
+    ``key`` identifies the job's output (see ``compute_job_key``), and
+    ``submissions`` counts how many identical submissions share this job.
+    """
+
+    def __init__(self, job_id: str, key: Optional[str] = None):
+        self.job_id = job_id
+        self.key = key
+        self.submissions = 1
+        self.status = JobStatus.QUEUED
+        self.stages: Dict[str, str] = {stage: "pending" for stage in PIPELINE_STAGES}
+        self.current_stage: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.events: List[Dict[str, Any]] = []
+        self.timings: Dict[str, float] = {}
+        self._stage_started_at: Optional[float] = None
+        self._card_count = 0
+        self._lock = threading.Lock()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = []
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def mark_running(self) -> None:
+        with self._lock:
+            self.status = JobStatus.RUNNING
+            self.started_at = time.time()
+            self.timings["queue"] = self.started_at - self.created_at
+
+    def update_stage(self, stage: str) -> None:
+        """Mark ``stage`` as running and the previous stage as done."""
+        with self._lock:
+            if self.current_stage is not None:
+                self.stages[self.current_stage] = "done"
+            self._end_stage_timing()
+            self.current_stage = stage
+            self.stages[stage] = "running"
+            self._stage_started_at = time.perf_counter()
+            self._add_event("stage", {"stage": stage})
+
+    def add_card(self, card: Flashcard) -> None:
+        """Publish a flashcard as soon as the pipeline produces it."""
+        with self._lock:
+            self._add_event("card", {"index": self._card_count, **card.model_dump()})
+            self._card_count += 1
+
+    def mark_succeeded(self, result: Dict[str, Any]) -> None:
+        with self._lock:
+            if self.current_stage is not None:
+                self.stages[self.current_stage] = "done"
+            self._end_stage_timing()
+            self.result = result
+            self.status = JobStatus.SUCCEEDED
+            self.finished_at = time.time()
+            self._add_event("done", {"card_count": self._card_count})
+
+    def mark_failed(self, error: str) -> None:
+        with self._lock:
+            if self.current_stage is not None:
+                self.stages[self.current_stage] = "failed"
+            self._end_stage_timing()
+            self.error = error
+            self.status = JobStatus.FAILED
+            self.finished_at = time.time()
+            self._add_event("error", {"error": error})
+
+    async def wait_for_events(self, after: int, timeout: float) -> List[Dict[str, Any]]:
+        """Wait until there are events past index ``after`` or ``timeout`` passes.
+
+        Args:
+            after: Number of events the caller has already seen
+            timeout: Seconds to wait before returning an empty list
+
+        Returns:
+            Events with index ``after`` and up, in order
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            if len(self.events) > after:
+                return self.events[after:]
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.remove(waiter)
+
+        with self._lock:
+            return self.events[after:]
+
+    def _add_event(self, event: str, data: Dict[str, Any]) -> None:
+        """Record an event and wake waiting readers. Caller must hold the lock."""
+        self.events.append({"id": len(self.events), "event": event, "data": data})
+        # Events may be added from any thread, so wake readers through their loop
+        for loop, ready in self._waiters:
+            loop.call_soon_threadsafe(ready.set)
+
+    def _end_stage_timing(self) -> None:
+        """Record the running stage's duration. Caller must hold the lock."""
+        if self.current_stage is not None and self._stage_started_at is not None:
+            self.timings[self.current_stage] = (
+                time.perf_counter() - self._stage_started_at
+            )
+        self._stage_started_at = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Snapshot of the job suitable for a JSON status response."""
+        with self._lock:
+            return {
+                "job_id": self.job_id,
+                "status": self.status.value,
+                "stage": self.current_stage,
+                "stages": dict(self.stages),
+                "error": self.error,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "timings": dict(self.timings),
+                "submissions": self.submissions,
+            }
+
+
+class JobQueue:
+    """Runs async pipelines as tasks on the event loop and tracks their progress.
+
+    Pipelines spend most of their time awaiting LLM calls, so a running job
+    costs a task rather than a thread.
+
+    Args:
+        max_workers: Number of pipelines allowed to run at the same time
+        max_pending: Number of jobs allowed to wait for a worker before
+            ``submit`` starts rejecting new work
+        result_ttl: Seconds a finished job is kept around for status/result lookups
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 100,
+        result_ttl: float = 3600.0,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._slots = asyncio.Semaphore(max_workers)
+        self._tasks: Set[asyncio.Task] = set()
+        self._jobs: Dict[str, Job] = {}
+        self._in_flight: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, pipeline: Pipeline, key: Optional[str] = None) -> Job:
+        """Queue ``pipeline`` and return its job immediately.
+
+        Submissions with the same ``key`` as a job that is still queued or
+        running are coalesced: ``pipeline`` is dropped and the in-flight job
+        is returned, so every submitter follows and receives the same run.
+        The caller can tell from ``job.submissions > 1`` right after the call.
+
+        Must be called from the event loop the job should run on.
+
+        Args:
+            pipeline: Async callable that receives a stage callback and a card
+                callback and returns the pipeline result dictionary
+            key: Identifies the pipeline's output, e.g. from ``compute_job_key``.
+                None never coalesces
+
+        Raises:
+            QueueFullError: If all workers are busy and the pending queue is full
+        """
+        with self._lock:
+            in_flight = self._in_flight.get(key) if key is not None else None
+            if in_flight is not None:
+                in_flight.submissions += 1
+                JOBS_COALESCED.inc()
+                logger.info(
+                    "Coalesced submission into job %s (%d submissions)",
+                    in_flight.job_id,
+                    in_flight.submissions,
+                )
+                return in_flight
+
+            self._prune_expired()
+            active = sum(1 for job in self._jobs.values() if not job.is_finished)
+            if active >= self.max_workers + self.max_pending:
+                raise QueueFullError(
+                    f"Job queue is full ({active} jobs queued or running)"
+                )
+            job = Job(uuid.uuid4().hex, key)
+            self._jobs[job.job_id] = job
+            if key is not None:
+                self._in_flight[key] = job
+            JOBS_IN_PROGRESS.labels("queued").inc()
+
+        task = asyncio.get_running_loop().create_task(self._run_job(job, pipeline))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by id, returning None if it is unknown or expired."""
+        with self._lock:
+            self._prune_expired()
+            return self._jobs.get(job_id)
+
+    async def shutdown(self, wait: bool = True) -> None:
+        """Cancel queued and running jobs, optionally waiting for them to stop."""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if wait and tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_job(self, job: Job, pipeline: Pipeline) -> None:
+        try:
+            await self._run_pipeline(job, pipeline)
+        finally:
+            self._release_key(job)
+
+    async def _run_pipeline(self, job: Job, pipeline: Pipeline) -> None:
+        try:
+            await self._slots.acquire()
+        except asyncio.CancelledError:
+            job.mark_failed("Job was cancelled")
+            JOBS.labels("cancelled").inc()
+            raise
+        finally:
+            JOBS_IN_PROGRESS.labels("queued").dec()
+
+        try:
+            JOBS_IN_PROGRESS.labels("running").inc()
+            job.mark_running()
+            QUEUE_WAIT_SECONDS.observe(job.timings["queue"])
+            try:
+                result = await pipeline(job.update_stage, job.add_card)
+            except asyncio.CancelledError:
+                job.mark_failed("Job was cancelled")
+                JOBS.labels("cancelled").inc()
+                raise
+            except Exception as e:
+                logger.error("Job %s failed: %s", job.job_id, e)
+                job.mark_failed(str(e))
+                JOBS.labels("failed").inc()
+            else:
+                job.mark_succeeded(result)
+                JOBS.labels("succeeded").inc()
+        finally:
+            JOBS_IN_PROGRESS.labels("running").dec()
+            self._slots.release()
+
+    def _release_key(self, job: Job) -> None:
+        """Stop coalescing new submissions into ``job`` once it has finished."""
+        if job.key is None:
+            return
+        with self._lock:
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+
+    def _prune_expired(self) -> None:
+        """Drop finished jobs older than ``result_ttl``. Caller must hold the lock."""
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.is_finished
+            and job.finished_at is not None
+            and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
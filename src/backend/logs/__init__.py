@@ -0,0 +1,19 @@
+from .log_utils import (
+    SAMPLED,
+    SamplingFilter,
+    configure_logging,
+    get_logger,
+    log_payload,
+    preview,
+    summarize,
+)
+
+__all__ = [
+    "SAMPLED",
+    "SamplingFilter",
+    "configure_logging",
+    "get_logger",
+    "log_payload",
+    "preview",
+    "summarize",
+]
@@ -0,0 +1,127 @@
+"""Logging helpers that keep whole documents and LLM responses out of the logs.
+
+Pipeline modules log through ``get_logger``. At INFO a large payload is
+logged as its size, a short hash and a truncated preview; the full payload
+is only logged when DEBUG is enabled. Records marked with ``SAMPLED`` (one
+per file, chunk or LLM call) are kept at ``sample_rate`` so a busy server
+does not flood its log pipeline; warnings and errors are never sampled out.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import sys
+
+# Parent logger of every pipeline module
+LOGGER_NAME = "backend"
+
+# Characters of a payload shown at INFO
+PREVIEW_CHARS = 120
+
+# Pass as ``extra=SAMPLED`` for high-volume records that may be sampled out
+SAMPLED = {"sampled": True}
+
+_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only ``rate`` of the records logged with ``extra=SAMPLED``.
+
+    Args:
+        rate: Fraction of sampled records to keep, from 0 to 1
+    """
+
+    def __init__(self, rate: float = 1.0):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or record.levelno >= logging.WARNING:
+            return True
+        return self.rate >= 1.0 or random.random() < self.rate
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger for a pipeline module, given its ``__name__``."""
+    return logging.getLogger(name)
+
+
+def configure_logging(
+    level: str | None = None, sample_rate: float | None = None
+) -> logging.Logger:
+    """Send pipeline logs to stderr. Safe to call more than once.
+
+    Args:
+        level: Log level name. Defaults to ``FLASHCARD_LOG_LEVEL`` or INFO
+        sample_rate: Fraction of sampled records to keep. Defaults to
+            ``FLASHCARD_LOG_SAMPLE_RATE`` or 1
+    """
+    if level is None:
+        level = os.getenv("FLASHCARD_LOG_LEVEL", "INFO")
+    if sample_rate is None:
+        sample_rate = float(os.getenv("FLASHCARD_LOG_SAMPLE_RATE", "1.0"))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper())
+    for handler in logger.handlers:
+        if getattr(handler, "_flashcard_handler", False):
+            for log_filter in handler.filters:
+                if isinstance(log_filter, SamplingFilter):
+                    log_filter.rate = sample_rate
+            return logger
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter(_FORMAT))
+    handler.addFilter(SamplingFilter(sample_rate))
+    handler._flashcard_handler = True
+    logger.addHandler(handler)
+    # The handler above already writes these records
+    logger.propagate = False
+    return logger
+
+
+def summarize(text: str) -> str:
+    """Size and short content hash of ``text``, e.g. ``"1234 chars, sha256 1a2b.."``."""
+    digest = hashlib.sha256(text.encode("utf-8", "replace")).hexdigest()
+    return f"{len(text)} chars, sha256 {digest[:12]}"
+
+
+def preview(text: str, limit: int = PREVIEW_CHARS) -> str:
+    """First ``limit`` characters of ``text`` on one line, noting what was cut."""
+    if len(text) <= limit:
+        return " ".join(text.split())
+    # Only look at the start; the text may be megabytes long
+    head = " ".join(text[: limit * 2].split())[:limit]
+    return f"{head}... ({len(text)} chars total)"
+
+
+def log_payload(
+    logger: logging.Logger,
+    label: str,
+    text: str,
+    level: int = logging.INFO,
+    sampled: bool = True,
+) -> None:
+    """Log ``text`` in full at DEBUG, otherwise as a summary and preview.
+
+    Args:
+        logger: Logger to write to
+        label: What the payload is, e.g. "Cleaner input"
+        text: The payload
+        level: Level of the summary record
+        sampled: Whether the summary record may be sampled out
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s (%s):\n%s", label, summarize(text), text)
+    elif logger.isEnabledFor(level):
+        logger.log(
+            level,
+            "%s (%s): %s",
+            label,
+            summarize(text),
+            preview(text),
+            extra=SAMPLED if sampled else None,
+        )
@@ -0,0 +1,128 @@
+"""Metrics recorded by the flashcard pipeline and the job queue."""
+
+from __future__ import annotations
+
+from .registry import Counter, Gauge, Histogram
+
+PARSE_SECONDS = Histogram(
+    "flashcard_parse_seconds",
+    "Time to parse one uploaded file, by parser",
+    ["parser"],
+)
+PARSED_FILES = Counter(
+    "flashcard_parsed_files_total",
+    "Uploaded files by parser and outcome (ok, cached, empty, error)",
+    ["parser", "outcome"],
+)
+PARSED_CHARS = Counter(
+    "flashcard_parsed_chars_total",
+    "Characters extracted from uploaded files, by parser",
+    ["parser"],
+)
+
+STAGE_SECONDS = Histogram(
+    "flashcard_stage_seconds",
+    "Time spent in each pipeline stage (parse, clean, flashcard), or in the "
+    "whole pipeline (pipeline) when the stages overlap",
+    ["stage"],
+)
+
+LLM_REQUEST_SECONDS = Histogram(
+    "flashcard_llm_request_seconds",
+    "Latency of LLM chain calls, by chain and model",
+    ["chain", "model"],
+)
+LLM_CHARS = Counter(
+    "flashcard_llm_chars_total",
+    "Characters sent to (input) and received from (output) LLM chains",
+    ["chain", "direction"],
+)
+LLM_TOKENS = Counter(
+    "flashcard_llm_estimated_tokens_total",
+    "Estimated tokens sent to (input) and received from (output) LLM chains",
+    ["chain", "direction"],
+)
+LLM_ERRORS = Counter(
+    "flashcard_llm_errors_total",
+    "LLM chain calls that raised, by chain and model",
+    ["chain", "model"],
+)
+LLM_RETRIES = Counter(
+    "flashcard_llm_retries_total",
+    "LLM chain calls retried after a failure, by chain and model",
+    ["chain", "model"],
+)
+LLM_THROTTLED = Counter(
+    "flashcard_llm_throttled_total",
+    "LLM calls the provider rejected as rate limited or overloaded, by model",
+    ["model"],
+)
+LLM_CONCURRENCY_LIMIT = Gauge(
+    "flashcard_llm_concurrency_limit",
+    "Current adaptive limit on concurrent LLM calls, by model",
+    ["model"],
+)
+LLM_SCHEDULER_WAIT_SECONDS = Histogram(
+    "flashcard_llm_scheduler_wait_seconds",
+    "Time an LLM call waited for a concurrency slot and rate limit tokens",
+    ["model"],
+)
+LLM_HEDGES = Counter(
+    "flashcard_llm_hedges_total",
+    "Hedge requests fired for LLM calls slower than the hedge quantile",
+    ["chain", "model"],
+)
+LLM_HEDGE_WINS = Counter(
+    "flashcard_llm_hedge_wins_total",
+    "LLM calls whose hedge request answered first",
+    ["chain", "model"],
+)
+LLM_FALLBACKS = Counter(
+    "flashcard_llm_fallbacks_total",
+    "LLM calls moved on to the next model, by the model given up on and "
+    "reason (timeout, invalid, error)",
+    ["chain", "model", "reason"],
+)
+CLEANER_SKIPPED = Counter(
+    "flashcard_cleaner_skipped_total",
+    "Cleaner units passed through without an LLM call after pre-cleaning",
+)
+
+CACHE_REQUESTS = Counter(
+    "flashcard_cache_requests_total",
+    "Cache lookups by cache (parse, cleaner, artifact) and result (hit, miss)",
+    ["cache", "result"],
+)
+
+QUEUE_WAIT_SECONDS = Histogram(
+    "flashcard_job_queue_wait_seconds",
+    "Time a job waited for a worker slot before it started",
+)
+JOBS = Counter(
+    "flashcard_jobs_total",
+    "Finished jobs by outcome (succeeded, failed, cancelled)",
+    ["outcome"],
+)
+JOBS_IN_PROGRESS = Gauge(
+    "flashcard_jobs_in_progress",
+    "Jobs currently queued or running",
+    ["state"],
+)
+JOBS_COALESCED = Counter(
+    "flashcard_jobs_coalesced_total",
+    "Submissions attached to an identical job that was already in flight",
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def record_llm_io(chain: str, input_text: str, output_text: str) -> None:
+    """Count the characters and estimated tokens of one LLM call."""
+    # Imported here because backend.ai itself records metrics
+    from backend.ai.token_budget import estimate_tokens
+
+    for direction, text in (("input", input_text), ("output", output_text)):
+        LLM_CHARS.labels(chain, direction).inc(len(text))
+        LLM_TOKENS.labels(chain, direction).inc(estimate_tokens(text))
@@ -0,0 +1,293 @@
+"""Minimal in-process metrics with Prometheus text exposition.
+
+Mirrors the small part of the ``prometheus_client`` API the pipeline needs
+(``labels()``, ``inc()``, ``set()``, ``observe()``, ``time()``) without adding
+the dependency. Every metric is safe to update from worker threads.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Latency buckets in seconds, from a cache hit up to a slow LLM call
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+    300.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+class Metric(ABC):
+    """Base for a named metric family with a fixed set of label names."""
+
+    type_name = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: MetricsRegistry | None = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if registry is None:
+            registry = metrics_registry
+        registry.register(self)
+
+    def labels(self, *values: object) -> "_Child":
+        """Bind label values, in the order the label names were declared."""
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {values}"
+            )
+        return _Child(self, tuple(str(value) for value in values))
+
+    @abstractmethod
+    def collect(self) -> List[str]:
+        """Sample lines for the exposition format, without HELP/TYPE."""
+        pass
+
+    def _unlabeled(self) -> "_Child":
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return _Child(self, ())
+
+
+class Counter(Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabeled().inc(amount)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: object) -> float:
+        with self._lock:
+            return self._values.get(tuple(str(label) for label in labels), 0.0)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            _sample(self.name, self.labelnames, key, value) for key, value in values
+        ]
+
+
+class Gauge(Metric):
+    """Value that can go up and down, e.g. jobs currently running."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._unlabeled().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._unlabeled().inc(-amount)
+
+    def set(self, value: float) -> None:
+        self._unlabeled().set(value)
+
+    def _inc(self, key: LabelValues, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def _set(self, key: LabelValues, value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, *labels: object) -> float:
+        with self._lock:
+            return self._values.get(tuple(str(label) for label in labels), 0.0)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            _sample(self.name, self.labelnames, key, value) for key, value in values
+        ]
+
+
+class Histogram(Metric):
+    """Distribution of observations in cumulative buckets, for latency percentiles.
+
+    Args:
+        buckets: Upper bounds of the buckets, ascending. ``+Inf`` is implied
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (last one is +Inf), sum
+        self._values: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float) -> None:
+        self._unlabeled().observe(value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        with self._unlabeled().time():
+            yield
+
+    def _observe(self, key: LabelValues, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, *labels: object) -> int:
+        with self._lock:
+            entry = self._values.get(tuple(str(label) for label in labels))
+            return sum(entry[0]) if entry else 0
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(c), s)) for key, (c, s) in self._values.items())
+
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(
+                    _sample(
+                        f"{self.name}_bucket",
+                        names,
+                        key + (_format(bound),),
+                        cumulative,
+                    )
+                )
+            lines.append(_sample(f"{self.name}_sum", self.labelnames, key, total))
+            lines.append(
+                _sample(f"{self.name}_count", self.labelnames, key, cumulative)
+            )
+        return lines
+
+
+class _Child:
+    """A metric bound to one set of label values."""
+
+    def __init__(self, metric: Metric, key: LabelValues):
+        self._metric = metric
+        self._key = key
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._metric._inc(self._key, amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._metric._inc(self._key, -amount)
+
+    def set(self, value: float) -> None:
+        self._metric._set(self._key, value)
+
+    def observe(self, value: float) -> None:
+        self._metric._observe(self._key, value)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the wall time of the ``with`` block, even if it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together by ``render``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {_escape_help(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+def _sample(
+    name: str, labelnames: Sequence[str], values: LabelValues, value: float
+) -> str:
+    if not labelnames:
+        return f"{name} {_format(value)}"
+    labels = ",".join(
+        f'{label}="{_escape_label(val)}"' for label, val in zip(labelnames, values)
+    )
+    return f"{name}{{{labels}}} {_format(value)}"
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+# Process-wide registry the pipeline metrics are registered with
+metrics_registry = MetricsRegistry()
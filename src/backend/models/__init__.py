@@ -1,5 +1,17 @@
 from .user_form import UserForm, UserFormReg
 from .cleaner_output import CleanerOutput
 from .flashcarder_output import FlashcarderOutput
+from .flashcard import Deck, Flashcard
+from .parsed_document import ParsedDocument
+from .pipeline_settings import PipelineSettings
 
-__all__ = ["UserForm", "CleanerOutput", "FlashcarderOutput", "UserFormReg"]
+__all__ = [
+    "UserForm",
+    "CleanerOutput",
+    "FlashcarderOutput",
+    "Flashcard",
+    "Deck",
+    "UserFormReg",
+    "ParsedDocument",
+    "PipelineSettings",
+]
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+# Bumped whenever the compact deck layout changes
+DECK_FORMAT_VERSION = 1
+
+
+class Flashcard(BaseModel):
+    question: str
+    answer: str
+    source_page: Optional[int] = None
+    tags: List[str] = Field(default_factory=list)
+
+
+class Deck(BaseModel):
+    flashcards: List[Flashcard] = Field(default_factory=list)
+
+    def to_compact(self) -> str:
+        """Serialize to the on-disk format.
+
+        Each card is a JSON array ``[question, answer, source_page, tags]``
+        with trailing empty fields dropped, so a plain card costs little more
+        than its text.
+        """
+        cards = []
+        for card in self.flashcards:
+            fields = [card.question, card.answer, card.source_page, card.tags]
+            while len(fields) > 2 and fields[-1] in (None, []):
+                fields.pop()
+            cards.append(fields)
+        return json.dumps(
+            {"v": DECK_FORMAT_VERSION, "cards": cards},
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def from_compact(cls, data: str) -> "Deck":
+        payload = json.loads(data)
+        if payload.get("v") != DECK_FORMAT_VERSION:
+            raise ValueError(f"Unsupported deck format version: {payload.get('v')}")
+
+        flashcards = []
+        for fields in payload["cards"]:
+            question, answer, *rest = fields
+            flashcards.append(
+                Flashcard(
+                    question=question,
+                    answer=answer,
+                    source_page=rest[0] if len(rest) > 0 else None,
+                    tags=rest[1] if len(rest) > 1 else [],
+                )
+            )
+        return cls(flashcards=flashcards)
+
+    def to_tsv(self) -> str:
+        """Export as tab-separated ``question<TAB>answer`` lines.
+
+        This is the import format Quizlet and Anki both accept. Tabs and
+        newlines inside a card are replaced with spaces.
+        """
+
+        def clean(text: str) -> str:
+            return " ".join(text.replace("\t", " ").splitlines())
+
+        return "".join(
+            f"{clean(card.question)}\t{clean(card.answer)}\n"
+            for card in self.flashcards
+        )
@@ -1,5 +1,8 @@
 from pydantic import BaseModel
+from typing import List
+
+from .flashcard import Flashcard
 
 
 class FlashcarderOutput(BaseModel):
-    flashcards: str
+    flashcards: List[Flashcard]
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import List
+
+
+class ParsedDocument(BaseModel):
+    filename: str
+    segments: List[str]
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.segments)
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import os
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+def _default_parse_workers() -> int:
+    return min(4, os.cpu_count() or 1)
+
+
+def _optional_float(value: str) -> float | None:
+    return None if value.lower() in ("", "none") else float(value)
+
+
+def _model_list(value: str) -> List[str]:
+    return [model.strip() for model in value.split(",") if model.strip()]
+
+
+class PipelineSettings(BaseModel):
+    """Tuning knobs for ``backend.ai.run``.
+
+    Uploaded files are parsed in a pool of ``parse_workers`` processes; with 1
+    they are parsed one after another in the calling thread.
+
+    With ``pre_clean`` every document first goes through the local
+    pre-cleaner (page numbers, repeated headers/footers, hyphenation,
+    whitespace). Each unit of cleaner work whose quality score then reaches
+    ``skip_clean_threshold`` is passed on without an LLM cleaner call; None
+    sends everything to the LLM.
+
+    ``cleaner_mode="single"`` makes one cleaner call per document.
+    ``cleaner_mode="chunked"`` splits the parsed text on page/slide/section
+    boundaries into chunks of at most ``max_chunk_chars`` characters and cleans
+    up to ``cleaner_concurrency`` of them at once.
+
+    ``flashcarder_mode="auto"`` estimates the prompt's token count against the
+    flashcarder model's context window and uses "single" when it fits and
+    "map_reduce" otherwise. ``flashcarder_mode="single"`` always makes one
+    call, and fails the job with a ``ValueError`` when it cannot fit.
+
+    ``flashcarder_mode="map_reduce"`` generates cards for each cleaned chunk
+    in parallel (up to ``flashcarder_concurrency`` at once), asking each chunk
+    for its share of the cards times ``card_budget_slack``, then drops
+    questions whose shingle similarity reaches ``dedupe_threshold`` and trims
+    the deck to the requested count.
+
+    Each cleaner and flashcarder call that is still running after the
+    ``hedge_quantile`` of recent latencies (scaled to its size) gets one
+    duplicate request, and the first valid answer is used; None disables
+    hedging. A model gets ``cleaner_timeout``/``flashcarder_timeout`` seconds
+    per call; on a timeout, unparseable output or repeated provider errors
+    the call moves on to the next model in ``cleaner_fallback_models`` /
+    ``flashcarder_fallback_models``. ``cleaner_deadline`` and
+    ``flashcarder_deadline`` bound one call across all of its models.
+
+    ``pipeline_mode="staged"`` runs all parsing, then all cleaning, then all
+    flashcard generation. ``pipeline_mode="pipelined"`` overlaps them: parsed
+    documents are cut into chunks of at most ``max_chunk_chars`` that flow
+    through a queue of up to ``pipeline_queue_size`` chunks to the cleaner,
+    and each cleaned chunk goes straight on to the flashcarder, as in
+    "map_reduce" mode. ``cleaner_mode`` and ``flashcarder_mode`` are ignored.
+    """
+
+    parse_workers: int = Field(default_factory=_default_parse_workers)
+    pre_clean: bool = True
+    skip_clean_threshold: Optional[float] = 0.9
+    cleaner_mode: Literal["single", "chunked"] = "single"
+    cleaner_concurrency: int = 4
+    max_chunk_chars: int = 24_000
+    flashcarder_mode: Literal["auto", "single", "map_reduce"] = "auto"
+    flashcarder_concurrency: int = 4
+    card_budget_slack: float = 1.25
+    dedupe_threshold: float = 0.8
+    cleaner_fallback_models: List[str] = Field(default_factory=list)
+    flashcarder_fallback_models: List[str] = Field(default_factory=list)
+    hedge_quantile: Optional[float] = 0.95
+    cleaner_timeout: Optional[float] = 120.0
+    cleaner_deadline: Optional[float] = 240.0
+    flashcarder_timeout: Optional[float] = 300.0
+    flashcarder_deadline: Optional[float] = 600.0
+    pipeline_mode: Literal["staged", "pipelined"] = "staged"
+    pipeline_queue_size: int = 8
+
+    def output_settings(self) -> dict:
+        """Settings that change the generated flashcards, for cache keys.
+
+        Worker counts, concurrency limits, queue sizes, hedging and deadlines
+        only change how fast the output is produced, so they are left out.
+        """
+        return self.model_dump(
+            exclude={
+                "parse_workers",
+                "cleaner_concurrency",
+                "flashcarder_concurrency",
+                "hedge_quantile",
+                "cleaner_timeout",
+                "cleaner_deadline",
+                "flashcarder_timeout",
+                "flashcarder_deadline",
+                "pipeline_queue_size",
+            }
+        )
+
+    @classmethod
+    def from_env(cls) -> "PipelineSettings":
+        """Build settings from ``FLASHCARD_*`` environment variables."""
+        defaults = cls()
+        return cls(
+            parse_workers=int(
+                os.getenv("FLASHCARD_PARSE_WORKERS", defaults.parse_workers)
+            ),
+            pre_clean=os.getenv("FLASHCARD_PRE_CLEAN", str(defaults.pre_clean)).lower()
+            in ("1", "true", "yes"),
+            skip_clean_threshold=_optional_float(
+                os.getenv(
+                    "FLASHCARD_SKIP_CLEAN_THRESHOLD", str(defaults.skip_clean_threshold)
+                )
+            ),
+            cleaner_mode=os.getenv("FLASHCARD_CLEANER_MODE", defaults.cleaner_mode),
+            cleaner_concurrency=int(
+                os.getenv("FLASHCARD_CLEANER_CONCURRENCY", defaults.cleaner_concurrency)
+            ),
+            max_chunk_chars=int(
+                os.getenv("FLASHCARD_MAX_CHUNK_CHARS", defaults.max_chunk_chars)
+            ),
+            flashcarder_mode=os.getenv(
+                "FLASHCARD_FLASHCARDER_MODE", defaults.flashcarder_mode
+            ),
+            flashcarder_concurrency=int(
+                os.getenv(
+                    "FLASHCARD_FLASHCARDER_CONCURRENCY",
+                    defaults.flashcarder_concurrency,
+                )
+            ),
+            card_budget_slack=float(
+                os.getenv("FLASHCARD_CARD_BUDGET_SLACK", defaults.card_budget_slack)
+            ),
+            dedupe_threshold=float(
+                os.getenv("FLASHCARD_DEDUPE_THRESHOLD", defaults.dedupe_threshold)
+            ),
+            cleaner_fallback_models=_model_list(
+                os.getenv("FLASHCARD_CLEANER_FALLBACK_MODELS", "")
+            ),
+            flashcarder_fallback_models=_model_list(
+                os.getenv("FLASHCARD_FLASHCARDER_FALLBACK_MODELS", "")
+            ),
+            hedge_quantile=_optional_float(
+                os.getenv("FLASHCARD_HEDGE_QUANTILE", str(defaults.hedge_quantile))
+            ),
+            cleaner_timeout=_optional_float(
+                os.getenv("FLASHCARD_CLEANER_TIMEOUT", str(defaults.cleaner_timeout))
+            ),
+            cleaner_deadline=_optional_float(
+                os.getenv("FLASHCARD_CLEANER_DEADLINE", str(defaults.cleaner_deadline))
+            ),
+            flashcarder_timeout=_optional_float(
+                os.getenv(
+                    "FLASHCARD_FLASHCARDER_TIMEOUT", str(defaults.flashcarder_timeout)
+                )
+            ),
+            flashcarder_deadline=_optional_float(
+                os.getenv(
+                    "FLASHCARD_FLASHCARDER_DEADLINE", str(defaults.flashcarder_deadline)
+                )
+            ),
+            pipeline_mode=os.getenv("FLASHCARD_PIPELINE_MODE", defaults.pipeline_mode),
+            pipeline_queue_size=int(
+                os.getenv("FLASHCARD_PIPELINE_QUEUE_SIZE", defaults.pipeline_queue_size)
+            ),
+        )
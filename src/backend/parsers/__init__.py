@@ -1,5 +1,7 @@
 from .base_parser import (
     parse_document,
+    parse_document_segments,
+    iter_document_segments,
     get_parser_for_file,
     get_parser_for_upload_file,
     BaseDocumentParser,
@@ -11,6 +13,8 @@ from .pptx_parser import PPTXParser
 
 __all__ = [
     "parse_document",
+    "parse_document_segments",
+    "iter_document_segments",
     "get_parser_for_file",
     "get_parser_for_upload_file",
     "BaseDocumentParser",
@@ -1,11 +1,17 @@
 """Base parser interface and registry for document parsing strategies."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, Type, List, Optional, Union
+from typing import Dict, Iterator, Type, List, Optional, Union
 from fastapi import UploadFile
+from langchain_core.documents import Document
 from pathlib import Path
+import logging
 import os
 
+from backend.logs import get_logger, log_payload
+
+logger = get_logger(__name__)
+
 # Parser registry
 
 PARSER_REGISTRY: Dict[str, Type["BaseDocumentParser"]] = {}
@@ -30,10 +36,30 @@ def parser_for(*extensions: str):
 class BaseDocumentParser(ABC):
     """Base abstract class for all document parsers."""
 
+    # Bump when a parser's output changes so cached parse results are invalidated
+    version: str = "1"
+
     @abstractmethod
+    def iter_pages(self) -> Iterator[Document]:
+        """Yield the document one page, slide or section at a time.
+
+        Implementations read the source lazily, so only the current page has
+        to be held in memory.
+        """
+        pass
+
+    def iter_segments(self) -> Iterator[str]:
+        """Yield the text of each page, slide or section."""
+        for page in self.iter_pages():
+            yield page.page_content
+
     def parse(self) -> str:
         """Parse the document and return the extracted text."""
-        pass
+        return "\n".join(self.iter_segments())
+
+    def get_segments(self) -> List[str]:
+        """Return the document text split on its natural boundaries."""
+        return list(self.iter_segments())
 
     @classmethod
     def from_path(cls, file_path: Union[str, Path]) -> "BaseDocumentParser":
@@ -88,10 +114,34 @@ def get_parser_for_upload_file(upload_file: UploadFile) -> Type[BaseDocumentPars
     return PARSER_REGISTRY[ext]
 
 
+def _create_parser(
+    file_path: Union[str, Path, None] = None,
+    file_bytes: bytes | None = None,
+    upload_file: UploadFile | None = None,
+    file_name: str | None = None,
+) -> BaseDocumentParser:
+    """Create and load the appropriate parser for the given input."""
+    if upload_file:
+        parser_cls = get_parser_for_upload_file(upload_file)
+        return parser_cls.from_upload_file(upload_file)
+    elif file_path:
+        parser_cls = get_parser_for_file(file_path)
+        return parser_cls.from_path(file_path)
+    elif file_bytes is not None and file_name:
+        # Use file_name to determine extension
+        parser_cls = get_parser_for_file(file_name)
+        return parser_cls.from_bytes(file_bytes, file_name)
+    else:
+        raise ValueError(
+            "Must provide file_path, file_bytes with file_name, or upload_file"
+        )
+
+
 def parse_document(
     file_path: Union[str, Path, None] = None,
     file_bytes: bytes | None = None,
     upload_file: UploadFile | None = None,
+    file_name: str | None = None,
 ) -> str:
     """Parse a document using the appropriate parser.
 
@@ -99,6 +149,7 @@ def parse_document(
         file_path: Path to the document file
         file_bytes: Document content as bytes
         upload_file: FastAPI UploadFile containing the document
+        file_name: Name of the file ``file_bytes`` came from, used to pick the parser
 
     Returns:
         Extracted text content
@@ -106,17 +157,61 @@ def parse_document(
     Raises:
         ValueError: If no input is provided or no parser is available
     """
-    if upload_file:
-        parser_cls = get_parser_for_upload_file(upload_file)
-        parser = parser_cls.from_upload_file(upload_file)
-    elif file_path:
-        parser_cls = get_parser_for_file(file_path)
-        parser = parser_cls.from_path(file_path)
-    elif file_bytes and upload_file and upload_file.filename:
-        # Use filename from upload_file to determine extension
-        parser_cls = get_parser_for_upload_file(upload_file)
-        parser = parser_cls.from_bytes(file_bytes, upload_file.filename)
-    else:
-        raise ValueError("Must provide file_path, file_bytes, or upload_file")
+    return _create_parser(file_path, file_bytes, upload_file, file_name).parse()
+
+
+def iter_document_segments(
+    file_path: Union[str, Path, None] = None,
+    file_bytes: bytes | None = None,
+    upload_file: UploadFile | None = None,
+    file_name: str | None = None,
+) -> Iterator[str]:
+    """Lazily parse a document into page, slide or section segments.
+
+    Args:
+        file_path: Path to the document file
+        file_bytes: Document content as bytes
+        upload_file: FastAPI UploadFile containing the document
+        file_name: Name of the file ``file_bytes`` came from, used to pick the parser
+
+    Returns:
+        Iterator over the extracted text, one entry per segment
+
+    Raises:
+        ValueError: If no input is provided or no parser is available
+    """
+    parser = _create_parser(file_path, file_bytes, upload_file, file_name)
+    return parser.iter_segments()
+
 
-    return parser.parse()
+def parse_document_segments(
+    file_path: Union[str, Path, None] = None,
+    file_bytes: bytes | None = None,
+    upload_file: UploadFile | None = None,
+    file_name: str | None = None,
+) -> List[str]:
+    """Parse a document into page, slide or section segments.
+
+    Args:
+        file_path: Path to the document file
+        file_bytes: Document content as bytes
+        upload_file: FastAPI UploadFile containing the document
+        file_name: Name of the file ``file_bytes`` came from, used to pick the parser
+
+    Returns:
+        Extracted text, one entry per segment
+
+    Raises:
+        ValueError: If no input is provided or no parser is available
+    """
+    parser = _create_parser(file_path, file_bytes, upload_file, file_name)
+    segments = parser.get_segments()
+    if logger.isEnabledFor(logging.DEBUG):
+        name = file_name or (upload_file.filename if upload_file else file_path)
+        logger.debug(
+            "%s split %s into %d segments", type(parser).__name__, name, len(segments)
+        )
+        log_payload(
+            logger, f"Extracted text of {name}", "\n".join(segments), logging.DEBUG
+        )
+    return segments
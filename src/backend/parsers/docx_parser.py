@@ -1,28 +1,37 @@
 """DOCX parsing strategy implementation using the strategy pattern."""
 
 import io
-import tempfile
-import os
 from fastapi import UploadFile
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, List, Optional, Union
 
-from langchain_community.document_loaders import Docx2txtLoader
+import docx
+from docx.opc.exceptions import PackageNotFoundError
+from docx.table import Table
+from langchain_core.documents import Document
 
 from .base_parser import BaseDocumentParser, parser_for
 
+# Paragraph styles that start a new section in ``iter_pages``
+SECTION_STYLE_PREFIXES = ("Heading", "Title")
+
 
 @parser_for("docx")
 class DOCXParser(BaseDocumentParser):
     """
     Parser strategy for DOCX documents.
+
+    Word documents have no fixed pages, so ``iter_pages`` yields one section
+    per heading, walking paragraphs and tables in document order.
     """
 
+    version = "2"
+
     def __init__(self):
         """Initialize the DOCX parser."""
-        self.documents = None
-        self.temp_path = None
-        self._loader = None
+        self.file_path: Optional[Path] = None
+        self.file_bytes: Optional[bytes] = None
+        self.source = "bytes"
 
     @classmethod
     def from_path(cls, file_path: Union[str, Path]) -> "DOCXParser":
@@ -37,7 +46,7 @@ class DOCXParser(BaseDocumentParser):
     ) -> "DOCXParser":
         """Create a DOCXParser instance from bytes."""
         parser = cls()
-        parser._load_from_bytes(file_bytes)
+        parser._load_from_bytes(file_bytes, file_name)
         return parser
 
     @classmethod
@@ -48,20 +57,16 @@ class DOCXParser(BaseDocumentParser):
         return parser
 
     def _load_from_path(self, file_path: Union[str, Path]):
-        """Load DOCX from a file path."""
-        self._loader = Docx2txtLoader(file_path)
-        self.documents = self._loader.load()
-
-    def _load_from_bytes(self, file_bytes: bytes):
-        """Load DOCX from bytes by creating a temporary file."""
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".docx", delete=False) as temp_file:
-            temp_file.write(file_bytes)
-            self.temp_path = temp_file.name
+        """Remember the DOCX path; the document is opened lazily."""
+        self.file_path = Path(file_path)
+        self.source = str(file_path)
+        if not self.file_path.is_file():
+            raise ValueError(f"File not found: {file_path}")
 
-        # Load the document
-        self._loader = Docx2txtLoader(self.temp_path)
-        self.documents = self._loader.load()
+    def _load_from_bytes(self, file_bytes: bytes, file_name: Optional[str] = None):
+        """Keep the DOCX bytes in memory; the document is opened lazily."""
+        self.file_bytes = file_bytes
+        self.source = file_name or "bytes"
 
     def _load_from_upload_file(self, upload_file: UploadFile):
         """Load DOCX from a FastAPI UploadFile."""
@@ -69,27 +74,57 @@ class DOCXParser(BaseDocumentParser):
         content = upload_file.file.read()
 
         # Load from bytes
-        self._load_from_bytes(content)
+        self._load_from_bytes(content, upload_file.filename)
 
         # Reset file pointer for future reads
         upload_file.file.seek(0)
 
-    def parse(self) -> str:
+    def _open(self) -> "docx.document.Document":
+        """Open the stored path or bytes with python-docx."""
+        source = (
+            str(self.file_path)
+            if self.file_path is not None
+            else io.BytesIO(self.file_bytes or b"")
+        )
+        try:
+            return docx.Document(source)
+        except (PackageNotFoundError, KeyError, ValueError) as e:
+            raise ValueError(f"Invalid DOCX file: {str(e)}") from e
+
+    def iter_pages(self) -> Iterator[Document]:
+        """Yield one Document per heading-delimited section."""
+        lines: List[str] = []
+        section = 0
+        for block in self._open().iter_inner_content():
+            if isinstance(block, Table):
+                lines.extend(self._table_rows(block))
+                continue
+
+            style = block.style.name if block.style is not None else ""
+            if style.startswith(SECTION_STYLE_PREFIXES) and any(lines):
+                yield self._make_page(lines, section)
+                lines, section = [], section + 1
+            lines.append(block.text)
+
+        if any(lines):
+            yield self._make_page(lines, section)
+
+    @staticmethod
+    def _table_rows(table: Table) -> List[str]:
+        """Render each table row as its cell texts joined by `` | ``."""
+        return [" | ".join(cell.text for cell in row.cells) for row in table.rows]
+
+    def _make_page(self, lines: List[str], section: int) -> Document:
+        return Document(
+            page_content="\n".join(lines),
+            metadata={"source": self.source, "section": section},
+        )
+
+    def get_documents(self) -> List[Document]:
         """
-        Parse the DOCX document and return the extracted text.
+        Get the sections as LangChain Document objects.
 
         Returns:
-            Full text content of the DOCX
+            List of LangChain Document objects
         """
-        if not self.documents:
-            return ""
-
-        return "\n".join([doc.page_content for doc in self.documents])
-
-    def __del__(self):
-        """Clean up temporary files when the object is destroyed."""
-        if self.temp_path and os.path.exists(self.temp_path):
-            try:
-                os.unlink(self.temp_path)
-            except:
-                pass
+        return list(self.iter_pages())
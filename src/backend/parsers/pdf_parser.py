@@ -2,14 +2,11 @@
 PDF parsing strategy implementation using the strategy pattern.
 """
 
-import io
-import tempfile
-import os
 from fastapi import UploadFile
 from pathlib import Path
-from typing import List, Dict, Optional, Union
+from typing import Dict, Iterator, List, Optional, Union
 
-from langchain_community.document_loaders import PyMuPDFLoader
+import pymupdf
 from langchain_core.documents import Document
 
 from .base_parser import BaseDocumentParser, parser_for
@@ -17,13 +14,18 @@ from .base_parser import BaseDocumentParser, parser_for
 
 @parser_for("pdf")
 class PDFParser(BaseDocumentParser):
-    """Parser strategy for PDF documents."""
+    """Parser strategy for PDF documents.
+
+    Documents are opened with PyMuPDF directly from a path or an in-memory
+    byte stream, so uploads never touch the filesystem.
+    """
 
     def __init__(self):
         """Initialize the PDF parser."""
-        self.documents = None
-        self.temp_path = None
-        self._loader = None
+        self._file_path: Optional[str] = None
+        self._file_bytes: Optional[bytes] = None
+        self._source = "bytes"
+        self._documents: Optional[List[Document]] = None
 
     @classmethod
     def from_path(cls, file_path: Union[str, Path]) -> "PDFParser":
@@ -38,7 +40,7 @@ class PDFParser(BaseDocumentParser):
     ) -> "PDFParser":
         """Create a PDFParser instance from bytes."""
         parser = cls()
-        parser._load_from_bytes(file_bytes)
+        parser._load_from_bytes(file_bytes, file_name)
         return parser
 
     @classmethod
@@ -49,20 +51,25 @@ class PDFParser(BaseDocumentParser):
         return parser
 
     def _load_from_path(self, file_path: Union[str, Path]):
-        """Load PDF from a file path."""
-        self._loader = PyMuPDFLoader(str(file_path))
-        self.documents = self._loader.load()
-
-    def _load_from_bytes(self, file_bytes: bytes):
-        """Load PDF from bytes by creating a temporary file."""
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as temp_file:
-            temp_file.write(file_bytes)
-            self.temp_path = temp_file.name
-
-        # Load the document
-        self._loader = PyMuPDFLoader(self.temp_path)
-        self.documents = self._loader.load()
+        """Validate the PDF at ``file_path`` and remember it for lazy reading."""
+        self._file_path = str(file_path)
+        self._source = self._file_path
+        self._open().close()
+
+    def _load_from_bytes(self, file_bytes: bytes, file_name: Optional[str] = None):
+        """Validate the PDF in ``file_bytes`` and keep them for lazy reading."""
+        self._file_bytes = file_bytes
+        self._source = file_name or "bytes"
+        self._open().close()
+
+    def _open(self) -> pymupdf.Document:
+        """Open the stored path or byte stream with PyMuPDF."""
+        try:
+            if self._file_path is not None:
+                return pymupdf.open(self._file_path)
+            return pymupdf.open(stream=self._file_bytes, filetype="pdf")
+        except pymupdf.FileDataError as e:
+            raise ValueError(f"Invalid PDF file: {str(e)}") from e
 
     def _load_from_upload_file(self, upload_file: UploadFile):
         """Load PDF from a FastAPI UploadFile."""
@@ -70,21 +77,45 @@ class PDFParser(BaseDocumentParser):
         content = upload_file.file.read()
 
         # Load from bytes
-        self._load_from_bytes(content)
+        self._load_from_bytes(content, upload_file.filename)
 
         # Reset file pointer for future reads
         upload_file.file.seek(0)
 
-    def parse(self) -> str:
-        """Parse the PDF document and return the extracted text.
+    def iter_pages(self) -> Iterator[Document]:
+        """Yield one Document per page, with the same metadata PyMuPDFLoader sets.
 
-        Returns:
-            Full text content of the PDF
+        Pages are extracted one at a time while the PDF is open, so only the
+        current page's text is held in memory.
         """
-        if not self.documents:
-            return ""
-
-        return "\n".join([doc.page_content for doc in self.documents])
+        if self._documents is not None:
+            yield from self._documents
+            return
+
+        with self._open() as pdf:
+            pdf_metadata = {
+                key: value
+                for key, value in (pdf.metadata or {}).items()
+                if isinstance(value, (str, int))
+            }
+            for page in pdf:
+                yield Document(
+                    page_content=page.get_text(),
+                    metadata={
+                        "source": self._source,
+                        "file_path": self._source,
+                        "page": page.number,
+                        "total_pages": len(pdf),
+                        **pdf_metadata,
+                    },
+                )
+
+    @property
+    def documents(self) -> List[Document]:
+        """All pages as Documents, extracted on first access."""
+        if self._documents is None:
+            self._documents = list(self.iter_pages())
+        return self._documents
 
     def get_text_by_pages(self) -> List[str]:
         """
@@ -134,11 +165,3 @@ class PDFParser(BaseDocumentParser):
             List of LangChain Document objects
         """
         return self.documents or []
-
-    def __del__(self):
-        """Clean up temporary files when the object is destroyed."""
-        if self.temp_path and os.path.exists(self.temp_path):
-            try:
-                os.unlink(self.temp_path)
-            except:
-                pass
@@ -5,31 +5,39 @@ PPTX parsing strategy implementation using the strategy pattern.
 from __future__ import annotations
 
 import io
-import tempfile
-import os
+import zipfile
 from fastapi import UploadFile
 from pathlib import Path
-from typing import List, Dict, Optional, Union, TYPE_CHECKING
+from typing import Iterator, List, Optional, Union, TYPE_CHECKING
 
-if TYPE_CHECKING:
-    from langchain_core.documents import Document
-
-from langchain_community.document_loaders import UnstructuredPowerPointLoader
+from langchain_core.documents import Document
 
 from .base_parser import BaseDocumentParser, parser_for
 
+if TYPE_CHECKING:
+    from pptx.presentation import Presentation
+    from pptx.slide import Slide
+
 
-@parser_for("pptx", "ppt")
+@parser_for("pptx")
 class PPTXParser(BaseDocumentParser):
     """
     Parser strategy for PowerPoint documents.
+
+    Slides are read with python-pptx directly from a path or an in-memory
+    byte stream. ``iter_pages`` yields one Document per slide with its title,
+    body text, tables (rows joined by `` | ``) and speaker notes. Only the
+    Office Open XML format is supported, so no parser is registered for
+    legacy ``.ppt`` files; they must be saved as ``.pptx`` first.
     """
 
+    version = "3"
+
     def __init__(self):
         """Initialize the PPTX parser."""
-        self.documents = None
-        self.temp_path = None
-        self._loader = None
+        self.file_path: Optional[Path] = None
+        self.file_bytes: Optional[bytes] = None
+        self.source = "bytes"
 
     @classmethod
     def from_path(cls, file_path: Union[str, Path]) -> "PPTXParser":
@@ -44,7 +52,7 @@ class PPTXParser(BaseDocumentParser):
     ) -> "PPTXParser":
         """Create a PPTXParser instance from bytes."""
         parser = cls()
-        parser._load_from_bytes(file_bytes)
+        parser._load_from_bytes(file_bytes, file_name)
         return parser
 
     @classmethod
@@ -55,20 +63,16 @@ class PPTXParser(BaseDocumentParser):
         return parser
 
     def _load_from_path(self, file_path: Union[str, Path]):
-        """Load PPTX from a file path."""
-        self._loader = UnstructuredPowerPointLoader(str(file_path))
-        self.documents = self._loader.load()
+        """Remember the PPTX path; the presentation is opened lazily."""
+        self.file_path = Path(file_path)
+        self.source = str(file_path)
+        if not self.file_path.is_file():
+            raise ValueError(f"File not found: {file_path}")
 
-    def _load_from_bytes(self, file_bytes: bytes):
-        """Load PPTX from bytes by creating a temporary file."""
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(suffix=".pptx", delete=False) as temp_file:
-            temp_file.write(file_bytes)
-            self.temp_path = temp_file.name
-
-        # Load the document
-        self._loader = UnstructuredPowerPointLoader(self.temp_path)
-        self.documents = self._loader.load()
+    def _load_from_bytes(self, file_bytes: bytes, file_name: Optional[str] = None):
+        """Keep the PPTX bytes in memory; the presentation is opened lazily."""
+        self.file_bytes = file_bytes
+        self.source = file_name or "bytes"
 
     def _load_from_upload_file(self, upload_file: UploadFile):
         """Load PPTX from a FastAPI UploadFile."""
@@ -76,36 +80,85 @@ class PPTXParser(BaseDocumentParser):
         content = upload_file.file.read()
 
         # Load from bytes
-        self._load_from_bytes(content)
+        self._load_from_bytes(content, upload_file.filename)
 
         # Reset file pointer for future reads
         upload_file.file.seek(0)
 
-    def parse(self) -> str:
-        """
-        Parse the PowerPoint document and return the extracted text.
-
-        Returns:
-            Full text content of the PowerPoint
-        """
-        if not self.documents:
-            return ""
-
-        return "\n\n".join([doc.page_content for doc in self.documents])
+    def _open(self) -> Presentation:
+        """Open the stored path or bytes with python-pptx."""
+        # Imported here so workers that never see a slide deck skip the import
+        import pptx
+        from pptx.exc import PackageNotFoundError
+
+        source = (
+            str(self.file_path)
+            if self.file_path is not None
+            else io.BytesIO(self.file_bytes or b"")
+        )
+        try:
+            return pptx.Presentation(source)
+        except (PackageNotFoundError, zipfile.BadZipFile, KeyError, ValueError) as e:
+            raise ValueError(f"Invalid PPTX file: {str(e)}") from e
+
+    def iter_pages(self) -> Iterator[Document]:
+        """Yield one Document per slide."""
+        for number, slide in enumerate(self._open().slides, start=1):
+            title, lines = self._slide_text(slide)
+            if title:
+                lines.insert(0, title)
+            if slide.has_notes_slide:
+                notes = slide.notes_slide.notes_text_frame
+                if notes is not None and notes.text.strip():
+                    lines.append(f"Notes: {notes.text.strip()}")
+            yield Document(
+                page_content="\n".join(lines),
+                metadata={"source": self.source, "page_number": number, "title": title},
+            )
+
+    def _slide_text(self, slide: Slide) -> tuple[str, List[str]]:
+        """Return the slide's title and the lines of its other shapes."""
+        title_shape = slide.shapes.title
+        title = title_shape.text_frame.text.strip() if title_shape is not None else ""
+        lines: List[str] = []
+        for shape in self._reading_order(slide.shapes):
+            if title_shape is not None and shape.shape_id == title_shape.shape_id:
+                continue
+            lines.extend(self._shape_lines(shape))
+        return title, lines
+
+    def _shape_lines(self, shape) -> List[str]:
+        """Text of one shape: paragraphs, table rows, or a group's children."""
+        from pptx.enum.shapes import MSO_SHAPE_TYPE
+
+        if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+            lines = []
+            for child in self._reading_order(shape.shapes):
+                lines.extend(self._shape_lines(child))
+            return lines
+        if shape.has_table:
+            return [
+                " | ".join(cell.text.strip() for cell in row.cells)
+                for row in shape.table.rows
+            ]
+        if shape.has_text_frame:
+            return [
+                "  " * paragraph.level + paragraph.text.strip()
+                for paragraph in shape.text_frame.paragraphs
+                if paragraph.text.strip()
+            ]
+        return []
+
+    @staticmethod
+    def _reading_order(shapes) -> list:
+        """Shapes sorted top to bottom, then left to right."""
+        return sorted(shapes, key=lambda shape: (shape.top or 0, shape.left or 0))
 
     def get_documents(self) -> List[Document]:
         """
-        Get the raw LangChain Document objects.
+        Get the slides as LangChain Document objects.
 
         Returns:
             List of LangChain Document objects
         """
-        return self.documents or []
-
-    def __del__(self):
-        """Clean up temporary files when the object is destroyed."""
-        if self.temp_path and os.path.exists(self.temp_path):
-            try:
-                os.unlink(self.temp_path)
-            except:
-                pass
+        return list(self.iter_pages())
@@ -3,11 +3,9 @@ TXT parsing strategy implementation using the strategy pattern.
 """
 
 import io
-import tempfile
-import os
 from fastapi import UploadFile
 from pathlib import Path
-from typing import Optional, Union, List, Dict
+from typing import IO, Iterator, Optional, Union, List
 from langchain_core.documents import Document
 
 from .base_parser import BaseDocumentParser, parser_for
@@ -17,12 +15,18 @@ from .base_parser import BaseDocumentParser, parser_for
 class TXTParser(BaseDocumentParser):
     """
     Parser strategy for plain text documents.
+
+    Text has no pages, so ``iter_pages`` splits it at form feeds and at the
+    first blank line after every ``section_chars`` characters.
     """
 
+    version = "2"
+    section_chars = 4000
+
     def __init__(self):
         """Initialize the TXT parser."""
         self.content = None
-        self.temp_path = None
+        self.file_path = None
 
     @classmethod
     def from_path(cls, file_path: Union[str, Path]) -> "TXTParser":
@@ -48,9 +52,10 @@ class TXTParser(BaseDocumentParser):
         return parser
 
     def _load_from_path(self, file_path: Union[str, Path]):
-        """Load text from a file path."""
-        with open(file_path, "r", encoding="utf-8", errors="replace") as f:
-            self.content = f.read()
+        """Remember the file path; the text is read lazily by ``iter_pages``."""
+        self.file_path = Path(file_path)
+        if not self.file_path.is_file():
+            raise ValueError(f"File not found: {file_path}")
 
     def _load_from_bytes(self, file_bytes: bytes):
         """Load text from bytes."""
@@ -67,6 +72,34 @@ class TXTParser(BaseDocumentParser):
         # Reset file pointer for future reads
         upload_file.file.seek(0)
 
+    def _open(self) -> IO[str]:
+        if self.file_path is not None:
+            return open(self.file_path, "r", encoding="utf-8", errors="replace")
+        return io.StringIO(self.content or "")
+
+    def iter_pages(self) -> Iterator[Document]:
+        """Yield the text in sections, reading the source line by line."""
+        section: List[str] = []
+        size = 0
+        with self._open() as f:
+            for line in f:
+                while "\f" in line:
+                    head, line = line.split("\f", 1)
+                    section.append(head)
+                    yield self._make_page("".join(section))
+                    section, size = [], 0
+                section.append(line)
+                size += len(line)
+                if size >= self.section_chars and not line.strip():
+                    yield self._make_page("".join(section))
+                    section, size = [], 0
+        if section:
+            yield self._make_page("".join(section))
+
+    def _make_page(self, text: str) -> Document:
+        source = str(self.file_path) if self.file_path is not None else "text"
+        return Document(page_content=text, metadata={"source": source})
+
     def parse(self) -> str:
         """
         Parse the text document and return the content.
@@ -74,7 +107,10 @@ class TXTParser(BaseDocumentParser):
         Returns:
             Full text content
         """
-        return self.content if self.content else ""
+        if self.file_path is None:
+            return self.content if self.content else ""
+        with self._open() as f:
+            return f.read()
 
     def get_documents(self) -> List[Document]:
         """
@@ -83,7 +119,8 @@ class TXTParser(BaseDocumentParser):
         Returns:
             List containing a single Document
         """
-        if not self.content:
+        content = self.parse()
+        if not content:
             return []
 
-        return [Document(page_content=self.content, metadata={"source": "text"})]
+        return [Document(page_content=content, metadata={"source": "text"})]
@@ -1,5 +1,6 @@
 from backend.ai import FlashcarderChain
-from backend.models import UserFormReg
+from backend.ai.flashcarder.reducer import validate_flashcards
+from backend.models import Deck, UserFormReg
 import os
 from dotenv import load_dotenv
 
@@ -20,19 +21,20 @@ def test_flashcarder():
         subject="Computer Science",
         rules="",
         subject_material=subject_material,
-        number_flash_cards=20,
+        num_flash_cards=20,
     )
 
     flashcarder = FlashcarderChain(
         api_key=os.getenv("GOOGLE_API_KEY"), model="gemini-2.0-pro-exp-02-05"
     )
 
-    flashcarder_output = flashcarder.run(user_form).get("flashcards").get("flashcards")
+    cards = flashcarder.run(user_form)["flashcards"]["flashcards"]
+    deck = Deck(flashcards=validate_flashcards(cards))
 
-    print(flashcarder_output)
+    print(deck.to_tsv())
 
     with open("../static/flashcarder_output.txt", "w") as f:
-        f.write(flashcarder_output)
+        f.write(deck.to_tsv())
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import os
 import io
-import json
 from pathlib import Path
 from typing import List
 from fastapi import UploadFile
@@ -128,67 +127,16 @@ def test_orchestrator_run():
         # Print the results
         print("\n====== Flashcards Generated ======")
 
-        # Check if result is a dictionary with expected keys
-        if isinstance(result, dict) and "flashcards" in result:
-            print(
-                f"File saved to: {result.get('flashcards_file_path', 'Unknown location')}"
-            )
-
-            # Extract flashcards from the result
-            flashcards = result.get("flashcards", "")
-            print(f"Flashcards string length: {len(flashcards)}")
-
-            # Try to parse it as JSON
-            try:
-                parsed_flashcards = json.loads(flashcards)
-                print("Successfully parsed as JSON")
-
-                if (
-                    isinstance(parsed_flashcards, dict)
-                    and "flashcards" in parsed_flashcards
-                ):
-                    flashcards_str = parsed_flashcards["flashcards"]
-                    print(f"Number of flashcard pairs: {flashcards_str.count(';')}")
-
-                    # Print a sample of the flashcards
-                    print("\nSample flashcards:")
-                    pairs = flashcards_str.split(";")
-                    for i, pair in enumerate(pairs[:3]):
-                        if pair.strip():  # Skip empty pairs
-                            try:
-                                question, answer = pair.split(",", 1)
-                                print(f"\nFlashcard {i+1}:")
-                                print(f"  Question: {question.strip()}")
-                                print(f"  Answer: {answer.strip()}")
-                            except ValueError:
-                                print(f"  Invalid format: {pair}")
-
-                elif isinstance(parsed_flashcards, list):
-                    print(f"Number of flashcards: {len(parsed_flashcards)}")
-                    # Print first 3 flashcards
-                    for i, card in enumerate(parsed_flashcards[:3]):
-                        print(f"\nFlashcard {i+1}:")
-                        if isinstance(card, dict):
-                            print(f"  Question: {card.get('question', 'No question')}")
-                            print(f"  Answer: {card.get('answer', 'No answer')}")
-                        else:
-                            print(f"  {card}")
-                else:
-                    print("JSON result preview:")
-                    print(
-                        str(parsed_flashcards)[:500] + "..."
-                        if len(str(parsed_flashcards)) > 500
-                        else parsed_flashcards
-                    )
-
-            except json.JSONDecodeError:
-                # Not valid JSON, just print part of the string
-                print("Flashcards text (first 500 chars):")
-                print(flashcards[:500] + "..." if len(flashcards) > 500 else flashcards)
-
-        else:
-            print(f"Unexpected result type: {type(result)}")
-            print(str(result)[:500] + "..." if len(str(result)) > 500 else result)
+        deck = result["deck"]
+        print(f"File saved to: {result['flashcards_file_path']}")
+        print(f"Number of flashcards: {len(deck.flashcards)}")
+
+        # Print a sample of the flashcards
+        print("\nSample flashcards:")
+        for i, card in enumerate(deck.flashcards[:3]):
+            print(f"\nFlashcard {i+1}:")
+            print(f"  Question: {card.question}")
+            print(f"  Answer: {card.answer}")
 
         # No need to save the output ourselves since it's already being saved by the run() function
         print(f"\nOutput has been saved by the orchestrator")
@@ -0,0 +1,93 @@
+"""Shared fixtures: run the pipeline offline against the benchmark fake LLM."""
+
+from __future__ import annotations
+
+import asyncio
+import io
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+for path in (REPO_ROOT, REPO_ROOT / "src"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from fastapi import UploadFile  # noqa: E402
+
+from backend.ai import set_llm_scheduler  # noqa: E402
+from backend.ai.call_policy import latency_tracker  # noqa: E402
+from backend.artifacts import ArtifactStore  # noqa: E402
+from backend.cache import (  # noqa: E402
+    MemoryLRUBackend,
+    ParseCache,
+    ResponseCache,
+    SQLiteBlobStore,
+)
+from backend.models import PipelineSettings, UserForm  # noqa: E402
+
+MODEL = "gemini-1.5-pro"
+
+
+@pytest.fixture(autouse=True)
+def fresh_llm_state():
+    """Give every test its own scheduler and latency history."""
+    set_llm_scheduler(None)
+    latency_tracker.clear()
+    yield
+    set_llm_scheduler(None)
+    latency_tracker.clear()
+
+
+def make_form(files: List[Tuple[str, bytes]], num_flash_cards: int | None) -> UserForm:
+    return UserForm(
+        course_name="Biology 101",
+        difficulty="medium",
+        school_level="undergraduate",
+        subject="Biology",
+        rules="",
+        num_flash_cards=num_flash_cards,
+        subject_material=[
+            UploadFile(file=io.BytesIO(content), size=len(content), filename=name)
+            for name, content in files
+        ],
+    )
+
+
+@pytest.fixture
+def sample_text() -> bytes:
+    """Twenty pages of plain-text course notes."""
+    return "\n\n".join(
+        f"Page {page}: mitochondria produce ATP through oxidative "
+        f"phosphorylation, step {page} of the cycle. " * 8
+        for page in range(20)
+    ).encode()
+
+
+@pytest.fixture
+def run_pipeline(tmp_path):
+    """Run ``backend.ai.arun`` with empty caches under ``tmp_path``."""
+    from backend.ai import arun
+
+    def run(
+        files: List[Tuple[str, bytes]],
+        num_flash_cards: int | None = 10,
+        **settings: Any,
+    ) -> Dict[str, Any]:
+        settings.setdefault("parse_workers", 1)
+        return asyncio.run(
+            arun(
+                make_form(files, num_flash_cards),
+                "test-key",
+                cleaner_model=MODEL,
+                flashcarder_model=MODEL,
+                artifact_store=ArtifactStore(tmp_path / "artifacts"),
+                settings=PipelineSettings(**settings),
+                parse_cache=ParseCache(SQLiteBlobStore(tmp_path / "parse.sqlite3")),
+                cleaner_cache=ResponseCache(MemoryLRUBackend()),
+            )
+        )
+
+    return run
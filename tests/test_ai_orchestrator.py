@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import io
+import sqlite3
+
+import pytest
+from fastapi import UploadFile
+
+from backend.ai import ai_orchestrator
+from backend.cache import MemoryLRUBackend, ParseCache, ResponseCache, SQLiteBlobStore
+from backend.models import PipelineSettings
+from benchmarks.fake_llm import fake_chain_composer
+
+
+@pytest.mark.parametrize(
+    "settings",
+    [
+        {"flashcarder_mode": "map_reduce", "max_chunk_chars": 2000},
+        {"pipeline_mode": "pipelined", "max_chunk_chars": 2000},
+        {"flashcarder_mode": "single"},
+    ],
+)
+def test_chunks_without_cards_do_not_fail_the_job(run_pipeline, sample_text, settings):
+    with fake_chain_composer(cards=0):
+        result = run_pipeline([("notes.txt", sample_text)], 10, **settings)
+
+    assert result["deck"].flashcards == []
+
+
+def test_map_reduce_collects_cards_from_every_chunk(run_pipeline, sample_text):
+    with fake_chain_composer(cards=5):
+        result = run_pipeline(
+            [("notes.txt", sample_text)],
+            8,
+            flashcarder_mode="map_reduce",
+            max_chunk_chars=2000,
+        )
+
+    assert len(result["deck"].flashcards) == 8
+
+
+def test_explicit_single_mode_fails_when_the_request_does_not_fit(
+    run_pipeline, sample_text
+):
+    # 200 cards need more output tokens than one answer allows
+    with fake_chain_composer(cards=5), pytest.raises(ValueError, match="output limit"):
+        run_pipeline([("notes.txt", sample_text)], 200, flashcarder_mode="single")
+
+
+def test_auto_mode_switches_to_map_reduce_when_the_request_does_not_fit(
+    run_pipeline, sample_text, monkeypatch
+):
+    map_reduce = ai_orchestrator._run_flashcarder_map_reduce
+    calls = []
+
+    async def spy(*args, **kwargs):
+        calls.append(args)
+        return await map_reduce(*args, **kwargs)
+
+    monkeypatch.setattr(ai_orchestrator, "_run_flashcarder_map_reduce", spy)
+    with fake_chain_composer(cards=5):
+        result = run_pipeline([("notes.txt", sample_text)], 200)
+
+    assert len(calls) == 1
+    assert result["deck"].flashcards
+
+
+class _StubCleaner:
+    def __init__(self, model):
+        self.model = model
+
+    async def arun(self, text):
+        if self.model == "primary":
+            return {"cleaned_text": {"cleaned_text": None}}
+        return {"cleaned_text": {"cleaned_text": f"cleaned by {self.model}"}}
+
+
+class _StubRegistry:
+    def get(self, chain_cls, api_key, model):
+        return _StubCleaner(model)
+
+
+def test_cleaner_cache_is_keyed_by_the_model_that_answered(monkeypatch):
+    monkeypatch.setattr(ai_orchestrator, "chain_registry", _StubRegistry())
+    cache = ResponseCache(MemoryLRUBackend())
+    settings = PipelineSettings(cleaner_fallback_models=["fallback"])
+
+    cleaned = asyncio.run(
+        ai_orchestrator._clean_text("text", "key", "primary", settings, cache)
+    )
+
+    assert cleaned == "cleaned by fallback"
+    key = ai_orchestrator._cleaner_cache_key
+    assert cache.get(key("primary", "text")) is None
+    assert cache.get(key("fallback", "text")) == "cleaned by fallback"
+
+
+class _RecordingBytesIO(io.BytesIO):
+    """Counts reads of the whole file, as opposed to reads of one block."""
+
+    def __init__(self, content):
+        super().__init__(content)
+        self.whole_reads = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            self.whole_reads += 1
+        return super().read(size)
+
+
+def test_parse_cache_hit_does_not_read_the_upload_into_memory(tmp_path, sample_text):
+    parse_cache = ParseCache(SQLiteBlobStore(tmp_path / "parse.sqlite3"))
+
+    def start_parse():
+        content = _RecordingBytesIO(sample_text)
+        upload = UploadFile(file=content, filename="notes.txt")
+        future, cache_key, _ = ai_orchestrator._start_parse(upload, parse_cache, None)
+        return content, future.result()[0], cache_key
+
+    missed, segments, cache_key = start_parse()
+    assert missed.whole_reads == 1
+    parse_cache.put(cache_key, segments)
+
+    hit, cached_segments, _ = start_parse()
+    assert hit.whole_reads == 0
+    assert cached_segments == segments
+
+
+class _LockedParseCache(ParseCache):
+    def put(self, key, segments):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_parse_cache_write_failure_does_not_fail_the_upload(tmp_path, sample_text):
+    parse_cache = _LockedParseCache(SQLiteBlobStore(tmp_path / "parse.sqlite3"))
+    upload = UploadFile(file=io.BytesIO(sample_text), filename="notes.txt")
+
+    documents = ai_orchestrator._run_parsing([upload], parse_cache)
+
+    assert [document.filename for document in documents] == ["notes.txt"]
+
+
+class _LockedResponseCache(ResponseCache):
+    def put(self, key, text):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_cleaner_cache_write_failure_does_not_fail_cleaning(monkeypatch):
+    monkeypatch.setattr(ai_orchestrator, "chain_registry", _StubRegistry())
+    cache = _LockedResponseCache(MemoryLRUBackend())
+
+    cleaned = asyncio.run(
+        ai_orchestrator._clean_text(
+            "text", "key", "fallback", PipelineSettings(), cache
+        )
+    )
+
+    assert cleaned == "cleaned by fallback"
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import List
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from backend.ingest import RequestBodyLimitMiddleware
+
+LIMIT = 1024
+
+
+@pytest.fixture
+def bodies() -> List[bytes]:
+    """Bodies the app finished reading."""
+    return []
+
+
+@pytest.fixture
+def client(bodies):
+    app = FastAPI()
+
+    @app.post("/build")
+    async def build(request: Request):
+        bodies.append(await request.body())
+        return {"size": len(bodies[-1])}
+
+    @app.post("/other")
+    async def other(request: Request):
+        return {"size": len(await request.body())}
+
+    app.add_middleware(RequestBodyLimitMiddleware, max_bytes=LIMIT, paths=["/build"])
+    return TestClient(app)
+
+
+def test_body_under_the_limit_is_accepted(client, bodies):
+    response = client.post("/build", content=b"x" * LIMIT)
+
+    assert response.status_code == 200
+    assert bodies == [b"x" * LIMIT]
+
+
+def test_declared_oversized_body_is_rejected_before_reading(client, bodies):
+    response = client.post("/build", content=b"x" * (LIMIT + 1))
+
+    assert response.status_code == 413
+    assert "limit" in response.json()["detail"]
+    assert bodies == []
+
+
+def test_streamed_body_is_rejected_once_it_passes_the_limit(client, bodies):
+    def chunks():
+        for _ in range(8):
+            yield b"x" * 256
+
+    # A generator body is sent chunked, without a Content-Length
+    response = client.post("/build", content=chunks())
+
+    assert response.status_code == 413
+    assert bodies == []
+
+
+def test_other_paths_are_not_limited(client):
+    response = client.post("/other", content=b"x" * (LIMIT * 4))
+
+    assert response.status_code == 200
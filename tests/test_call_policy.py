@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from backend.ai import call_policy
+from backend.ai.call_policy import MIN_HEDGE_SAMPLES, LatencyTracker, LLMCallPolicy
+from backend.metrics.pipeline_metrics import LLM_FALLBACKS, LLM_HEDGE_WINS, LLM_HEDGES
+from benchmarks.fake_llm import FakeChatModel
+
+PRIMARY = "gemini-1.5-pro"
+FALLBACK = "gpt-4o"
+
+
+def _fast_latencies() -> LatencyTracker:
+    """A latency history in which every call took a millisecond per token."""
+    latencies = LatencyTracker()
+    for _ in range(MIN_HEDGE_SAMPLES):
+        latencies.observe("cleaner", PRIMARY, 0.001, 1)
+    return latencies
+
+
+async def _clean(chat: FakeChatModel, text: str = "some text") -> str:
+    answer = await chat.ainvoke(text)
+    return json.loads(answer.content)["cleaned_text"]
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled(monkeypatch):
+    monkeypatch.setattr(call_policy, "MIN_HEDGE_DELAY", 0.05)
+    slow, fast = FakeChatModel(latency=5), FakeChatModel()
+    chats = iter([slow, fast])
+    cancelled = []
+    hedges_before = LLM_HEDGES.value("cleaner", PRIMARY)
+    wins_before = LLM_HEDGE_WINS.value("cleaner", PRIMARY)
+
+    async def call(model):
+        chat = next(chats)
+        try:
+            return chat, await _clean(chat)
+        except asyncio.CancelledError:
+            cancelled.append(chat)
+            raise
+
+    async def main():
+        policy = LLMCallPolicy([PRIMARY], latencies=_fast_latencies())
+        winner, _ = await asyncio.wait_for(policy.run("cleaner", call, tokens=10), 2)
+        # Give the cancelled loser a turn to unwind
+        await asyncio.sleep(0.01)
+        return winner
+
+    assert asyncio.run(main()) is fast
+    assert cancelled == [slow]
+    assert slow._in_flight == 0
+    assert LLM_HEDGES.value("cleaner", PRIMARY) == hedges_before + 1
+    assert LLM_HEDGE_WINS.value("cleaner", PRIMARY) == wins_before + 1
+
+
+def test_no_hedge_without_enough_latency_samples():
+    chat = FakeChatModel(latency=0.1)
+    calls = []
+
+    async def call(model):
+        calls.append(model)
+        return await _clean(chat)
+
+    policy = LLMCallPolicy([PRIMARY], latencies=LatencyTracker())
+    asyncio.run(policy.run("cleaner", call, tokens=10))
+
+    assert calls == [PRIMARY]
+
+
+@pytest.mark.parametrize(
+    "primary, reason",
+    [
+        (FakeChatModel(latency=5), "timeout"),
+        (FakeChatModel(cleaner_output_ratio=0), "invalid"),
+        (FakeChatModel(throttle_rate=1.0), "error"),
+    ],
+)
+def test_falls_back_to_the_next_model(primary, reason):
+    chats = {PRIMARY: primary, FALLBACK: FakeChatModel()}
+    fallbacks_before = LLM_FALLBACKS.value("cleaner", PRIMARY, reason)
+
+    async def call(model):
+        return await _clean(chats[model])
+
+    policy = LLMCallPolicy(
+        [PRIMARY, FALLBACK], attempt_timeout=0.2, hedge_quantile=None
+    )
+    cleaned = asyncio.run(policy.run("cleaner", call, validate=bool))
+
+    assert cleaned == "some text"
+    assert LLM_FALLBACKS.value("cleaner", PRIMARY, reason) == fallbacks_before + 1
+
+
+def test_unexpected_errors_are_raised_without_fallback():
+    calls = []
+
+    async def call(model):
+        calls.append(model)
+        raise KeyError("cleaned_text")
+
+    policy = LLMCallPolicy([PRIMARY, FALLBACK], hedge_quantile=None)
+    with pytest.raises(KeyError):
+        asyncio.run(policy.run("cleaner", call))
+    assert calls == [PRIMARY]
+
+
+def test_deadline_bounds_the_whole_call():
+    chat = FakeChatModel(latency=5)
+
+    async def call(model):
+        return await _clean(chat)
+
+    policy = LLMCallPolicy(
+        [PRIMARY, FALLBACK], attempt_timeout=0.1, deadline=0.15, hedge_quantile=None
+    )
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(policy.run("cleaner", call))
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.ai import CleanerChain, FlashcarderChain, chain_registry
+from backend.ai.chain_registry import ChainRegistry
+from benchmarks.fake_llm import fake_chain_composer
+
+MODEL = "gemini-1.5-pro"
+
+
+class _CountingChain:
+    built = 0
+
+    def __init__(self, api_key, model, temperature):
+        type(self).built += 1
+        self.model = model
+
+
+def test_same_settings_reuse_one_chain():
+    registry = ChainRegistry()
+
+    first = registry.get(_CountingChain, api_key="key", model=MODEL)
+    second = registry.get(_CountingChain, api_key="key", model=MODEL)
+
+    assert first is second
+    assert len(registry) == 1
+
+
+def test_each_setting_gets_its_own_chain():
+    registry = ChainRegistry()
+    get = registry.get
+
+    chains = {
+        get(_CountingChain, api_key="key", model=MODEL),
+        get(_CountingChain, api_key="other key", model=MODEL),
+        get(_CountingChain, api_key="key", model="gpt-4o"),
+        get(_CountingChain, api_key="key", model=MODEL, temperature=0.7),
+    }
+
+    assert len(chains) == len(registry) == 4
+
+
+def test_concurrent_first_use_builds_one_chain():
+    registry = ChainRegistry()
+    _CountingChain.built = 0
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        chains = set(
+            pool.map(
+                lambda _: registry.get(_CountingChain, api_key="key", model=MODEL),
+                range(32),
+            )
+        )
+
+    assert len(chains) == 1
+    assert _CountingChain.built == 1
+
+
+def test_real_chains_are_shared_by_class():
+    registry = ChainRegistry()
+    with fake_chain_composer():
+        cleaner = registry.get(CleanerChain, api_key="key", model=MODEL)
+        flashcarder = registry.get(FlashcarderChain, api_key="key", model=MODEL)
+
+        assert registry.get(CleanerChain, api_key="key", model=MODEL) is cleaner
+        assert flashcarder is not cleaner
+
+
+def test_pipeline_runs_reuse_the_registered_chains(run_pipeline, sample_text):
+    with fake_chain_composer(cards=3):
+        run_pipeline([("notes.txt", sample_text)], 3)
+        built = len(chain_registry)
+        run_pipeline([("other.txt", sample_text + b"more")], 3)
+
+        assert built > 0
+        assert len(chain_registry) == built
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from backend import cli
+from backend.artifacts import ArtifactStore
+from backend.cache import MemoryLRUBackend, ParseCache
+from benchmarks.fake_llm import fake_chain_composer
+
+LECTURE_TEXT = "Mitochondria produce ATP through oxidative phosphorylation. " * 40
+
+
+def _touch(root: Path, relative: str, text: str = LECTURE_TEXT) -> Path:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_files_are_grouped_by_folder_then_lecture_number(tmp_path):
+    files = [
+        _touch(tmp_path, "Lecture 3 slides.txt"),
+        _touch(tmp_path, "lec03_notes.txt"),
+        _touch(tmp_path, "week-2.txt"),
+        _touch(tmp_path, "syllabus.txt"),
+        _touch(tmp_path, "Unit 5/reading.txt"),
+        _touch(tmp_path, "Unit 5/extra notes.txt"),
+    ]
+
+    groups = cli.group_lectures(sorted(files), root=tmp_path)
+
+    assert {name: [path.name for path in paths] for name, paths in groups.items()} == {
+        "Unit_5": ["extra notes.txt", "reading.txt"],
+        "lecture-3": ["Lecture 3 slides.txt", "lec03_notes.txt"],
+        "syllabus": ["syllabus.txt"],
+        "week-2": ["week-2.txt"],
+    }
+
+
+def test_discovery_skips_hidden_unsupported_and_output_files(tmp_path):
+    _touch(tmp_path, "lecture-1.txt")
+    _touch(tmp_path, ".hidden.txt")
+    _touch(tmp_path, ".drafts/lecture-2.txt")
+    _touch(tmp_path, "photo.jpg")
+    _touch(tmp_path, "decks/old.txt")
+
+    files = cli.discover_files(tmp_path, exclude=tmp_path / "decks")
+
+    assert [path.relative_to(tmp_path).as_posix() for path in files] == [
+        "lecture-1.txt"
+    ]
+
+
+@pytest.fixture
+def course(tmp_path):
+    course = tmp_path / "course"
+    _touch(course, "lecture-1.txt")
+    _touch(course, "lecture-2.txt", LECTURE_TEXT.replace("ATP", "NADH"))
+    return course
+
+
+@pytest.fixture
+def arun_calls(tmp_path, monkeypatch):
+    """Forms the CLI ran the pipeline for; caches stay out of the repo."""
+    monkeypatch.setenv("FLASHCARD_PARSE_WORKERS", "1")
+    calls = []
+    arun = cli.arun
+
+    async def counting_arun(user_form, api_key, **kwargs):
+        calls.append(user_form)
+        return await arun(
+            user_form,
+            api_key,
+            artifact_store=ArtifactStore(tmp_path / "artifacts"),
+            parse_cache=ParseCache(MemoryLRUBackend()),
+            **kwargs,
+        )
+
+    monkeypatch.setattr(cli, "arun", counting_arun)
+    return calls
+
+
+def _main(course: Path, *args: str) -> int:
+    with fake_chain_composer(cards=3):
+        return cli.main([str(course), "--api-key", "key", "-n", "3", *args])
+
+
+def test_batch_writes_a_deck_per_lecture_and_a_manifest(course, arun_calls):
+    assert _main(course, "--tsv") == 0
+
+    decks = course / "decks"
+    manifest = json.loads((decks / cli.MANIFEST_NAME).read_text())
+    assert sorted(manifest["lectures"]) == ["lecture-1", "lecture-2"]
+    assert manifest["lectures"]["lecture-1"]["cards"] == 3
+    assert (decks / "lecture-1.deck.json").exists()
+    assert (decks / "lecture-2.tsv").exists()
+    assert len(arun_calls) == 2
+
+
+def test_unchanged_lectures_are_skipped(course, arun_calls, capsys):
+    _main(course)
+    (course / "lecture-2.txt").write_text(LECTURE_TEXT + " Updated.")
+
+    assert _main(course) == 0
+
+    assert "[lecture-1] up to date, skipping" in capsys.readouterr().out
+    assert len(arun_calls) == 3
+
+
+def test_force_regenerates_every_lecture(course, arun_calls):
+    _main(course)
+
+    assert _main(course, "--force") == 0
+
+    assert len(arun_calls) == 4
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import io
+
+import docx
+import pytest
+
+from backend.parsers import (
+    DOCXParser,
+    TXTParser,
+    iter_document_segments,
+    parse_document,
+)
+
+
+@pytest.fixture
+def docx_bytes() -> bytes:
+    document = docx.Document()
+    document.add_paragraph("Course notes")
+    document.add_heading("Glycolysis", level=1)
+    document.add_paragraph("Glucose is split into two pyruvate molecules.")
+    table = document.add_table(rows=2, cols=2)
+    for row, cells in zip(table.rows, [("Step", "Yield"), ("Payoff", "4 ATP")]):
+        for cell, text in zip(row.cells, cells):
+            cell.text = text
+    document.add_heading("Krebs cycle", level=1)
+    document.add_paragraph("Acetyl-CoA enters the cycle.")
+    out = io.BytesIO()
+    document.save(out)
+    return out.getvalue()
+
+
+def test_docx_yields_one_section_per_heading(docx_bytes):
+    segments = list(DOCXParser.from_bytes(docx_bytes, "notes.docx").iter_segments())
+
+    assert segments == [
+        "Course notes",
+        "Glycolysis\n"
+        "Glucose is split into two pyruvate molecules.\n"
+        "Step | Yield\n"
+        "Payoff | 4 ATP",
+        "Krebs cycle\nAcetyl-CoA enters the cycle.",
+    ]
+
+
+def test_docx_sections_are_numbered(docx_bytes):
+    pages = list(DOCXParser.from_bytes(docx_bytes, "notes.docx").iter_pages())
+
+    assert [page.metadata["section"] for page in pages] == [0, 1, 2]
+    assert {page.metadata["source"] for page in pages} == {"notes.docx"}
+
+
+def test_txt_splits_at_form_feeds():
+    parser = TXTParser.from_bytes(b"first page\n\fsecond page\n")
+
+    assert list(parser.iter_segments()) == ["first page\n", "second page\n"]
+
+
+def test_txt_splits_long_text_at_blank_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(TXTParser, "section_chars", 20)
+    path = tmp_path / "notes.txt"
+    path.write_text("a long first paragraph\n\nsecond\n\nthird\n")
+
+    segments = list(TXTParser.from_path(path).iter_segments())
+
+    assert segments == ["a long first paragraph\n\n", "second\n\nthird\n"]
+
+
+def test_segments_are_produced_lazily(docx_bytes):
+    segments = iter_document_segments(file_bytes=docx_bytes, file_name="notes.docx")
+
+    assert next(segments) == "Course notes"
+
+
+def test_parse_joins_segments_with_newlines(docx_bytes):
+    text = parse_document(file_bytes=docx_bytes, file_name="notes.docx")
+
+    assert text == "\n".join(
+        DOCXParser.from_bytes(docx_bytes, "notes.docx").iter_segments()
+    )
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+
+from backend.jobs import JobQueue, JobStatus
+from backend.metrics.pipeline_metrics import JOBS_COALESCED
+from benchmarks.fake_llm import FakeChatModel
+
+
+def _pipeline(chat: FakeChatModel, calls: list):
+    async def pipeline(on_stage, on_card):
+        calls.append(pipeline)
+        on_stage("clean")
+        answer = await chat.ainvoke("some text")
+        return {"answer": answer.content}
+
+    return pipeline
+
+
+async def _finished(job):
+    while not job.is_finished:
+        await job.wait_for_events(len(job.events), timeout=1)
+    return job
+
+
+def test_identical_submissions_share_one_job():
+    chat = FakeChatModel(latency=0.05)
+    calls = []
+    coalesced_before = JOBS_COALESCED.value()
+
+    async def main():
+        queue = JobQueue(max_workers=2)
+        first = queue.submit(_pipeline(chat, calls), key="deck")
+        second = queue.submit(_pipeline(chat, calls), key="deck")
+        other = queue.submit(_pipeline(chat, calls), key="other")
+        await asyncio.gather(_finished(first), _finished(other))
+        return first, second, other
+
+    first, second, other = asyncio.run(main())
+
+    assert second is first
+    assert first.submissions == 2
+    assert other is not first
+    assert len(calls) == 2
+    assert first.status is JobStatus.SUCCEEDED
+    assert JOBS_COALESCED.value() == coalesced_before + 1
+
+
+def test_key_is_released_once_the_job_finishes():
+    chat = FakeChatModel()
+    calls = []
+
+    async def main():
+        queue = JobQueue()
+        first = await _finished(queue.submit(_pipeline(chat, calls), key="deck"))
+        # The key is released by the task after the job is marked finished
+        await asyncio.sleep(0)
+        second = queue.submit(_pipeline(chat, calls), key="deck")
+        await _finished(second)
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert second is not first
+    assert second.submissions == 1
+    assert len(calls) == 2
+
+
+def test_key_is_released_when_the_job_fails():
+    chat = FakeChatModel(throttle_rate=1.0)
+    calls = []
+
+    async def main():
+        queue = JobQueue()
+        failed = await _finished(queue.submit(_pipeline(chat, calls), key="deck"))
+        await asyncio.sleep(0)
+        retried = queue.submit(_pipeline(chat, calls), key="deck")
+        await _finished(retried)
+        return failed, retried
+
+    failed, retried = asyncio.run(main())
+
+    assert failed.status is JobStatus.FAILED
+    assert "429" in failed.error
+    assert retried is not failed
+
+
+def test_submissions_without_a_key_never_coalesce():
+    chat = FakeChatModel(latency=0.05)
+    calls = []
+
+    async def main():
+        queue = JobQueue()
+        jobs = [queue.submit(_pipeline(chat, calls)) for _ in range(2)]
+        await asyncio.gather(*(_finished(job) for job in jobs))
+        return jobs
+
+    first, second = asyncio.run(main())
+
+    assert first is not second
+    assert len(calls) == 2
+
+
+def test_shutdown_fails_queued_and_running_jobs():
+    chat = FakeChatModel(latency=5)
+    calls = []
+
+    async def main():
+        queue = JobQueue(max_workers=1)
+        running = queue.submit(_pipeline(chat, calls), key="running")
+        queued = queue.submit(_pipeline(chat, calls), key="queued")
+        await asyncio.sleep(0.01)
+        await queue.shutdown()
+        return running, queued
+
+    running, queued = asyncio.run(main())
+
+    assert len(calls) == 1
+    for job in (running, queued):
+        assert job.status is JobStatus.FAILED
+        assert job.error == "Job was cancelled"
+        assert job.events[-1]["event"] == "error"
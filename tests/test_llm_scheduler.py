@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.ai import llm_scheduler
+from backend.ai.llm_scheduler import (
+    AdaptiveConcurrencyLimit,
+    LLMScheduler,
+    TokenBucket,
+)
+from backend.metrics.pipeline_metrics import LLM_THROTTLED
+from benchmarks.fake_llm import FakeChatModel, FakeRateLimitError
+
+MODEL = "gemini-1.5-pro"
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Drive the scheduler's monotonic clock by hand."""
+    now = SimpleNamespace(value=0.0)
+    monkeypatch.setattr(
+        llm_scheduler,
+        "time",
+        SimpleNamespace(
+            monotonic=lambda: now.value,
+            perf_counter=time.perf_counter,
+            sleep=time.sleep,
+        ),
+    )
+    return now
+
+
+def test_token_bucket_serves_a_burst_then_waits_for_refill(clock):
+    bucket = TokenBucket(per_minute=60, capacity=2)
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+
+    clock.value = 4.0
+    assert bucket.reserve(1) == 0
+
+
+def test_token_bucket_caps_oversized_requests(clock):
+    bucket = TokenBucket(per_minute=60, capacity=10)
+
+    assert bucket.reserve(1_000) == 0
+    assert bucket.reserve(1_000) == pytest.approx(10.0)
+
+
+def test_limit_grows_only_when_it_is_reached():
+    limit = AdaptiveConcurrencyLimit(initial=2, maximum=8)
+    limit.acquire_sync()
+    limit.acquire_sync()
+
+    limit.release(latency=1.0, tokens=100)
+    assert limit.limit == pytest.approx(2.5)
+
+    limit.release(latency=1.0, tokens=100)
+    assert limit.limit == pytest.approx(2.5)
+
+
+def test_throttling_halves_the_limit_once_per_call_latency(clock):
+    limit = AdaptiveConcurrencyLimit(initial=8)
+    limit.acquire_sync()
+    limit.release(latency=1.0, tokens=1)
+
+    for _ in range(3):
+        limit.acquire_sync()
+    limit.release(throttled=True)
+    limit.release(throttled=True)
+    assert limit.limit == 4
+
+    clock.value = 1.5
+    limit.release(throttled=True)
+    assert limit.limit == 2
+
+
+def test_slow_calls_shrink_the_limit():
+    limit = AdaptiveConcurrencyLimit(initial=8, latency_ratio=0.5)
+    limit.acquire_sync()
+    limit.acquire_sync()
+
+    limit.release(latency=1.0, tokens=100)
+    limit.release(latency=10.0, tokens=100)
+
+    assert limit.limit == 4
+
+
+def test_release_wakes_a_waiting_acquire():
+    limit = AdaptiveConcurrencyLimit(initial=1)
+
+    async def main():
+        await limit.acquire()
+        waiter = asyncio.ensure_future(limit.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        limit.release(latency=0.01)
+        await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(main())
+    assert limit.in_flight == 1
+
+
+def test_backoff_is_jittered_within_the_exponential_cap():
+    scheduler = LLMScheduler(base_delay=1.0, max_delay=16.0)
+    error = FakeRateLimitError("429 Too Many Requests")
+
+    for attempt in range(8):
+        cap = min(16.0, 2.0**attempt)
+        delays = {scheduler._backoff(attempt, error) for _ in range(50)}
+        assert all(cap / 2 <= delay <= cap for delay in delays)
+        assert len(delays) > 1
+
+
+def test_backoff_honours_retry_after():
+    scheduler = LLMScheduler(base_delay=1.0, max_delay=60.0)
+    error = FakeRateLimitError("429 Too Many Requests")
+    error.retry_after = 7
+
+    assert scheduler._backoff(0, error) == 7
+
+
+def test_backoff_reads_retry_after_header_up_to_the_max_delay():
+    scheduler = LLMScheduler(base_delay=1.0, max_delay=60.0)
+    error = FakeRateLimitError("429 Too Many Requests")
+    error.response = SimpleNamespace(status_code=429, headers={"retry-after": "12"})
+    assert scheduler._backoff(0, error) == 12
+
+    error.response.headers["retry-after"] = "600"
+    assert scheduler._backoff(0, error) == 60
+
+
+def test_throttled_calls_are_retried_and_shrink_the_limit():
+    model = FakeChatModel(latency=0.05, max_concurrent=2)
+    scheduler = LLMScheduler(initial_concurrency=8, base_delay=0.01, max_delay=0.05)
+    throttled_before = LLM_THROTTLED.value(MODEL)
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                scheduler.run(MODEL, lambda: model.ainvoke("text"), chain="cleaner")
+                for _ in range(8)
+            )
+        )
+
+    answers = asyncio.run(main())
+
+    assert len(answers) == 8
+    assert LLM_THROTTLED.value(MODEL) > throttled_before
+    assert scheduler.concurrency_limit(MODEL) < 8
+
+
+def test_retries_stop_after_max_retries():
+    model = FakeChatModel(throttle_rate=1.0)
+    scheduler = LLMScheduler(max_retries=2, base_delay=0.01)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return await model.ainvoke("text")
+
+    with pytest.raises(FakeRateLimitError):
+        asyncio.run(scheduler.run(MODEL, call, chain="cleaner"))
+    assert len(calls) == 3
+
+
+def test_other_errors_are_not_retried():
+    scheduler = LLMScheduler(base_delay=0.01)
+    calls = []
+
+    def call():
+        calls.append(1)
+        raise KeyError("cleaned_text")
+
+    with pytest.raises(KeyError):
+        scheduler.run_sync(MODEL, call, chain="cleaner")
+    assert len(calls) == 1
+    assert scheduler.has_spare_capacity(MODEL)
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.metrics import Counter, Gauge, Histogram, MetricsRegistry
+from backend.metrics.registry import Metric
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+def test_counter_exposition(registry):
+    calls = Counter(
+        "llm_calls_total", "LLM calls, by chain", ["chain"], registry=registry
+    )
+    calls.labels("cleaner").inc()
+    calls.labels("cleaner").inc(2)
+    calls.labels("flashcarder").inc()
+
+    assert registry.render() == (
+        "# HELP llm_calls_total LLM calls, by chain\n"
+        "# TYPE llm_calls_total counter\n"
+        'llm_calls_total{chain="cleaner"} 3\n'
+        'llm_calls_total{chain="flashcarder"} 1\n'
+    )
+
+
+def test_gauge_exposition(registry):
+    running = Gauge("jobs_running", "Jobs running", registry=registry)
+    running.inc(3)
+    running.dec()
+
+    assert registry.render().splitlines()[-1] == "jobs_running 2"
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = Histogram(
+        "stage_seconds", "Stage time", ["stage"], buckets=(0.1, 1), registry=registry
+    )
+    for seconds in (0.05, 0.5, 0.7, 3):
+        latency.labels("parse").observe(seconds)
+
+    assert registry.render().splitlines()[2:] == [
+        'stage_seconds_bucket{stage="parse",le="0.1"} 1',
+        'stage_seconds_bucket{stage="parse",le="1"} 3',
+        'stage_seconds_bucket{stage="parse",le="+Inf"} 4',
+        'stage_seconds_sum{stage="parse"} 4.25',
+        'stage_seconds_count{stage="parse"} 4',
+    ]
+    assert latency.count("parse") == 4
+
+
+def test_metrics_are_sorted_and_escaped(registry):
+    Counter("b_total", "Second", registry=registry).inc()
+    errors = Counter(
+        "a_total", "Help with \\ and\nnewline", ["file"], registry=registry
+    )
+    errors.labels('notes "final"\\v2.pdf').inc()
+
+    assert registry.render() == (
+        "# HELP a_total Help with \\\\ and\\nnewline\n"
+        "# TYPE a_total counter\n"
+        'a_total{file="notes \\"final\\"\\\\v2.pdf"} 1\n'
+        "# HELP b_total Second\n"
+        "# TYPE b_total counter\n"
+        "b_total 1\n"
+    )
+
+
+def test_labels_must_match_the_declared_names(registry):
+    calls = Counter("calls_total", "Calls", ["chain", "model"], registry=registry)
+
+    with pytest.raises(ValueError):
+        calls.labels("cleaner")
+    with pytest.raises(ValueError):
+        calls.inc()
+
+
+def test_counters_only_increase(registry):
+    calls = Counter("calls_total", "Calls", registry=registry)
+
+    with pytest.raises(ValueError):
+        calls.inc(-1)
+
+
+def test_names_are_registered_once(registry):
+    Counter("calls_total", "Calls", registry=registry)
+
+    with pytest.raises(ValueError, match="already registered"):
+        Counter("calls_total", "Calls", registry=registry)
+
+
+def test_metric_types_must_implement_collect(registry):
+    with pytest.raises(TypeError):
+        Metric("untyped", "No samples", registry=registry)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from backend.cache import MemoryLRUBackend, ParseCache
+from backend.parsers import TXTParser
+
+
+class _TXTParserV2(TXTParser):
+    version = "2"
+
+
+def test_segments_round_trip():
+    cache = ParseCache(MemoryLRUBackend())
+    key = ParseCache.key_for(b"notes", TXTParser)
+
+    cache.put(key, ["page one", "page two"])
+
+    assert cache.get(key) == ["page one", "page two"]
+
+
+def test_key_depends_on_content_and_parser_version():
+    key = ParseCache.key_for(b"notes", TXTParser)
+
+    assert key == ParseCache.key_for(b"notes", TXTParser)
+    assert key != ParseCache.key_for(b"other notes", TXTParser)
+    assert key != ParseCache.key_for(b"notes", _TXTParserV2)
+
+
+def test_bumping_the_parser_version_misses_old_entries():
+    cache = ParseCache(MemoryLRUBackend())
+    cache.put(ParseCache.key_for(b"notes", TXTParser), ["old output"])
+
+    assert cache.get(ParseCache.key_for(b"notes", _TXTParserV2)) is None
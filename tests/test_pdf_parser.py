@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import pymupdf
+import pytest
+
+from backend.parsers import PDFParser, parse_document_segments
+
+
+@pytest.fixture
+def pdf_bytes() -> bytes:
+    pdf = pymupdf.open()
+    for number in range(1, 4):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Lecture page {number} on enzymes")
+    pdf.set_metadata({"title": "Enzymes"})
+    return pdf.tobytes()
+
+
+def test_pages_are_read_from_memory_in_order(pdf_bytes):
+    pages = list(PDFParser.from_bytes(pdf_bytes, "enzymes.pdf").iter_pages())
+
+    assert [page.page_content.strip() for page in pages] == [
+        f"Lecture page {number} on enzymes" for number in range(1, 4)
+    ]
+    assert [page.metadata["page"] for page in pages] == [0, 1, 2]
+    assert pages[0].metadata["total_pages"] == 3
+    assert pages[0].metadata["source"] == "enzymes.pdf"
+    assert pages[0].metadata["title"] == "Enzymes"
+
+
+def test_path_and_bytes_give_the_same_segments(pdf_bytes, tmp_path):
+    path = tmp_path / "enzymes.pdf"
+    path.write_bytes(pdf_bytes)
+
+    from_path = parse_document_segments(file_path=path)
+    from_bytes = parse_document_segments(file_bytes=pdf_bytes, file_name="x.pdf")
+
+    assert from_path == from_bytes
+    assert len(from_path) == 3
+
+
+def test_invalid_pdf_raises_value_error():
+    with pytest.raises(ValueError, match="Invalid PDF"):
+        PDFParser.from_bytes(b"not a pdf", "broken.pdf")
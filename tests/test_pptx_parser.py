@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+from backend.parsers import PPTXParser, get_parser_for_file
+
+
+@pytest.fixture
+def pptx_bytes() -> bytes:
+    deck = Presentation()
+    slide = deck.slides.add_slide(deck.slide_layouts[1])
+    slide.shapes.title.text = "Cell respiration"
+    body = slide.placeholders[1].text_frame
+    body.text = "Happens in mitochondria"
+    point = body.add_paragraph()
+    point.text = "Produces ATP"
+    point.level = 1
+    slide.notes_slide.notes_text_frame.text = "Mention the electron transport chain"
+
+    slide = deck.slides.add_slide(deck.slide_layouts[5])
+    slide.shapes.title.text = "ATP yield"
+    table = slide.shapes.add_table(
+        2, 2, Inches(1), Inches(2), Inches(6), Inches(1)
+    ).table
+    for row, cells in zip(table.rows, [("Stage", "ATP"), ("Glycolysis", "2")]):
+        for cell, text in zip(row.cells, cells):
+            cell.text = text
+
+    out = io.BytesIO()
+    deck.save(out)
+    return out.getvalue()
+
+
+def test_slides_include_title_body_and_notes(pptx_bytes):
+    pages = list(PPTXParser.from_bytes(pptx_bytes, "deck.pptx").iter_pages())
+
+    assert pages[0].page_content == (
+        "Cell respiration\n"
+        "Happens in mitochondria\n"
+        "  Produces ATP\n"
+        "Notes: Mention the electron transport chain"
+    )
+    assert pages[0].metadata == {
+        "source": "deck.pptx",
+        "page_number": 1,
+        "title": "Cell respiration",
+    }
+
+
+def test_table_rows_are_joined_by_pipes(pptx_bytes):
+    pages = list(PPTXParser.from_bytes(pptx_bytes, "deck.pptx").iter_pages())
+
+    assert pages[1].page_content == "ATP yield\nStage | ATP\nGlycolysis | 2"
+
+
+def test_parse_joins_slides_with_newlines(pptx_bytes):
+    parser = PPTXParser.from_bytes(pptx_bytes, "deck.pptx")
+
+    assert parser.parse() == "\n".join(parser.iter_segments())
+
+
+def test_legacy_ppt_has_no_parser():
+    with pytest.raises(ValueError, match="No parser registered"):
+        get_parser_for_file("lecture.ppt")
+
+
+def test_invalid_pptx_raises_value_error():
+    parser = PPTXParser.from_bytes(b"not a deck", "deck.pptx")
+
+    with pytest.raises(ValueError, match="Invalid PPTX"):
+        list(parser.iter_pages())
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from backend.ai.cleaner.pre_cleaner import (
+    normalize_text,
+    pre_clean_segments,
+    quality_score,
+)
+
+TOPICS = ["Mitosis", "Meiosis", "Osmosis", "Diffusion", "Respiration"]
+
+
+def test_numbers_in_the_body_are_kept():
+    page = "Results table\nYear\nRevenue\n2019\n120\n2020\n340\nThe total grew."
+
+    assert pre_clean_segments([page]) == [page]
+
+
+def test_numeric_table_between_page_numbers_is_kept():
+    pages = [
+        f"{topic} results.\n{topic} year\n2019\n120\n2020\n340\n{topic} grew.\n{number}"
+        for number, topic in enumerate(TOPICS, start=1)
+    ]
+
+    cleaned = pre_clean_segments(pages)
+
+    for topic, text in zip(TOPICS, cleaned):
+        assert (
+            text
+            == f"{topic} results.\n{topic} year\n2019\n120\n2020\n340\n{topic} grew."
+        )
+
+
+def test_page_numbers_counting_up_are_removed():
+    pages = [
+        f"{number + 4}\n{topic} happens in cells.\n{topic} has {number * 7} steps."
+        for number, topic in enumerate(TOPICS, start=1)
+    ]
+
+    cleaned = pre_clean_segments(pages)
+
+    assert cleaned[0] == "Mitosis happens in cells.\nMitosis has 7 steps."
+    assert all(not text.split("\n")[0].isdigit() for text in cleaned)
+
+
+def test_marked_page_numbers_and_repeated_headers_are_removed():
+    pages = [
+        f"BIO 101 Lecture Notes\n{topic} is covered here.\nPage {number} of 5"
+        for number, topic in enumerate(TOPICS, start=1)
+    ]
+
+    assert pre_clean_segments(pages) == [
+        f"{topic} is covered here." for topic in TOPICS
+    ]
+
+
+def test_hyphenation_and_hard_wraps_are_undone():
+    assert pre_clean_segments(
+        ["The mito-\nchondria produce\nenergy for the cell."]
+    ) == ["The mitochondria produce energy for the cell."]
+
+
+def test_words_hyphenated_elsewhere_keep_their_hyphen():
+    pages = [
+        "We tune the model with cross-\nvalidation on the training set.",
+        "Each cross-validation fold holds out a fifth of the data.",
+    ]
+
+    assert pre_clean_segments(pages)[0] == (
+        "We tune the model with cross-validation on the training set."
+    )
+
+
+def test_hyphenated_compounds_keep_the_hyphen_at_the_break():
+    assert (
+        normalize_text("A state-of-the-\nart method.") == "A state-of-the-art method."
+    )
+
+
+def test_list_items_are_not_unwrapped():
+    text = (
+        "The cell cycle has phases\n"
+        "- interphase\n"
+        "• mitosis\n"
+        "a) prophase and\n"
+        "metaphase\n"
+        "ii. anaphase\n"
+        "3) telophase"
+    )
+
+    assert normalize_text(text) == (
+        "The cell cycle has phases\n"
+        "- interphase\n"
+        "• mitosis\n"
+        "a) prophase and metaphase\n"
+        "ii. anaphase\n"
+        "3) telophase"
+    )
+
+
+def test_quality_score_penalizes_fragments_and_noise():
+    prose = "Cells divide by mitosis.\nThe spindle pulls chromosomes apart."
+    fragments = "Year\n2019\n120\n2020\n340"
+
+    assert quality_score(prose) == 1.0
+    assert quality_score(fragments) < quality_score(prose)
+    assert quality_score("�� broken � text") < 0.9
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+
+from backend.ai.flashcarder.reducer import (
+    FlashcardDeduplicator,
+    allocate_card_budget,
+    merge_flashcards,
+    validate_flashcards,
+)
+from benchmarks.fake_llm import FakeChatModel
+
+
+def _fake_cards(prompt: str, cards: int):
+    answer = FakeChatModel(cards=cards)._flashcards(prompt)
+    return validate_flashcards(json.loads(answer)["flashcards"])
+
+
+def test_deduplicator_rejects_the_same_question_after_normalizing():
+    dedup = FlashcardDeduplicator()
+
+    assert dedup.add("What is ATP?")
+    assert not dedup.add("  what is   ATP ")
+
+
+def test_deduplicator_rejects_near_duplicates_by_shingle_similarity():
+    dedup = FlashcardDeduplicator(threshold=0.8)
+
+    assert dedup.add("What is the role of the mitochondria in cellular respiration?")
+    assert not dedup.add(
+        "What is the role of the mitochondria in cellular respiration today?"
+    )
+    assert dedup.add("How does photosynthesis turn light into chemical energy?")
+
+
+def test_deduplicator_keeps_distinct_generated_questions():
+    dedup = FlashcardDeduplicator()
+    cards = _fake_cards("cells divide by mitosis and meiosis in eukaryotes", 10)
+
+    assert all(dedup.add(card.question) for card in cards)
+    assert not any(dedup.add(card.question) for card in cards)
+
+
+def test_allocation_uses_largest_remainders():
+    assert allocate_card_budget([50, 30, 20], 7) == [4, 2, 1]
+    assert allocate_card_budget([100, 100, 100], 10) == [4, 3, 3]
+
+
+def test_allocation_sums_to_the_total():
+    lengths = [1200, 7, 3100, 950, 40, 2800]
+    for total in range(0, 50):
+        budgets = allocate_card_budget(lengths, total)
+        assert sum(budgets) == total
+
+
+def test_allocation_edge_cases():
+    assert allocate_card_budget([1000, 1], 5) == [5, 0]
+    assert allocate_card_budget([0, 0], 5) == [0, 0]
+    assert allocate_card_budget([10, 20], None) == [None, None]
+
+
+def test_merge_drops_repeated_cards_and_fills_from_extras():
+    first = _fake_cards("enzymes lower activation energy of reactions", 4)
+    second = _fake_cards("ribosomes translate messenger RNA into proteins", 4)
+
+    merged = merge_flashcards(
+        [first, first + second], [2, 2], 6, FlashcardDeduplicator()
+    )
+
+    assert merged == first[:2] + second[:2] + first[2:4]
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+from backend.jobs import Job
+from backend.models import Flashcard
+
+
+@pytest.fixture
+def client():
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def job(monkeypatch):
+    """A job the server's queue returns for any id."""
+    job = Job("job-1")
+    monkeypatch.setattr(server, "job_queue", SimpleNamespace(get=lambda job_id: job))
+    return job
+
+
+@pytest.mark.parametrize("path", ["/flashcards/job-1", "/flashcards/job-1/export/tsv"])
+def test_deck_of_a_failed_job_is_an_error(client, job, path):
+    job.mark_failed("Failed to extract text from any files")
+
+    response = client.get(path)
+
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Failed to extract text from any files"
+
+
+def test_deck_of_a_running_job_is_accepted(client, job):
+    job.mark_running()
+
+    response = client.get("/flashcards/job-1")
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "running"
+
+
+def _sse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def finished_job(job):
+    job.update_stage("flashcard")
+    job.add_card(Flashcard(question="What makes ATP?", answer="Mitochondria"))
+    job.mark_succeeded({})
+    return job
+
+
+def test_event_stream_replays_every_event(client, finished_job):
+    response = client.get("/jobs/job-1/events")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [(id, event) for id, event, _ in _sse_events(response.text)] == [
+        (0, "stage"),
+        (1, "card"),
+        (2, "done"),
+    ]
+
+
+def test_event_stream_resumes_after_last_event_id(client, finished_job):
+    response = client.get("/jobs/job-1/events", headers={"Last-Event-ID": "0"})
+
+    events = _sse_events(response.text)
+    assert [id for id, _, _ in events] == [1, 2]
+    assert events[0][2]["question"] == "What makes ATP?"
+    assert events[1][2] == {"card_count": 1}
+
+
+def test_event_stream_of_unknown_job_is_not_found(client, monkeypatch):
+    monkeypatch.setattr(server, "job_queue", SimpleNamespace(get=lambda job_id: None))
+
+    assert client.get("/jobs/missing/events").status_code == 404
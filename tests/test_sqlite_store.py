@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import pytest
+
+from backend.cache import SQLiteBlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteBlobStore(tmp_path / "blobs.sqlite3", max_bytes=1000)
+    yield store
+    store.close()
+
+
+def _stored_bytes(store: SQLiteBlobStore) -> int:
+    return store._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+
+def test_round_trip(store):
+    store.put("a", b"alpha")
+
+    assert store.get("a") == b"alpha"
+    assert store.get("missing") is None
+
+
+def test_least_recently_used_entries_are_evicted_over_the_cap(store, monkeypatch):
+    clock = iter(range(1, 100))
+    monkeypatch.setattr("backend.cache.sqlite_store.time.time", lambda: next(clock))
+    for key in "abcde":
+        store.put(key, b"x" * 200)
+    store.get("a")
+
+    store.put("f", b"x" * 200)
+
+    # Evicted oldest first down to 90% of the cap; "a" was used recently
+    assert [key for key in "abcdef" if store.get(key) is None] == ["b", "c"]
+    assert store.total_bytes() == 800
+
+
+def test_eviction_frees_room_for_more_than_one_write(store):
+    for index in range(10):
+        store.put(f"key-{index}", b"x" * 100)
+
+    store.put("key-10", b"x" * 100)
+
+    assert store.total_bytes() <= 900
+
+
+def test_running_total_matches_the_stored_blobs(store):
+    store.put("a", b"x" * 300)
+    store.put("a", b"x" * 100)
+    store.put("b", b"x" * 250)
+    for index in range(10):
+        store.put(f"key-{index}", b"x" * 150)
+
+    assert store.total_bytes() == _stored_bytes(store)
+
+
+def test_blob_over_the_cap_is_not_stored(store):
+    store.put("big", b"x" * 1001)
+
+    assert store.get("big") is None
+    assert store.total_bytes() == 0
+
+
+def test_expired_entries_are_missing(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.cache.sqlite_store.time.time", lambda: now[0])
+    store = SQLiteBlobStore(tmp_path / "blobs.sqlite3", ttl=60)
+    store.put("a", b"alpha")
+
+    now[0] += 61
+
+    assert store.get("a") is None
+    assert store.total_bytes() == 0
+
+
+def test_total_survives_reopening(tmp_path):
+    path = tmp_path / "blobs.sqlite3"
+    SQLiteBlobStore(path).put("a", b"x" * 123)
+
+    assert SQLiteBlobStore(path).total_bytes() == 123
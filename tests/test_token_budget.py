@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from backend.ai.chunking import chunk_segments
+from backend.ai.flashcarder.reducer import allocate_card_budget
+from backend.ai.token_budget import (
+    OUTPUT_OVERHEAD_TOKENS,
+    TOKENS_PER_CARD,
+    get_model_limits,
+    plan_flashcarder,
+)
+
+MODEL = "gemini-1.5-pro"
+
+
+def test_small_request_fits_one_call():
+    plan = plan_flashcarder("x" * 10_000, "prompt", MODEL, 20, 24_000)
+
+    assert plan.mode == "single"
+    assert plan.output_needed_tokens == 20 * TOKENS_PER_CARD + OUTPUT_OVERHEAD_TOKENS
+
+
+def test_material_over_the_context_window_uses_map_reduce():
+    plan = plan_flashcarder("x" * 50_000, "prompt", "gpt-4", 20, 24_000)
+
+    assert plan.mode == "map_reduce"
+    assert "context window" in plan.reason
+
+
+def test_too_many_cards_for_one_answer_uses_map_reduce():
+    plan = plan_flashcarder("x" * 100_000, "prompt", MODEL, 200, 24_000)
+
+    assert plan.mode == "map_reduce"
+    assert "output limit" in plan.reason
+    assert plan.output_needed_tokens > get_model_limits(MODEL).max_output_tokens
+
+
+def test_map_reduce_chunks_keep_each_card_share_within_the_output_limit():
+    material = "\n\n".join(f"Paragraph {i} about cell biology." for i in range(400))
+    plan = plan_flashcarder(material, "prompt", MODEL, 200, 24_000)
+
+    chunks = chunk_segments([material], plan.max_chunk_chars)
+    budgets = allocate_card_budget([len(chunk) for chunk in chunks], 200)
+
+    assert plan.mode == "map_reduce"
+    assert len(chunks) > 1
+    limit = get_model_limits(MODEL).max_output_tokens
+    for budget in budgets:
+        assert budget * TOKENS_PER_CARD + OUTPUT_OVERHEAD_TOKENS <= limit
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from fastapi import UploadFile
+
+from backend.ingest import UploadSpool, UploadTooLargeError, upload_sha256
+from backend.ingest import upload_spool
+
+
+def _upload(content: bytes, filename: str = "notes.txt", declare_size: bool = False):
+    size = len(content) if declare_size else None
+    return UploadFile(file=io.BytesIO(content), filename=filename, size=size)
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    """Copy uploads a few bytes at a time, so limits trip mid-stream."""
+    monkeypatch.setattr(upload_spool, "BLOCK_SIZE", 4)
+
+
+def test_upload_is_copied_and_hashed(tmp_path, small_blocks):
+    spool = UploadSpool(root=tmp_path)
+    content = b"mitochondria make ATP"
+
+    spooled = asyncio.run(spool.add(_upload(content)))
+
+    assert spooled.path.read_bytes() == content
+    assert spooled.path.suffix == ".txt"
+    assert spooled.size == spool.total_bytes == len(content)
+    assert upload_sha256(spooled) == hashlib.sha256(content).hexdigest()
+    spool.cleanup()
+
+
+def test_file_over_the_per_file_limit_is_removed(tmp_path, small_blocks):
+    spool = UploadSpool(root=tmp_path, max_file_bytes=10)
+    asyncio.run(spool.add(_upload(b"x" * 10, "small.txt")))
+
+    with pytest.raises(UploadTooLargeError, match="big.txt.*per file"):
+        asyncio.run(spool.add(_upload(b"x" * 11, "big.txt")))
+
+    assert [path.name for path in spool.directory.iterdir()] == ["0000.txt"]
+    assert spool.total_bytes == 10
+    spool.cleanup()
+
+
+def test_uploads_over_the_per_request_limit_are_rejected(tmp_path, small_blocks):
+    spool = UploadSpool(root=tmp_path, max_request_bytes=16)
+    asyncio.run(spool.add(_upload(b"x" * 10)))
+
+    with pytest.raises(UploadTooLargeError, match="per request"):
+        asyncio.run(spool.add(_upload(b"x" * 10)))
+
+    assert len(list(spool.directory.iterdir())) == 1
+    spool.cleanup()
+
+
+def test_declared_size_is_rejected_before_copying(tmp_path):
+    spool = UploadSpool(root=tmp_path, max_file_bytes=10)
+    upload = _upload(b"x" * 11, declare_size=True)
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool.add(upload))
+
+    assert upload.file.tell() == 0
+    assert list(spool.directory.iterdir()) == []
+    spool.cleanup()
+
+
+def test_add_all_cleans_up_when_an_upload_is_rejected(tmp_path, small_blocks):
+    spool = UploadSpool(root=tmp_path, max_file_bytes=10)
+    uploads = [_upload(b"ok"), _upload(b"x" * 11, "big.txt")]
+
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(spool.add_all(uploads))
+
+    assert not spool.directory.exists()
+    assert spool.uploads == []
+
+
+def test_cleanup_closes_files_and_removes_the_directory(tmp_path):
+    spool = UploadSpool(root=tmp_path)
+    spooled = asyncio.run(spool.add_all([_upload(b"a"), _upload(b"b", "b.pdf")]))
+
+    spool.cleanup()
+
+    assert all(upload.file.closed for upload in spooled)
+    assert not spool.directory.exists()
+
+
+def test_unsafe_suffix_is_dropped(tmp_path):
+    spool = UploadSpool(root=tmp_path)
+
+    spooled = asyncio.run(spool.add(_upload(b"a", "notes.t x/t")))
+
+    assert spooled.path.name == "0000"
+    assert spooled.filename == "notes.t x/t"
+    spool.cleanup()
+
+
+def test_remove_stale_only_removes_old_spool_directories(tmp_path):
+    old, new = UploadSpool(root=tmp_path), UploadSpool(root=tmp_path)
+    other = tmp_path / "keep"
+    other.mkdir()
+    an_hour_ago = time.time() - 3600
+    os.utime(old.directory, (an_hour_ago, an_hour_ago))
+    os.utime(other, (an_hour_ago, an_hour_ago))
+
+    assert UploadSpool.remove_stale(tmp_path, max_age=60) == 1
+
+    assert not old.directory.exists()
+    assert new.directory.exists()
+    assert other.exists()
+
+
+def test_remove_stale_without_a_root_does_nothing(tmp_path):
+    assert UploadSpool.remove_stale(tmp_path / "missing") == 0